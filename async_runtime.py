@@ -0,0 +1,274 @@
+"""
+Asyncio runtime for the Nietzsche quotes bot.
+
+Runs the health server, scheduler, quote pre-generation and posting as
+cooperating tasks on a single event loop. Blocking work (PDF parsing,
+LLM and X API calls) is pushed to worker threads so the loop never stalls.
+"""
+import asyncio
+import json
+import logging
+import os
+import signal
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+import health
+
+
+class AsyncRuntime:
+    """Drive a NietzscheBot from an asyncio event loop."""
+
+    def __init__(
+        self,
+        bot_factory: Callable[[], Any],
+        port: int = 10000,
+        host: str = '0.0.0.0',
+        pregenerate: int = 1,
+        retry_delay: float = 60.0,
+        restart_exit_code: int = 3
+    ):
+        """
+        Initialize the runtime.
+
+        Args:
+            bot_factory: Callable building a NietzscheBot (run in a worker thread)
+            port: Health server port
+            host: Health server bind address
+            pregenerate: Number of rephrased quotes to keep ready (0 disables)
+            retry_delay: Seconds to wait after a failed pre-generation
+            restart_exit_code: Exit code returned when the bot requests a restart
+        """
+        self.bot_factory = bot_factory
+        self.port = port
+        self.host = host
+        self.pregenerate = max(0, pregenerate)
+        self.retry_delay = retry_delay
+        self.restart_exit_code = restart_exit_code
+        self.bot = None
+        self.logger = logging.getLogger(__name__)
+        self._stop: Optional[asyncio.Event] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._buffer: Optional[asyncio.Queue] = None
+
+    def request_stop(self) -> None:
+        """Ask the runtime to drain and shut down (safe to call from the loop's signal handlers)."""
+        if self._stop is not None:
+            self._stop.set()
+        if self._wake is not None:
+            self._wake.set()
+        if self.bot is not None:
+            self.bot.request_shutdown()
+
+    def _buffer_file(self) -> Path:
+        """Path where unposted pre-generated quotes survive a restart."""
+        return Path(self.bot.config.get('state_dir', 'state')) / 'pregenerated.json'
+
+    def _restore_buffer(self) -> None:
+        """Refill the buffer with quotes saved by the previous process."""
+        path = self._buffer_file()
+        if not path.exists():
+            return
+        try:
+            drafts = json.loads(path.read_text())
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable quote buffer {path}: {str(e)}")
+            drafts = []
+        for draft in drafts[:self._buffer.maxsize]:
+            self._buffer.put_nowait(draft)
+        path.unlink(missing_ok=True)
+        if drafts:
+            self.logger.info(f"Restored {self._buffer.qsize()} pre-generated quotes")
+
+    def _save_buffer(self) -> None:
+        """Write unposted pre-generated quotes to disk."""
+        drafts = []
+        while not self._buffer.empty():
+            drafts.append(self._buffer.get_nowait())
+        if not drafts:
+            return
+        path = self._buffer_file()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = path.with_suffix('.tmp')
+            tmp_file.write_text(json.dumps(drafts, indent=2))
+            os.replace(tmp_file, path)
+            self.logger.info(f"Saved {len(drafts)} pre-generated quotes for the next start")
+        except OSError as e:
+            self.logger.warning(f"Could not save quote buffer: {str(e)}")
+
+    def _request_reload(self) -> None:
+        """Reload config on SIGHUP once the bot is running."""
+        if self.bot is not None and self.bot.running:
+            self.bot.request_reload()
+
+    async def _handle_http(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve a single health check request."""
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+
+            if len(request_line) >= 2 and request_line[0] == 'GET':
+                status, content_type, body = health.handle_request(request_line[1])
+            else:
+                status, content_type, body = 501, 'text/plain', b''
+
+            writer.write(
+                f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                f"Content-type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode('latin-1') + body
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _until_stopped(self, coro) -> Tuple[bool, Any]:
+        """
+        Await a coroutine unless a stop is requested first.
+
+        Returns:
+            (completed, result) tuple
+        """
+        task = asyncio.ensure_future(coro)
+        stopper = asyncio.ensure_future(self._stop.wait())
+        done, _ = await asyncio.wait({task, stopper}, return_when=asyncio.FIRST_COMPLETED)
+        stopper.cancel()
+        if task in done:
+            return True, task.result()
+        task.cancel()
+        return False, None
+
+    async def _pregenerate_loop(self) -> None:
+        """Keep the buffer of rephrased quotes topped up."""
+        while True:
+            try:
+                prepared = await asyncio.to_thread(self.bot.generate_quote)
+            except Exception as e:
+                self.logger.error(f"Pre-generation failed: {str(e)}")
+                await asyncio.sleep(self.retry_delay)
+                continue
+            await self._buffer.put(prepared)
+
+    async def _post_cycle(self) -> None:
+        """Post a quote, using a pre-generated one if available."""
+        prepared = None
+        if self._buffer is not None and not self._buffer.empty():
+            prepared = self._buffer.get_nowait()
+        await asyncio.to_thread(self.bot.post_quote, prepared)
+
+    async def _run_job(self, job) -> None:
+        """Run a scheduled job off the event loop."""
+        if job.name == 'post_quote':
+            await self._post_cycle()
+        else:
+            await asyncio.to_thread(job.func)
+
+    async def _scheduler_loop(self) -> None:
+        """Sleep until the next due job, run it, repeat."""
+        loop = asyncio.get_running_loop()
+        scheduler = self.bot.scheduler
+        scheduler.add_wake_callback(lambda: loop.call_soon_threadsafe(self._wake.set))
+
+        while True:
+            self._wake.clear()
+            if self._stop.is_set() or self.bot.shutdown_requested.is_set():
+                self.request_stop()
+                return
+            scheduler.beat()
+            for job in scheduler.pop_due():
+                try:
+                    await self._run_job(job)
+                except Exception as e:
+                    self.logger.error(f"Job {job.name} failed: {str(e)}", exc_info=True)
+
+            timeout = scheduler.wait_timeout(scheduler.next_due(), scheduler.clock())
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self) -> int:
+        """
+        Run until SIGINT/SIGTERM.
+
+        Returns:
+            Process exit code
+        """
+        loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        self._wake = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.request_stop)
+            except (NotImplementedError, RuntimeError):
+                pass
+        try:
+            loop.add_signal_handler(signal.SIGHUP, self._request_reload)
+        except (AttributeError, NotImplementedError, RuntimeError):
+            pass
+
+        # Health server comes up before any slow initialization
+        server = await asyncio.start_server(self._handle_http, self.host, self.port)
+        print(f"Health check server started on port {self.port} (asyncio runtime)")
+
+        tasks: List[asyncio.Task] = []
+        try:
+            completed, self.bot = await self._until_stopped(asyncio.to_thread(self.bot_factory))
+            if not completed:
+                return 0
+
+            print("\nTesting components...")
+            completed, passed = await self._until_stopped(asyncio.to_thread(self.bot.test_components))
+            if not completed:
+                return 0
+            if not passed:
+                print("Component tests failed. Please check logs.")
+                return 1
+
+            print("\nAll tests passed! Starting bot...")
+            self.bot.logger.info("Starting Nietzsche Bot (asyncio runtime)")
+            await asyncio.to_thread(self.bot._start_leader_election)
+            if self.bot.config.get('post_on_startup', False):
+                self.bot.logger.info("Posting initial quote on startup")
+                await self._post_cycle()
+
+            self.bot._schedule_posts()
+            self.bot.mark_ready()
+
+            if self.pregenerate:
+                self._buffer = asyncio.Queue(maxsize=self.pregenerate)
+                self._restore_buffer()
+                tasks.append(asyncio.create_task(self._pregenerate_loop()))
+            scheduler_task = asyncio.create_task(self._scheduler_loop())
+            tasks.append(scheduler_task)
+
+            await self._stop.wait()
+
+            # Drain: let a post cycle in flight finish (the bot's drain
+            # deadline bounds this), then keep unposted quotes
+            print("\nDraining...")
+            for task in tasks:
+                if task is not scheduler_task:
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if self._buffer is not None:
+                self._save_buffer()
+
+            if self.bot.restart_requested:
+                print("\nRestart requested")
+                return self.restart_exit_code
+            print("\nShutdown signal received")
+            return 0
+
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            server.close()
+            await server.wait_closed()
+            if self.bot is not None:
+                self.bot.stop()
@@ -0,0 +1,390 @@
+"""
+Offline benchmarks for corpus extraction, sampling and output cleanup.
+
+Runs each case on synthetic inputs of increasing size and reports the
+best-of-N time, throughput, peak traced memory and a scaling exponent
+(the slope of log time over log size: ~1 is linear, ~0 is constant).
+Results can be saved as a baseline and later runs compared against it.
+
+Run with: python3 benchmark.py --save benchmarks/baseline.json
+          python3 benchmark.py --compare benchmarks/baseline.json
+"""
+import argparse
+import json
+import logging
+import math
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ingest import BoilerplateDetector, Ingestor
+from pdf_extractor import PDFExtractor
+from synthetic_pdf import generate_pdf, synthetic_sentence
+
+DEFAULT_SIZES = {
+    'load_pdf': [10, 50, 200],
+    'clean_text': [1000, 10000, 100000],
+    'split_sentences': [1000, 10000, 100000],
+    'ingest': [1000, 10000, 100000],
+    'get_random_sentence': [1000, 10000, 100000],
+    'clean_response': [1000, 10000, 100000]
+}
+
+# Number of draws per get_random_sentence measurement
+DRAWS = 10000
+
+
+def synthetic_text(sentences: int, seed: int = 0) -> str:
+    """
+    Build raw extracted-looking text with line breaks and page numbers.
+
+    Args:
+        sentences: Number of sentences
+        seed: Random seed
+
+    Returns:
+        Raw text
+    """
+    rng = random.Random(seed)
+    lines = []
+    for i in range(sentences):
+        lines.append(synthetic_sentence(rng))
+        if i % 12 == 11:
+            lines.append(f"{i // 12 + 1}\n")
+    return '\n'.join(lines)
+
+
+def synthetic_responses(count: int, seed: int = 0) -> List[str]:
+    """
+    Build raw model outputs with the quoting and lead-in artifacts cleanup handles.
+
+    Args:
+        count: Number of responses
+        seed: Random seed
+
+    Returns:
+        List of raw responses
+    """
+    rng = random.Random(seed)
+    prefixes = ['', '', 'Rephrased quote: ', "Here's: ", 'Rephrased: ']
+    responses = []
+    for _ in range(count):
+        body = ' '.join(synthetic_sentence(rng) for _ in range(rng.randint(1, 3)))
+        responses.append(f"  {rng.choice(prefixes)}\"{body}\"\n")
+    return responses
+
+
+def _bare_extractor(sentences: Optional[List[str]] = None) -> PDFExtractor:
+    """Create a PDFExtractor without loading a file."""
+    return PDFExtractor.from_sentences(sentences or [])
+
+
+def _processors() -> List[Tuple[str, Callable[[str], str]]]:
+    """Collect every processor's output cleanup that can be imported here."""
+    found = []
+    for module_name, class_name in (
+        ('huggingface_processor', 'HuggingFaceProcessor'),
+        ('groq_processor', 'GroqProcessor'),
+        ('grok_processor', 'GrokProcessor'),
+        ('llama_processor', 'LlamaProcessor'),
+        ('ollama_processor', 'OllamaProcessor')
+    ):
+        try:
+            module = __import__(module_name)
+        except ImportError as e:
+            print(f"Skipping {class_name} cleanup: {str(e)}")
+            continue
+        found.append((module_name.replace('_processor', ''), getattr(module, class_name)._clean_response))
+    return found
+
+
+def build_cases(workdir: Path) -> Dict[str, Tuple[Callable[[int], Any], Callable[[Any], Any], Callable[[int], int]]]:
+    """
+    Build the benchmark cases.
+
+    Each case maps to (setup, run, units): setup(size) prepares an input
+    outside the timed region, run(input) is the measured call and
+    units(size) is the number of items it processes (for throughput).
+
+    Args:
+        workdir: Directory for generated files
+
+    Returns:
+        Cases keyed by name
+    """
+    def setup_pdf(pages: int) -> PDFExtractor:
+        path = workdir / f"synthetic_{pages}.pdf"
+        if not path.exists():
+            generate_pdf(str(path), pages=pages, seed=pages)
+        return PDFExtractor(str(path), load=False)
+
+    def setup_split(sentences: int) -> Tuple[PDFExtractor, str]:
+        extractor = _bare_extractor()
+        return extractor, extractor._clean_text(synthetic_text(sentences))
+
+    def setup_ingest(sentences: int) -> Tuple[PDFExtractor, List[str]]:
+        # ~40 lines per page with a running head and page number; repeat a
+        # tenth of the text so dedupe has work to do
+        lines = synthetic_text(sentences).split('\n')
+        lines += lines[:len(lines) // 10]
+        pages = [
+            '\n'.join(['BEYOND GOOD AND EVIL'] + lines[i:i + 40] + [str(i // 40 + 1)])
+            for i in range(0, len(lines), 40)
+        ]
+        return _bare_extractor(), pages
+
+    def run_ingest(args: Tuple[PDFExtractor, List[str]]) -> List[str]:
+        extractor, pages = args
+        ingestor = Ingestor(extractor._clean_text, extractor._split_sentences, BoilerplateDetector())
+        return list(ingestor.ingest(pages))
+
+    def per_item(size: int) -> int:
+        return size
+
+    def run_draws(extractor: PDFExtractor) -> None:
+        for _ in range(DRAWS):
+            extractor.get_random_sentence()
+
+    cases = {
+        'load_pdf': (setup_pdf, lambda extractor: extractor._load_pdf(), per_item),
+        'clean_text': (
+            lambda size: (_bare_extractor(), synthetic_text(size)),
+            lambda args: args[0]._clean_text(args[1]),
+            per_item
+        ),
+        'split_sentences': (setup_split, lambda args: args[0]._split_sentences(args[1]), per_item),
+        'ingest': (setup_ingest, run_ingest, per_item),
+        'get_random_sentence': (
+            lambda size: _bare_extractor(synthetic_text(size).split('\n')),
+            run_draws,
+            lambda size: DRAWS
+        )
+    }
+    for name, clean in _processors():
+        cases[f"clean_response[{name}]"] = (
+            synthetic_responses,
+            lambda responses, clean=clean: [clean(response) for response in responses],
+            per_item
+        )
+    return cases
+
+
+def measure(
+    setup: Callable[[int], Any],
+    run: Callable[[Any], Any],
+    units: Callable[[int], int],
+    size: int,
+    repeat: int
+) -> Dict[str, float]:
+    """
+    Time one case at one size.
+
+    Args:
+        setup: Input builder (not timed)
+        run: Measured call
+        units: Items processed by one call at this size
+        size: Input size
+        repeat: Timed repetitions (the best is kept)
+
+    Returns:
+        Seconds, throughput (items/s) and peak traced memory
+    """
+    # Warm-up run so lazy imports and caches stay out of the timings
+    run(setup(size))
+
+    times = []
+    for _ in range(repeat):
+        data = setup(size)
+        start = time.perf_counter()
+        run(data)
+        times.append(time.perf_counter() - start)
+
+    # Separate run for memory so tracemalloc overhead stays out of the timings
+    data = setup(size)
+    tracemalloc.start()
+    try:
+        run(data)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    best = min(times)
+    return {
+        'seconds': best,
+        'throughput': units(size) / best if best > 0 else float('inf'),
+        'peak_bytes': peak
+    }
+
+
+def scaling_exponent(points: Dict[int, Dict[str, float]]) -> Optional[float]:
+    """
+    Fit log(time) = k * log(size) + c and return k.
+
+    Args:
+        points: Measurements keyed by size
+
+    Returns:
+        Exponent, or None with fewer than two sizes
+    """
+    pairs = [(math.log(size), math.log(m['seconds'])) for size, m in points.items() if m['seconds'] > 0]
+    if len(pairs) < 2:
+        return None
+    mean_x = sum(x for x, _ in pairs) / len(pairs)
+    mean_y = sum(y for _, y in pairs) / len(pairs)
+    denominator = sum((x - mean_x) ** 2 for x, _ in pairs)
+    if denominator == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in pairs) / denominator
+
+
+def run_benchmarks(
+    cases: Dict[str, Tuple[Callable, Callable, Callable]],
+    sizes: Dict[str, List[int]],
+    repeat: int = 5,
+    only: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Run the selected cases at each size.
+
+    Args:
+        cases: Cases from build_cases()
+        sizes: Sizes keyed by case name prefix
+        repeat: Timed repetitions per size
+        only: Case name prefixes to run (default: all)
+
+    Returns:
+        Report with environment details and per-case results (a case that
+        raised records the exception under 'error')
+    """
+    results = {}
+    for name, (setup, run, units) in cases.items():
+        base = name.split('[')[0]
+        if only and base not in only and name not in only:
+            continue
+        points = {}
+        error = None
+        for size in sizes.get(base, []):
+            try:
+                points[size] = measure(setup, run, units, size, repeat)
+            except Exception as e:
+                error = f"{type(e).__name__}: {str(e)}"
+                print(f"{name:32s} {size:>8d}  FAILED  {error}")
+                break
+            print(f"{name:32s} {size:>8d}  {points[size]['seconds'] * 1000:10.3f} ms  "
+                  f"{points[size]['throughput']:14,.0f}/s  {points[size]['peak_bytes'] / 1024:10.1f} KiB")
+        exponent = scaling_exponent(points)
+        results[name] = {
+            'points': {str(size): m for size, m in points.items()},
+            'scaling_exponent': round(exponent, 3) if exponent is not None else None
+        }
+        if error:
+            results[name]['error'] = error
+        if exponent is not None:
+            print(f"{name:32s} scaling exponent {exponent:.2f}")
+
+    return {
+        'recorded_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'repeat': repeat,
+        'results': results
+    }
+
+
+def compare(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float,
+    min_seconds: float = 0.005
+) -> List[str]:
+    """
+    Find cases that got slower than the baseline.
+
+    Args:
+        report: Current report
+        baseline: Saved report
+        tolerance: Allowed slowdown as a fraction (0.25 = 25%)
+        min_seconds: Baseline timings below this are too noisy to judge
+
+    Returns:
+        Regression descriptions (empty if none)
+    """
+    regressions = []
+    for name, result in report['results'].items():
+        old = baseline.get('results', {}).get(name)
+        if not old:
+            continue
+        for size, point in result['points'].items():
+            old_point = old['points'].get(size)
+            if not old_point or old_point['seconds'] < min_seconds:
+                continue
+            ratio = point['seconds'] / old_point['seconds']
+            marker = 'REGRESSION' if ratio > 1 + tolerance else 'ok'
+            print(f"{name:32s} {size:>8s}  {ratio:6.2f}x baseline  {marker}")
+            if ratio > 1 + tolerance:
+                regressions.append(f"{name} at {size}: {ratio:.2f}x slower")
+    return regressions
+
+
+def main() -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark extraction, sampling and output cleanup")
+    parser.add_argument('--cases', help="Comma-separated case names (default: all)")
+    parser.add_argument('--sizes', help="Comma-separated sizes used for every selected case")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed repetitions per size (best is kept)")
+    parser.add_argument('--save', help="Write the report to this JSON file")
+    parser.add_argument('--compare', help="Compare against a saved report")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed slowdown before failing")
+    parser.add_argument('--workdir', help="Directory for generated PDFs (default: temporary)")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    random.seed(0)
+
+    sizes = dict(DEFAULT_SIZES)
+    if args.sizes:
+        custom = [int(size) for size in args.sizes.split(',')]
+        sizes = {name: custom for name in sizes}
+    only = args.cases.split(',') if args.cases else None
+
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix='nietzsche_bench_'))
+    workdir.mkdir(parents=True, exist_ok=True)
+    try:
+        report = run_benchmarks(build_cases(workdir), sizes, repeat=args.repeat, only=only)
+    finally:
+        # Generated PDFs are kept only in a directory the caller chose
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.save:
+        Path(args.save).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.save).write_text(json.dumps(report, indent=2))
+        print(f"\nSaved report to {args.save}")
+
+    failed = {name: result['error'] for name, result in report['results'].items() if 'error' in result}
+    if failed:
+        print("\nFailed cases:")
+        for name, error in failed.items():
+            print(f"  {name}: {error}")
+
+    if args.compare:
+        print(f"\nComparing against {args.compare} (tolerance {args.tolerance:.0%})")
+        regressions = compare(report, json.loads(Path(args.compare).read_text()), args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("No regressions")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,275 @@
+"""
+Persisted Bloom filters for "already used" checks over very large corpora.
+
+A Bloom filter answers "definitely not seen" or "probably seen" using a few
+bits per key, so millions of used sentence and output hashes per account fit
+in a few megabytes instead of Python sets. Filters live in files and are
+opened through mmap: startup maps the file instead of reading it, pages are
+loaded on first touch and writes go straight to the page cache.
+
+ScalableBloomFilter (Almeida et al., 2007) adds slices of growing capacity
+and tightening error rates as keys are added, so the overall false-positive
+rate stays under the configured bound without knowing the final size.
+"""
+import hashlib
+import logging
+import math
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+_MAGIC = b'NZBLOOM1'
+# magic, hash count, bit count, capacity, error rate, keys added
+_HEADER = struct.Struct('<8sIQQdQ')
+_COUNT_OFFSET = _HEADER.size - 8
+
+
+def optimal_parameters(capacity: int, error_rate: float) -> tuple:
+    """
+    Size a filter for a capacity and false-positive rate.
+
+    Args:
+        capacity: Keys the filter should hold
+        error_rate: Target false-positive probability at capacity
+
+    Returns:
+        Tuple of (bit count, hash count)
+    """
+    bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+    bits = max(64, (bits + 7) // 8 * 8)
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+
+def _key_hashes(key: str) -> tuple:
+    """Two independent 64-bit hashes of a key for double hashing."""
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter stored in an mmap'd file."""
+
+    def __init__(self, path: str, capacity: int = 100000, error_rate: float = 0.001):
+        """
+        Open a filter file, creating it sized for capacity and error_rate.
+
+        An existing file keeps the parameters it was created with.
+
+        Args:
+            path: Filter file
+            capacity: Keys the filter is sized for
+            error_rate: False-positive probability at capacity
+        """
+        self.path = path
+        if not os.path.exists(path) or os.path.getsize(path) < _HEADER.size:
+            bits, hashes = optimal_parameters(capacity, error_rate)
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(_HEADER.pack(_MAGIC, hashes, bits, capacity, error_rate, 0))
+                f.truncate(_HEADER.size + bits // 8)
+
+        self._file = open(path, 'r+b')
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        magic, self.hashes, self.bits, self.capacity, self.error_rate, _ = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC or len(self._mm) != _HEADER.size + self.bits // 8:
+            self.close()
+            raise ValueError(f"{path} is not a valid Bloom filter file")
+
+    @property
+    def count(self) -> int:
+        """Keys added so far."""
+        return struct.unpack_from('<Q', self._mm, _COUNT_OFFSET)[0]
+
+    @property
+    def full(self) -> bool:
+        """Whether the filter reached its sized capacity."""
+        return self.count >= self.capacity
+
+    def _positions(self, key: str) -> Iterable[int]:
+        h1, h2 = _key_hashes(key)
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.bits
+
+    def __contains__(self, key: str) -> bool:
+        mm = self._mm
+        offset = _HEADER.size
+        for position in self._positions(key):
+            if not mm[offset + (position >> 3)] & (1 << (position & 7)):
+                return False
+        return True
+
+    def add(self, key: str) -> bool:
+        """
+        Add a key.
+
+        Args:
+            key: Key to add
+
+        Returns:
+            True if the key was new (at least one bit changed)
+        """
+        mm = self._mm
+        offset = _HEADER.size
+        changed = False
+        for position in self._positions(key):
+            index = offset + (position >> 3)
+            mask = 1 << (position & 7)
+            byte = mm[index]
+            if not byte & mask:
+                mm[index] = byte | mask
+                changed = True
+        if changed:
+            struct.pack_into('<Q', mm, _COUNT_OFFSET, self.count + 1)
+        return changed
+
+    def flush(self) -> None:
+        """Write dirty pages to disk."""
+        self._mm.flush()
+
+    def close(self) -> None:
+        """Flush and unmap the file."""
+        if not self._mm.closed:
+            self._mm.flush()
+            self._mm.close()
+        self._file.close()
+
+
+class ScalableBloomFilter:
+    """Bloom filter that adds slices as it fills, keeping a bounded error rate."""
+
+    def __init__(
+        self,
+        directory: str,
+        initial_capacity: int = 100000,
+        error_rate: float = 0.001,
+        growth: int = 2,
+        tightening: float = 0.5
+    ):
+        """
+        Open (or create) a filter stored as slice files in a directory.
+
+        Args:
+            directory: Directory holding slice-<n>.bloom files
+            initial_capacity: Capacity of the first slice
+            error_rate: Bound on the overall false-positive rate
+            growth: Capacity multiplier for each new slice
+            tightening: Error-rate multiplier for each new slice
+        """
+        self.logger = logging.getLogger(__name__)
+        self.directory = Path(directory)
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.growth = growth
+        self.tightening = tightening
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.slices: List[BloomFilter] = []
+        for index in range(len(list(self.directory.glob('slice-*.bloom')))):
+            path = self.directory / f"slice-{index}.bloom"
+            if not path.exists():
+                break
+            self.slices.append(BloomFilter(str(path)))
+        if not self.slices:
+            self._add_slice()
+
+    @property
+    def created(self) -> bool:
+        """Whether the filter is brand new (nothing added yet, e.g. needs seeding)."""
+        return len(self.slices) == 1 and self.slices[0].count == 0
+
+    def _add_slice(self) -> BloomFilter:
+        index = len(self.slices)
+        capacity = self.initial_capacity * self.growth ** index
+        # Slice error rates form a geometric series summing to error_rate
+        error_rate = self.error_rate * (1 - self.tightening) * self.tightening ** index
+        bloom = BloomFilter(str(self.directory / f"slice-{index}.bloom"), capacity, error_rate)
+        self.slices.append(bloom)
+        if index:
+            self.logger.info(f"Bloom filter {self.directory} grew to {index + 1} slices "
+                             f"({capacity} keys, error rate {error_rate:.2e})")
+        return bloom
+
+    def __contains__(self, key: str) -> bool:
+        return any(key in bloom for bloom in reversed(self.slices))
+
+    def __len__(self) -> int:
+        return sum(bloom.count for bloom in self.slices)
+
+    def add(self, key: str) -> bool:
+        """
+        Add a key unless it is (probably) present already.
+
+        Args:
+            key: Key to add
+
+        Returns:
+            True if the key was added
+        """
+        with self._lock:
+            if key in self:
+                return False
+            bloom = self.slices[-1]
+            if bloom.full:
+                bloom = self._add_slice()
+            return bloom.add(key)
+
+    def stats(self) -> dict:
+        """
+        Describe the filter.
+
+        Returns:
+            Keys, slices, bytes on disk and the configured error rate
+        """
+        return {
+            'keys': len(self),
+            'slices': len(self.slices),
+            'bytes': sum(bloom.bits // 8 for bloom in self.slices),
+            'error_rate': self.error_rate
+        }
+
+    def flush(self) -> None:
+        """Write dirty pages of every slice to disk."""
+        with self._lock:
+            for bloom in self.slices:
+                bloom.flush()
+
+    def close(self) -> None:
+        """Flush and unmap every slice."""
+        with self._lock:
+            for bloom in self.slices:
+                bloom.close()
+            self.slices = []
+
+
+def open_account_filter(
+    directory: str,
+    account: str,
+    initial_capacity: int = 100000,
+    error_rate: float = 0.001,
+    seed: Optional[Iterable[str]] = None
+) -> ScalableBloomFilter:
+    """
+    Open the used-key filter for one posting account.
+
+    Args:
+        directory: Parent directory for all accounts' filters
+        account: Account name (one filter per account)
+        initial_capacity: Capacity of the first slice
+        error_rate: Bound on the false-positive rate
+        seed: Keys added when the filter is created (e.g. from post history)
+
+    Returns:
+        The account's filter
+    """
+    safe = ''.join(c if c.isalnum() or c in '-_.' else '_' for c in account) or 'default'
+    bloom = ScalableBloomFilter(str(Path(directory) / safe), initial_capacity, error_rate)
+    if seed is not None and bloom.created:
+        added = sum(bloom.add(key) for key in seed)
+        bloom.flush()
+        if added:
+            bloom.logger.info(f"Seeded used-key filter for {account} with {added} keys")
+    return bloom
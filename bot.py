@@ -1,64 +1,163 @@
 """
 Main bot application with scheduling and logging.
 """
+import gc
 import os
 import sys
+import json
 import time
+import atexit
+import asyncio
+import argparse
 import logging
 import signal
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
-from threading import Thread
-from http.server import HTTPServer, BaseHTTPRequestHandler
-import schedule
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from threading import Event, Lock, Thread, Timer
+from http.server import ThreadingHTTPServer
 
+import health
+import metrics
+from health import HealthCheckHandler
 from pdf_extractor import PDFExtractor
 from huggingface_processor import HuggingFaceProcessor
 from x_poster import XPoster
+from leader import LeaderLease
+from bloom import ScalableBloomFilter, open_account_filter
+from post_history import PostHistory, used_key
+from pipeline import Pipeline, Rejected, Stage, parse_workers
+from profiling import ProfileSession, Profiler
+from scheduler import HeapScheduler, parse_slots
+from single_flight import SingleFlight
+from structured_logging import correlation_scope, get_correlation_id, setup_logging as setup_structured_logging
+from usage_ledger import LEDGER as USAGE_LEDGER, parse_prices, usage_response
+from watchdog import ResourceWatchdog
 
+# Exit code used when the process asks its supervisor for a restart
+RESTART_EXIT_CODE = 3
 
-class HealthCheckHandler(BaseHTTPRequestHandler):
-    """Simple HTTP handler for health checks."""
-
-    def do_GET(self):
-        """Handle GET requests."""
-        if self.path == '/health' or self.path == '/':
-            self.send_response(200)
-            self.send_header('Content-type', 'text/plain')
-            self.end_headers()
-            self.wfile.write(b'OK - Nietzsche Bot is running')
-        else:
-            self.send_response(404)
-            self.end_headers()
-
-    def log_message(self, format, *args):
-        """Suppress HTTP server logs."""
-        pass
+# Config keys grouped by the component a reload has to rebuild
+RELOAD_COMPONENTS = {
+    'pdf_extractor': ('pdf_path', 'extract_checkpoint_dir', 'extract_checkpoint_pages', 'pdf_lazy', 'pdf_page_cache'),
+    'processor': ('hf_model', 'hf_base_url', 'llm_candidates'),
+    'x_poster': ('x_api_key', 'x_api_secret', 'x_access_token', 'x_access_secret', 'x_api_base_url')
+}
+PROBE_NAMES = {'processor': 'Hugging Face API', 'x_poster': 'X API'}
+RELOAD_SCHEDULE_KEYS = ('post_interval_hours', 'post_slots', 'post_jitter_seconds')
+# Keys wired into long-lived resources at startup; changing them needs a restart
+RESTART_ONLY_KEYS = (
+    'log_dir', 'log_format', 'log_retention_days', 'state_dir', 'history_db',
+    'leader_lease_path', 'leader_lease_name', 'leader_lease_ttl_seconds',
+    'usage_ledger', 'usage_flush_seconds', 'usage_prices',
+    'profile', 'profile_dir', 'profile_keep', 'profile_memory',
+    'watchdog_interval_seconds', 'watchdog_tracemalloc', 'memory_limit_mb', 'memory_action',
+    'pregenerate_count', 'pipeline_workers', 'pipeline_queue_size',
+    'used_filter_dir', 'used_filter_account', 'used_filter_capacity', 'used_filter_error_rate'
+)
+# Post cycle stages in order; generation stops before posting
+PIPELINE_STAGES = ('select', 'rephrase', 'validate', 'post')
+GENERATION_STAGES = PIPELINE_STAGES[:3]
+# Worker threads per stage in bulk runs (the LLM call is the slow stage)
+DEFAULT_STAGE_WORKERS = {'select': 1, 'rephrase': 4, 'validate': 1, 'post': 1}
 
 
 class NietzscheBot:
     """Automated Nietzsche quote posting bot."""
 
-    def __init__(self, config: dict):
+    def __init__(
+        self,
+        config: dict,
+        components: Optional[Dict[str, Any]] = None,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep
+    ):
         """
         Initialize the bot.
 
         Args:
             config: Configuration dictionary
+            components: Pre-built pdf_extractor, processor and x_poster
+                        (skips building them from config, e.g. for simulation)
+            clock: Function returning the current timestamp
+            sleep: Function used to wait between retries
         """
         self.config = config
+        self.clock = clock
+        self.sleep = sleep
         self.running = False
         self.http_server = None
         self.http_thread = None
+        self.log_listener = None
+        self.lease: Optional[LeaderLease] = None
+        self.history: Optional[PostHistory] = None
+        self.used_filter: Optional[ScalableBloomFilter] = None
+        self.used_filter_false_positives = 0
+        self.profiler: Optional[Profiler] = None
+        self.watchdog: Optional[ResourceWatchdog] = None
+        self.restart_requested = False
+        self.shutdown_requested = Event()
+        self._stopped = False
+        self._drain_timer: Optional[Timer] = None
+        self._flush_hooks: List[Tuple[str, Callable[[], None]]] = []
+        self._inflight_dir = Path(config.get('state_dir', 'state')) / 'inflight'
+        self.cache_clearers: List[Callable[[], None]] = [self._release_history_memory, self._clear_page_cache]
+        self._probe_results: Dict[str, bool] = {}
+        self._reload_lock = Lock()
+        self.rephrase_flight = SingleFlight('rephrase', on_shared=metrics.REPHRASE_SHARED.inc)
+        self.pipeline = self._build_pipeline('single')
+        self.bulk_pipeline: Optional[Pipeline] = None
+        health.register_route('/pipeline', self._pipeline_response)
+        self.components_ready = False
+        self.started_at = clock()
+        self.last_post_time: Optional[float] = None
+        self.last_tweet_id: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self.posts_succeeded = 0
+        self.posts_failed = 0
+        self.post_retries = 0
+        self.scheduler = HeapScheduler(
+            state_file=Path(config.get('state_dir', 'state')) / 'schedule.json',
+            clock=clock,
+            heartbeat_interval=config.get('heartbeat_interval_seconds', 30)
+        )
+        health.set_status_provider(self.status)
+        self.register_flush('schedule', self.scheduler.save_state)
         self._setup_logging()
-        self._initialize_components()
+        self._setup_profiling()
+        self._open_history()
+        self._open_used_filter()
+        self._open_usage_ledger()
+        self._recover_inflight()
+        if components:
+            self.pdf_extractor = components['pdf_extractor']
+            self.processor = components['processor']
+            self.x_poster = components['x_poster']
+        else:
+            with self._profiled('startup') as session:
+                self._initialize_components(session)
+        self._start_pdf_fill()
+        self.components_ready = True
+        self._start_watchdog()
 
     def _setup_logging(self) -> None:
         """Configure logging."""
         log_dir = Path(self.config.get('log_dir', 'logs'))
         log_dir.mkdir(exist_ok=True)
 
+        if self.config.get('log_format', 'text') == 'json':
+            # Non-blocking writer thread, daily rotation and per-cycle correlation IDs
+            self.log_listener = setup_structured_logging(
+                str(log_dir),
+                retention_days=self.config.get('log_retention_days', 14)
+            )
+            atexit.register(self._stop_log_listener)
+            self.logger = logging.getLogger(__name__)
+            return
+
         log_file = log_dir / f"nietzsche_bot_{datetime.now().strftime('%Y%m%d')}.log"
 
         logging.basicConfig(
@@ -71,68 +170,777 @@ class NietzscheBot:
         )
         self.logger = logging.getLogger(__name__)
 
-    def _initialize_components(self) -> None:
-        """Initialize PDF extractor, Hugging Face processor, and X poster."""
+    def _setup_profiling(self) -> None:
+        """Enable cProfile/tracemalloc reports when PROFILE is set."""
+        if not self.config.get('profile'):
+            return
+        profile_dir = self.config.get('profile_dir') or str(Path(self.config.get('log_dir', 'logs')) / 'profiles')
+        self.profiler = Profiler(
+            profile_dir,
+            keep=self.config.get('profile_keep', 20),
+            trace_memory=self.config.get('profile_memory', True)
+        )
+        self.logger.info(f"Profiling enabled, reports in {profile_dir}")
+
+    def _profiled(self, label: str):
+        """Context manager profiling a block when profiling is enabled."""
+        return self.profiler.profile(label) if self.profiler else nullcontext()
+
+    def _open_history(self) -> None:
+        """Open the post history store used for dedupe and auditing."""
+        history_db = self.config.get('history_db')
+        if history_db is None:
+            history_db = str(Path(self.config.get('state_dir', 'state')) / 'post_history.sqlite3')
+        if history_db:
+            self.history = PostHistory(history_db)
+            self.register_flush('history', self.history.checkpoint)
+            self.logger.info(f"Post history: {history_db} ({self.history.count()} posts recorded)")
+
+    def _open_used_filter(self) -> None:
+        """Open the per-account Bloom filter of used sentences and outputs."""
+        directory = self.config.get('used_filter_dir')
+        if directory is None:
+            directory = str(Path(self.config.get('state_dir', 'state')) / 'used_filter')
+        if not directory:
+            return
+        account = self.config.get('used_filter_account') or self.config.get('leader_lease_name', 'nietzsche-bot')
+        self.used_filter = open_account_filter(
+            directory,
+            account,
+            initial_capacity=self.config.get('used_filter_capacity', 100000),
+            error_rate=self.config.get('used_filter_error_rate', 0.001),
+            seed=self.history.posted_keys() if self.history else None
+        )
+        self.register_flush('used_filter', self.used_filter.flush)
+        stats = self.used_filter.stats()
+        self.logger.info(f"Used-key filter for {account}: {stats['keys']} keys in {stats['slices']} slice(s), "
+                         f"{stats['bytes'] / 1024:.0f} KiB")
+
+    def _mark_used(self, draft: Dict[str, Any]) -> None:
+        """Add a posted draft's sentence and output to the used-key filter."""
+        if self.used_filter is None:
+            return
+        if draft.get('original'):
+            self.used_filter.add(used_key('sentence', draft['original']))
+        if draft.get('rephrased'):
+            self.used_filter.add(used_key('output', draft['rephrased']))
+
+    def _start_watchdog(self) -> None:
+        """Sample memory and resources in the background (WATCHDOG_INTERVAL_SECONDS=0 disables)."""
+        interval = self.config.get('watchdog_interval_seconds', 300)
+        if not interval:
+            return
+        self.watchdog = ResourceWatchdog(
+            interval=interval,
+            memory_limit_mb=self.config.get('memory_limit_mb', 0),
+            action=self.config.get('memory_action', 'log'),
+            drop_caches=self.drop_caches,
+            restart=self.request_restart,
+            trace_allocations=self.config.get('watchdog_tracemalloc', False),
+            clock=self.clock,
+            state_file=str(Path(self.config.get('state_dir', 'state')) / 'watchdog.json')
+        )
+        self.register_flush('watchdog', self.watchdog.save_state)
+        health.register_route('/resources', self._resources_response)
+        self.watchdog.start()
+        self.logger.info(f"Resource watchdog sampling every {interval}s")
+
+    def _resources_response(self) -> health.Response:
+        """Serve the watchdog report as JSON."""
+        body = json.dumps(self.watchdog.report(), indent=2).encode('utf-8')
+        return 200, 'application/json', body
+
+    def drop_caches(self) -> None:
+        """Release registered caches, then run a full garbage collection so their memory can be reclaimed."""
+        for clear in self.cache_clearers:
+            try:
+                clear()
+            except Exception as e:
+                self.logger.warning(f"Could not drop cache: {str(e)}")
+        collected = gc.collect()
+        self.logger.info(f"Dropped {len(self.cache_clearers)} cache(s), garbage collection freed {collected} objects")
+
+    def _release_history_memory(self) -> None:
+        """Shrink the post history's SQLite page cache."""
+        if self.history:
+            self.history.release_memory()
+
+    def request_restart(self) -> None:
+        """Drain and exit so the process's supervisor restarts it."""
+        self.logger.warning("Restart requested")
+        self.restart_requested = True
+        self.request_shutdown()
+
+    def request_shutdown(self) -> None:
+        """
+        Start a draining shutdown (safe to call from a signal handler).
+
+        No new jobs start; the post cycle in flight may finish until
+        SHUTDOWN_DEADLINE_SECONDS, after which state is flushed and the
+        process exits with the cycle checkpointed in STATE_DIR/inflight.
+        """
+        if self.shutdown_requested.is_set():
+            return
+        self.shutdown_requested.set()
+        deadline = self.config.get('shutdown_deadline_seconds', 60)
+        self.logger.info(f"Draining: waiting up to {deadline}s for the current cycle")
+        self._drain_timer = Timer(deadline, self._drain_deadline_expired)
+        self._drain_timer.daemon = True
+        self._drain_timer.start()
+        self.scheduler.stop()
+
+    def _drain_deadline_expired(self) -> None:
+        """Flush state and exit when the in-flight cycle outlives the drain deadline."""
+        self.logger.error("Drain deadline expired with a post cycle still in flight; exiting")
+        self.flush_state()
+        self._stop_log_listener()
+        os._exit(RESTART_EXIT_CODE if self.restart_requested else 1)
+
+    def register_flush(self, name: str, flush: Callable[[], None]) -> None:
+        """
+        Register a callable that persists buffered state on shutdown.
+
+        Args:
+            name: Name used in log messages
+            flush: Callable taking no arguments
+        """
+        self._flush_hooks.append((name, flush))
+
+    def flush_state(self) -> None:
+        """Run every flush hook (never raises)."""
+        for name, flush in self._flush_hooks:
+            try:
+                flush()
+            except Exception as e:
+                self.logger.warning(f"Could not flush {name}: {str(e)}")
+
+    def _inflight_path(self, draft: Dict[str, Any]) -> Path:
+        """Checkpoint file of one post cycle (concurrent cycles each get their own)."""
+        if 'cycle_id' not in draft:
+            correlation_id = get_correlation_id()
+            draft['cycle_id'] = correlation_id if correlation_id != '-' else uuid.uuid4().hex[:12]
+        return self._inflight_dir / f"{draft['cycle_id']}.json"
+
+    def _checkpoint_inflight(self, stage: str, draft: Dict[str, Any]) -> None:
+        """Record the stage of a running post cycle so an interrupted one can be recovered."""
+        path = self._inflight_path(draft)
+        record = {
+            'stage': stage,
+            'correlation_id': get_correlation_id(),
+            'updated_at': self.clock(),
+            'draft': draft
+        }
         try:
-            # Initialize PDF extractor
-            pdf_path = self.config['pdf_path']
-            self.logger.info(f"Loading PDF from {pdf_path}")
-            self.pdf_extractor = PDFExtractor(pdf_path)
-            self.logger.info(f"Loaded {self.pdf_extractor.get_sentence_count()} sentences")
-
-            # Initialize Hugging Face processor (completely free!)
-            model = self.config.get('hf_model', 'mistralai/Mistral-7B-Instruct-v0.2')
-            self.logger.info(f"Connecting to Hugging Face API (model: {model})")
-            self.processor = HuggingFaceProcessor(model=model)
+            self._inflight_dir.mkdir(parents=True, exist_ok=True)
+            tmp_file = path.with_suffix('.tmp')
+            tmp_file.write_text(json.dumps(record, indent=2))
+            os.replace(tmp_file, path)
+        except OSError as e:
+            self.logger.warning(f"Could not checkpoint post cycle: {str(e)}")
+
+    def _clear_inflight(self, draft: Dict[str, Any]) -> None:
+        """Delete a finished post cycle's checkpoint."""
+        if 'cycle_id' in draft:
+            self._inflight_path(draft).unlink(missing_ok=True)
+
+    def _recover_inflight(self) -> None:
+        """Handle post cycles left unfinished by the previous process."""
+        if not self._inflight_dir.is_dir():
+            return
+        for path in sorted(self._inflight_dir.glob('*.json')):
+            try:
+                record = json.loads(path.read_text())
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"Ignoring unreadable checkpoint {path}: {str(e)}")
+                record = {}
+
+            draft = record.get('draft') or {}
+            if record.get('stage') == 'posting':
+                # The tweet may or may not have gone out, so it is not retried
+                self.logger.warning(f"Previous process stopped while posting "
+                                    f"(cycle {record.get('correlation_id')}); not retrying to avoid a duplicate")
+                self._record_history('interrupted', draft, error='Process stopped while posting')
+                self._mark_used(draft)
+            elif record:
+                self.logger.info(f"Previous process stopped during the {record.get('stage')} stage; "
+                                 f"nothing was posted")
+            path.unlink(missing_ok=True)
+        # Checkpoints whose write never completed
+        for path in self._inflight_dir.glob('*.tmp'):
+            path.unlink(missing_ok=True)
+
+    def _open_usage_ledger(self) -> None:
+        """Persist per-provider LLM usage and serve daily rollups at /usage."""
+        ledger_path = self.config.get('usage_ledger')
+        if ledger_path is None:
+            ledger_path = str(Path(self.config.get('state_dir', 'state')) / 'usage.jsonl')
+        if not ledger_path:
+            return
+        USAGE_LEDGER.open(
+            ledger_path,
+            flush_interval=self.config.get('usage_flush_seconds', 60),
+            prices=parse_prices(self.config.get('usage_prices'))
+        )
+        self.register_flush('usage', USAGE_LEDGER.flush)
+        health.register_route('/usage', usage_response)
+
+    def _initialize_components(self, session: Optional[ProfileSession] = None) -> None:
+        """
+        Build PDF extractor, Hugging Face processor and X poster concurrently, probing the APIs once.
+
+        Args:
+            session: Startup profiling session; the builders are profiled in their threads
+        """
+        started = time.perf_counter()
+        wrap = session.wrap if session else (lambda func: func)
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix='init') as pool:
+            pdf_future = pool.submit(wrap(self._build_pdf_extractor))
+            processor_future = pool.submit(wrap(self._build_processor))
+            x_poster_future = pool.submit(wrap(self._build_x_poster))
+            try:
+                self.pdf_extractor = pdf_future.result()
+                self.processor = processor_future.result()
+                self.x_poster = x_poster_future.result()
+            except Exception as e:
+                self.logger.error(f"Failed to initialize components: {str(e)}")
+                raise
+        self.logger.info(f"Components initialized in {time.perf_counter() - started:.2f}s")
+
+    def _build_pdf_extractor(self) -> PDFExtractor:
+        """Load the PDF corpus."""
+        pdf_path = self.config['pdf_path']
+        self.logger.info(f"Loading PDF from {pdf_path}")
+        checkpoint_dir = self.config.get('extract_checkpoint_dir')
+        if checkpoint_dir is None:
+            checkpoint_dir = str(Path(self.config.get('state_dir', 'state')) / 'extract')
+        pdf_extractor = PDFExtractor(
+            pdf_path,
+            checkpoint_dir=checkpoint_dir or None,
+            checkpoint_pages=self.config.get('extract_checkpoint_pages', 50),
+            lazy=self.config.get('pdf_lazy', False),
+            page_cache_size=self.config.get('pdf_page_cache', 64)
+        )
+        if pdf_extractor.complete.is_set():
+            self.logger.info(f"Loaded {pdf_extractor.get_sentence_count()} sentences")
+        return pdf_extractor
+
+    def _start_pdf_fill(self) -> None:
+        """Start the lazy extractor's background load once it is the one in use."""
+        start_fill = getattr(getattr(self, 'pdf_extractor', None), 'start_fill', None)
+        if start_fill:
+            start_fill()
+
+    def _clear_page_cache(self) -> None:
+        """Drop the lazy extractor's on-demand pages."""
+        clear = getattr(getattr(self, 'pdf_extractor', None), 'clear_page_cache', None)
+        if clear:
+            clear()
+
+    def _build_processor(self) -> HuggingFaceProcessor:
+        """Create the Hugging Face processor (completely free!) and probe it."""
+        model = self.config.get('hf_model', 'mistralai/Mistral-7B-Instruct-v0.2')
+        self.logger.info(f"Connecting to Hugging Face API (model: {model})")
+        processor = HuggingFaceProcessor(
+            model=model,
+            verify=False,
+            base_url=self.config.get('hf_base_url'),
+            candidates=self.config.get('llm_candidates')
+        )
+        connected = self._probe_results['Hugging Face API'] = processor.test_connection()
+        if connected:
             self.logger.info("Hugging Face API connection established")
+        else:
+            self.logger.warning("Hugging Face API connection test failed")
+        return processor
 
-            # Initialize X poster
-            self.logger.info("Initializing X API client")
-            self.x_poster = XPoster(
-                consumer_key=self.config['x_api_key'],
-                consumer_secret=self.config['x_api_secret'],
-                access_token=self.config['x_access_token'],
-                access_token_secret=self.config['x_access_secret']
-            )
-            self.logger.info("X API client initialized")
+    def _build_x_poster(self) -> XPoster:
+        """Create the X API client and probe it."""
+        self.logger.info("Initializing X API client")
+        x_poster = XPoster(
+            consumer_key=self.config['x_api_key'],
+            consumer_secret=self.config['x_api_secret'],
+            access_token=self.config['x_access_token'],
+            access_token_secret=self.config['x_access_secret'],
+            verify=False,
+            api_base_url=self.config.get('x_api_base_url')
+        )
+        self._probe_results['X API'] = x_poster.test_connection()
+        self.logger.info("X API client initialized")
+        return x_poster
 
-        except Exception as e:
-            self.logger.error(f"Failed to initialize components: {str(e)}")
-            raise
+    def request_reload(self) -> None:
+        """Reload config in a background thread (safe to call from a signal handler)."""
+        Thread(target=self.reload, name='config-reload', daemon=True).start()
+
+    def reload(self, new_config: Optional[dict] = None) -> bool:
+        """
+        Apply a changed configuration without restarting.
+
+        Only components whose settings changed are rebuilt. They are built
+        while the old ones keep serving scheduled posts, then swapped in
+        together. Schedule changes keep the time of the last post as anchor.
+
+        Args:
+            new_config: Configuration to apply (defaults to re-reading
+                        ENV_FILE and the environment)
+
+        Returns:
+            True if the new configuration was applied
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            self.logger.warning("Reload already in progress; ignoring")
+            return False
 
-    def post_quote(self) -> None:
-        """Generate and post a Nietzsche quote."""
         try:
-            self.logger.info("Starting quote posting process")
+            if new_config is None:
+                try:
+                    read_env_file(self.config.get('env_file', '.env'))
+                    new_config = load_config()
+                except Exception as e:
+                    self.logger.error(f"Reload failed, keeping the running configuration: {str(e)}")
+                    return False
+
+            changed = {key for key in set(self.config) | set(new_config)
+                       if self.config.get(key) != new_config.get(key)}
+            if not changed:
+                self.logger.info("Reload: configuration unchanged")
+                return True
+
+            ignored = sorted(changed & set(RESTART_ONLY_KEYS))
+            if ignored:
+                self.logger.warning(f"Reload: {', '.join(ignored)} changed but need a restart; keeping old values")
+                for key in ignored:
+                    new_config[key] = self.config.get(key)
+
+            builders = {
+                'pdf_extractor': self._build_pdf_extractor,
+                'processor': self._build_processor,
+                'x_poster': self._build_x_poster
+            }
+            rebuild = [name for name, keys in RELOAD_COMPONENTS.items() if changed & set(keys)]
+            self.logger.info(f"Reload: changed {', '.join(sorted(changed))}; "
+                             f"rebuilding {', '.join(rebuild) or 'nothing'}")
+
+            # Builders read self.config, so give them the new values while old components keep running
+            old_config, self.config = self.config, new_config
+            try:
+                components = {name: builders[name]() for name in rebuild}
+                for name in rebuild:
+                    probe = PROBE_NAMES.get(name)
+                    if probe and not self._probe_results.pop(probe, True):
+                        raise Exception(f"{probe} connection test failed")
+            except Exception as e:
+                self.config = old_config
+                self.logger.error(f"Reload failed, keeping the running configuration: {str(e)}")
+                return False
 
-            # Get random sentence
-            original_quote = self.pdf_extractor.get_random_sentence()
-            self.logger.info(f"Selected quote: {original_quote[:50]}...")
+            for name, component in components.items():
+                old = getattr(self, name, None)
+                setattr(self, name, component)
+                if name == 'pdf_extractor':
+                    # Stop the old background load before the new one writes the same checkpoint
+                    if hasattr(old, 'close'):
+                        old.close()
+                    self._start_pdf_fill()
+            if changed & set(RELOAD_SCHEDULE_KEYS):
+                self._reschedule_posts()
+            self.logger.info("Reload complete")
+            return True
+        finally:
+            self._reload_lock.release()
+
+    def _reschedule_posts(self) -> None:
+        """Re-register the posting job, keeping interval runs anchored to the last run."""
+        old_job = self.scheduler.get_job('post_quote')
+        self._schedule_posts()
+        job = self.scheduler.get_job('post_quote')
+        if old_job and job and not old_job.slots and not job.slots and old_job.base_run is not None:
+            last_run = old_job.base_run - old_job.interval_seconds
+            self.scheduler.reschedule('post_quote', max(self.clock(), last_run + job.interval_seconds))
+
+    def _select_sentence(self) -> Tuple[Optional[int], str]:
+        """
+        Pick a random sentence, skipping ones already posted.
 
-            # Rephrase using Hugging Face
-            self.logger.info("Rephrasing quote with Hugging Face API")
-            rephrased_quote = self.processor.rephrase_quote(original_quote)
-            self.logger.info(f"Rephrased quote: {rephrased_quote[:50]}...")
+        Returns:
+            Tuple of (sentence index, sentence)
+        """
+        attempts = self.config.get('dedupe_attempts', 10)
+        for _ in range(attempts):
+            index, sentence = self.pdf_extractor.get_random_entry()
+            if self.used_filter is not None:
+                # A miss is definitive; a hit is confirmed against the history when there is one
+                if used_key('sentence', sentence) not in self.used_filter:
+                    return index, sentence
+                if self.history and not self.history.already_posted(sentence=sentence):
+                    self.used_filter_false_positives += 1
+                    return index, sentence
+                continue
+            # Match by sentence text: indexes differ between lazy and full extraction
+            if not self.history or not self.history.already_posted(sentence=sentence):
+                return index, sentence
+        self.logger.warning(f"Every sampled sentence was already posted ({attempts} tries); reusing one")
+        return index, sentence
 
-            # Post to X
+    def _build_pipeline(self, name: str, stage_names: Sequence[str] = PIPELINE_STAGES, **kwargs) -> Pipeline:
+        """
+        Create a pipeline over the bot's stage functions.
+
+        Args:
+            name: Pipeline label
+            stage_names: Stages to include, in order
+            **kwargs: Passed to Pipeline (on_result, on_error)
+
+        Returns:
+            Pipeline using PIPELINE_WORKERS and PIPELINE_QUEUE_SIZE
+        """
+        functions = {
+            'select': self._stage_select,
+            'rephrase': self._stage_rephrase,
+            'validate': self._stage_validate,
+            'post': self._stage_post
+        }
+        workers = self.config.get('pipeline_workers') or {}
+        queue_size = self.config.get('pipeline_queue_size', 8)
+        stages = [
+            Stage(stage, functions[stage], workers.get(stage, DEFAULT_STAGE_WORKERS[stage]), queue_size)
+            for stage in stage_names
+        ]
+        return Pipeline(stages, name=name, **kwargs)
+
+    def _stage_select(self, draft: Dict[str, Any]) -> Dict[str, Any]:
+        """Pipeline stage: pick a source sentence."""
+        with metrics.track_stage('select') as timing:
+            sentence_index, original_quote = self._select_sentence()
+        self.logger.info(f"Selected quote: {original_quote[:50]}...")
+        draft.update(original=original_quote, work=self.pdf_extractor.work, sentence_index=sentence_index)
+        draft.setdefault('timings', {})['select'] = timing.seconds
+        return draft
+
+    def _stage_rephrase(self, draft: Dict[str, Any]) -> Dict[str, Any]:
+        """Pipeline stage: rephrase the sentence (identical concurrent requests share one call)."""
+        processor = self.processor
+        provider = type(processor).__name__.replace('Processor', '').lower()
+        model = getattr(processor, 'model', None)
+        self.logger.info("Rephrasing quote with Hugging Face API")
+        with metrics.track_stage('rephrase') as timing:
+            rephrased_quote = self.rephrase_flight.do(
+                (provider, model, draft['original']), processor.rephrase_quote, draft['original']
+            )
+        self.logger.info(f"Rephrased quote: {rephrased_quote[:50]}...")
+        draft.update(rephrased=rephrased_quote, provider=provider, model=model)
+        draft.setdefault('timings', {})['rephrase'] = timing.seconds
+        return draft
+
+    def _stage_validate(self, draft: Dict[str, Any]) -> Dict[str, Any]:
+        """Pipeline stage: reject drafts that cannot be posted."""
+        rephrased = (draft.get('rephrased') or '').strip()
+        if not rephrased:
+            raise Rejected("Rephrased quote is empty")
+        draft['rephrased'] = rephrased
+        if self.used_filter is not None and used_key('output', rephrased) not in self.used_filter:
+            return draft
+        if self.history and self.history.output_posted(rephrased):
+            self.logger.warning("Rephrased quote was already posted before")
+        return draft
+
+    def _stage_post(self, draft: Dict[str, Any]) -> Dict[str, Any]:
+        """Pipeline stage: post the draft to X and record the success."""
+        # Confirm leadership right before posting (fences a stale leader)
+        if self.lease and not self.lease.ensure_leader():
+            raise Rejected("Lost leadership before posting")
+
+        self._checkpoint_inflight('posting', draft)
+        try:
             self.logger.info("Posting to X")
-            tweet_id = self.x_poster.post_tweet(rephrased_quote)
+            with metrics.track_stage('post') as timing:
+                tweet_id = self._post_with_retries(draft['rephrased'])
             self.logger.info(f"Successfully posted tweet: {tweet_id}")
+            self.last_post_time = self.clock()
+            if self.lease:
+                self.lease.record_post(self.last_post_time)
+            self.last_tweet_id = tweet_id
+            self.posts_succeeded += 1
+            draft.setdefault('timings', {})['post'] = timing.seconds
+            draft['tweet_id'] = tweet_id
+            self._record_history('posted', draft, tweet_id=tweet_id)
+            self._mark_used(draft)
+        finally:
+            # Posted and recorded, or failed in this process: nothing left to recover
+            self._clear_inflight(draft)
+        return draft
+
+    def _post_failed(self, draft: Dict[str, Any], error: Exception) -> None:
+        """Record a post cycle that failed."""
+        self.logger.error(f"Error posting quote: {str(error)}", exc_info=error)
+        self.last_error = str(error)
+        self.posts_failed += 1
+        self._record_history('failed', draft, error=str(error))
+
+    def generate_quote(self) -> Dict[str, Any]:
+        """
+        Select a random sentence, rephrase and validate it.
+
+        Returns:
+            Draft dictionary with the original and rephrased quote, source
+            position, provider details and stage timings
+        """
+        return self.pipeline.process({}, only=GENERATION_STAGES)
+
+    def generate_bulk(
+        self,
+        count: int,
+        post: bool = False,
+        on_draft: Optional[Callable[[Dict[str, Any]], None]] = None,
+        pace: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Run many drafts through the concurrent staged pipeline.
+
+        Each stage has its own worker pool (PIPELINE_WORKERS) and the stages
+        are linked by bounded queues (PIPELINE_QUEUE_SIZE), so a slow LLM
+        holds back selection instead of piling up drafts. Feeding stops when
+        shutdown is requested; drafts already in the pipeline finish.
+
+        Args:
+            count: Number of drafts
+            post: Also post each draft to X
+            on_draft: Called with each finished draft (default: collect them)
+            pace: Drafts started per second (None = as fast as the stages allow)
+
+        Returns:
+            Finished drafts (empty when on_draft is set)
+        """
+        def on_error(stage: str, draft: Dict[str, Any], error: Exception) -> None:
+            if post and not isinstance(error, Rejected):
+                self._post_failed(draft, error)
+            elif isinstance(error, Rejected):
+                self.logger.warning(f"Draft rejected at {stage}: {str(error)}")
+            else:
+                self.logger.error(f"Draft failed at {stage}: {str(error)}")
+
+        def feed():
+            start = time.perf_counter()
+            for index in range(count):
+                if self.shutdown_requested.is_set():
+                    self.logger.info(f"Shutdown requested; stopping bulk run after {index} drafts")
+                    return
+                if pace:
+                    wait = start + index / pace - time.perf_counter()
+                    if wait > 0:
+                        time.sleep(wait)
+                yield {}
+
+        stage_names = PIPELINE_STAGES if post else GENERATION_STAGES
+        self.bulk_pipeline = self._build_pipeline('bulk', stage_names, on_result=on_draft, on_error=on_error)
+        self.logger.info(f"Bulk run: {count} drafts through {' -> '.join(stage_names)}")
+        drafts = self.bulk_pipeline.run(feed())
+        for stage in self.bulk_pipeline.stats()['stages']:
+            self.logger.info(f"Bulk {stage['stage']}: {stage['processed']} processed, {stage['rejected']} "
+                             f"rejected, {stage['errors']} errors, {stage['throughput_per_second']}/s")
+        return drafts
+
+    def _pipeline_response(self) -> Tuple[int, str, bytes]:
+        """Health server handler for /pipeline."""
+        body = {
+            'single': self.pipeline.stats(),
+            'bulk': self.bulk_pipeline.stats() if self.bulk_pipeline else None
+        }
+        return 200, 'application/json', json.dumps(body, indent=2).encode('utf-8')
+
+    def post_quote(self, prepared: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Generate and post a Nietzsche quote.
+
+        Args:
+            prepared: Optional pre-generated draft from generate_quote()
+        """
+        with correlation_scope(), self._profiled('post_cycle'):
+            self._run_post_cycle(prepared)
+
+    def _run_post_cycle(self, prepared: Optional[Dict[str, Any]]) -> None:
+        """Run one post cycle through the pipeline stages (logs carry the cycle's correlation ID)."""
+        if self.lease and not self.lease.is_leader():
+            self.logger.info("Standby replica: skipping post (another replica holds the lease)")
+            return
+
+        draft: Dict[str, Any] = prepared or {}
+        try:
+            self.logger.info("Starting quote posting process")
+            self._checkpoint_inflight('generating', draft)
+
+            with metrics.track_stage('cycle'):
+                if prepared:
+                    self.logger.info(f"Using pre-generated quote: {draft['rephrased'][:50]}...")
+                    stages = ('validate', 'post')
+                else:
+                    stages = PIPELINE_STAGES
+                try:
+                    self.pipeline.process(draft, only=stages)
+                except Rejected as e:
+                    if not self.lease or self.lease.is_leader():
+                        raise
+                    self.logger.warning(f"{str(e)}; skipping")
 
         except Exception as e:
-            self.logger.error(f"Error posting quote: {str(e)}", exc_info=True)
+            self._post_failed(draft, e)
+
+        finally:
+            self._clear_inflight(draft)
+
+    def _post_with_retries(self, text: str) -> Optional[str]:
+        """
+        Post a tweet, retrying failures with exponential backoff.
+
+        Args:
+            text: Tweet text
+
+        Returns:
+            Tweet ID
+        """
+        retries = self.config.get('post_retries', 0)
+        delay = self.config.get('post_retry_delay_seconds', 30)
+        for attempt in range(retries + 1):
+            try:
+                return self.x_poster.post_tweet(text)
+            except Exception as e:
+                if attempt >= retries or self.shutdown_requested.is_set():
+                    raise
+                wait = delay * (2 ** attempt)
+                self.post_retries += 1
+                metrics.POST_RETRIES.inc()
+                self.logger.warning(f"Post failed ({str(e)}), retrying in {wait}s "
+                                    f"(attempt {attempt + 1}/{retries})")
+                self.sleep(wait)
+
+    def _record_history(self, status: str, draft: Dict[str, Any], **fields) -> None:
+        """Write a post attempt to the history store (never raises)."""
+        if not self.history:
+            return
+        try:
+            self.history.record(
+                status,
+                original=draft.get('original'),
+                output=draft.get('rephrased'),
+                work=draft.get('work'),
+                sentence_index=draft.get('sentence_index'),
+                provider=draft.get('provider'),
+                model=draft.get('model'),
+                timings=draft.get('timings'),
+                correlation_id=get_correlation_id(),
+                posted_at=self.clock(),
+                **fields
+            )
+        except Exception as e:
+            self.logger.warning(f"Could not record post history: {str(e)}")
+
+    def status(self) -> dict:
+        """
+        Report pipeline state for the /live and /ready endpoints.
+
+        Readiness requires initialized components and a running scheduler.
+        Liveness requires a recent scheduler heartbeat once it has started.
+
+        Returns:
+            Status dictionary
+        """
+        def iso(timestamp: Optional[float]) -> Optional[str]:
+            return datetime.fromtimestamp(timestamp).isoformat(timespec='seconds') if timestamp else None
+
+        now = self.scheduler.clock()
+        post_job = self.scheduler.get_job('post_quote')
+        heartbeat = self.scheduler.last_heartbeat
+        heartbeat_age = now - heartbeat if heartbeat is not None else None
+        live = heartbeat_age is None or not self.running or \
+            heartbeat_age <= self.config.get('liveness_timeout_seconds', 600)
+        ready = self.components_ready and self.running
+
+        return {
+            'status': 'ready' if ready else ('starting' if not self.components_ready else 'not_ready'),
+            'live': live,
+            'ready': ready,
+            'components_ready': self.components_ready,
+            'scheduler_running': self.running,
+            'role': ('leader' if self.lease.is_leader() else 'standby') if self.lease else 'single',
+            'started_at': iso(self.started_at),
+            'last_heartbeat': iso(heartbeat),
+            'heartbeat_age_seconds': round(heartbeat_age, 1) if heartbeat_age is not None else None,
+            'last_post_time': iso(self.last_post_time),
+            'last_tweet_id': self.last_tweet_id,
+            'next_post_due': iso(post_job.next_run if post_job else None),
+            'posts_succeeded': self.posts_succeeded,
+            'posts_failed': self.posts_failed,
+            'post_retries': self.post_retries,
+            'last_error': self.last_error,
+            'used_filter': dict(
+                self.used_filter.stats(), false_positives=self.used_filter_false_positives
+            ) if self.used_filter is not None else None
+        }
 
     def _start_health_server(self) -> None:
         """Start HTTP server for health checks."""
         port = int(os.getenv('PORT', '10000'))
-        self.http_server = HTTPServer(('0.0.0.0', port), HealthCheckHandler)
+        self.http_server = ThreadingHTTPServer(('0.0.0.0', port), HealthCheckHandler)
         self.logger.info(f"Starting health check server on port {port}")
         self.http_server.serve_forever()
 
+    def _schedule_posts(self) -> None:
+        """Register the posting job using interval or daily slot settings."""
+        interval_hours = self.config.get('post_interval_hours', 2)
+        slots = parse_slots(self.config.get('post_slots'))
+        if slots:
+            self.logger.info(f"Posting at daily slots: {self.config.get('post_slots')}")
+        self.scheduler.add_job(
+            'post_quote',
+            self.post_quote,
+            interval_seconds=interval_hours * 3600,
+            slots=slots,
+            jitter_seconds=self.config.get('post_jitter_seconds', 0)
+        )
+        if self.lease and self.lease.is_leader():
+            self._align_schedule_with_leader()
+
+    def _start_leader_election(self) -> None:
+        """Join leader election when several replicas share LEADER_LEASE_PATH."""
+        lease_path = self.config.get('leader_lease_path')
+        if not lease_path or self.lease:
+            return
+
+        self.lease = LeaderLease(
+            lease_path,
+            name=self.config.get('leader_lease_name', 'nietzsche-bot'),
+            ttl=self.config.get('leader_lease_ttl_seconds', 30),
+            clock=self.clock,
+            on_change=self._on_leadership_change
+        )
+        self.lease.try_acquire()
+        self.lease.start()
+        self.logger.info(f"Leader election enabled ({self.lease.holder_id}): "
+                         f"{'leader' if self.lease.is_leader() else 'standby'}")
+
+    def _on_leadership_change(self, is_leader: bool) -> None:
+        """Keep the shared posting cadence when this replica becomes leader."""
+        if is_leader:
+            self._align_schedule_with_leader()
+        else:
+            self.logger.warning("No longer the leader; posts will be skipped")
+
+    def _align_schedule_with_leader(self) -> None:
+        """Schedule the next post one interval after the last post made by any replica."""
+        job = self.scheduler.get_job('post_quote')
+        last_post = self.lease.last_post_at() if self.lease else None
+        if not job or job.slots or last_post is None:
+            return
+        next_run = last_post + job.interval_seconds
+        self.scheduler.reschedule('post_quote', next_run)
+        self.logger.info(f"Aligned next post with last replica post: "
+                         f"{datetime.fromtimestamp(next_run).isoformat(timespec='seconds')}")
+
     def start(self) -> None:
         """Start the bot with scheduled posting."""
         self.logger.info("Starting Nietzsche Bot")
         self.logger.info(f"Posting interval: {self.config.get('post_interval_hours', 2)} hours")
+        self._start_leader_election()
 
         # Health server is started in main() before initialization
         # so we don't start it again here
@@ -143,56 +951,95 @@ class NietzscheBot:
             self.post_quote()
 
         # Schedule regular posts
-        interval_hours = self.config.get('post_interval_hours', 2)
-        schedule.every(interval_hours).hours.do(self.post_quote)
+        self._schedule_posts()
 
         self.logger.info("Bot started successfully. Press Ctrl+C to stop.")
-        self.running = True
+        self.mark_ready()
 
-        # Run scheduler
+        # Run scheduler (sleeps until the next post is due)
+        if self.shutdown_requested.is_set():
+            return
         try:
-            while self.running:
-                schedule.run_pending()
-                time.sleep(60)  # Check every minute
+            self.scheduler.run_forever()
         except KeyboardInterrupt:
             self.logger.info("Received shutdown signal")
             self.stop()
 
+    def mark_ready(self) -> None:
+        """Flag the scheduler as running and log the time it took to become ready."""
+        self.running = True
+        self.logger.info(f"Ready in {self.clock() - self.started_at:.2f}s")
+
     def stop(self) -> None:
         """Stop the bot."""
+        if self._stopped:
+            return
+        self._stopped = True
         self.logger.info("Stopping Nietzsche Bot")
         self.running = False
-        schedule.clear()
+        self.scheduler.stop()
+        self.flush_state()
+        if self.watchdog:
+            self.watchdog.stop()
+        if self.lease:
+            self.lease.stop()
         if self.http_server:
             self.http_server.shutdown()
+        if self.history:
+            self.history.close()
+            self.history = None
+        if self.used_filter is not None:
+            self.used_filter.close()
+            self.used_filter = None
+        close = getattr(getattr(self, 'pdf_extractor', None), 'close', None)
+        if close:
+            close()
+        USAGE_LEDGER.close()
+        if self._drain_timer:
+            self._drain_timer.cancel()
         self.logger.info("Bot stopped")
+        self._stop_log_listener()
+
+    def _stop_log_listener(self) -> None:
+        """Flush queued log records and stop the writer thread."""
+        if self.log_listener:
+            self.log_listener.stop()
+            self.log_listener = None
 
     def test_components(self) -> bool:
         """
         Test all components.
 
+        Probes run concurrently; API probes already made while building the
+        components are reused instead of being sent again.
+
         Returns:
             True if all tests pass
         """
         self.logger.info("Testing components...")
 
-        try:
-            # Test PDF extractor
-            self.logger.info("Testing PDF extractor")
+        def test_pdf() -> bool:
             test_sentence = self.pdf_extractor.get_random_sentence()
             self.logger.info(f"PDF test successful: {test_sentence[:50]}...")
+            return True
+
+        probes = {
+            'PDF extractor': test_pdf,
+            'Hugging Face API': self.processor.test_connection,
+            'X API': self.x_poster.test_connection
+        }
+        results = {name: self._probe_results.pop(name) for name in list(probes) if name in self._probe_results}
 
-            # Test Hugging Face API
-            self.logger.info("Testing Hugging Face API connection")
-            if not self.processor.test_connection():
-                raise Exception("Hugging Face API connection test failed")
-            self.logger.info("Hugging Face API test successful")
+        try:
+            pending = [name for name in probes if name not in results]
+            with ThreadPoolExecutor(max_workers=len(probes), thread_name_prefix='probe') as pool:
+                futures = {name: pool.submit(probes[name]) for name in pending}
+                for name, future in futures.items():
+                    results[name] = future.result()
 
-            # Test X API
-            self.logger.info("Testing X API connection")
-            if not self.x_poster.test_connection():
-                raise Exception("X API connection test failed")
-            self.logger.info("X API test successful")
+            failed = [name for name in probes if not results[name]]
+            if failed:
+                raise Exception(f"{', '.join(failed)} connection test failed")
 
             self.logger.info("All component tests passed!")
             return True
@@ -202,6 +1049,23 @@ class NietzscheBot:
             return False
 
 
+def read_env_file(path: Optional[str]) -> None:
+    """
+    Load KEY=value lines from an env file into the environment.
+
+    Args:
+        path: Env file path (missing files are ignored)
+    """
+    if not path or not Path(path).exists():
+        return
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#') and '=' in line:
+                key, value = line.split('=', 1)
+                os.environ[key.strip()] = value.strip().strip('"\'')
+
+
 def load_config() -> dict:
     """
     Load configuration from environment variables.
@@ -224,27 +1088,165 @@ def load_config() -> dict:
 
     return {
         'pdf_path': os.getenv('PDF_PATH'),
+        'extract_checkpoint_dir': os.getenv('EXTRACT_CHECKPOINT_DIR'),
+        'extract_checkpoint_pages': int(os.getenv('EXTRACT_CHECKPOINT_PAGES', '50')),
+        'pdf_lazy': os.getenv('PDF_LAZY', 'false').lower() == 'true',
+        'pdf_page_cache': int(os.getenv('PDF_PAGE_CACHE', '64')),
         'x_api_key': os.getenv('X_API_KEY'),
         'x_api_secret': os.getenv('X_API_SECRET'),
         'x_access_token': os.getenv('X_ACCESS_TOKEN'),
         'x_access_secret': os.getenv('X_ACCESS_SECRET'),
+        'env_file': os.getenv('ENV_FILE', '.env'),
         'hf_model': os.getenv('HF_MODEL', 'mistralai/Mistral-7B-Instruct-v0.2'),
+        'hf_base_url': os.getenv('HF_BASE_URL', ''),
+        'llm_candidates': int(os.getenv('LLM_CANDIDATES', '3')),
+        'x_api_base_url': os.getenv('X_API_BASE_URL', ''),
         'post_interval_hours': int(os.getenv('POST_INTERVAL_HOURS', '2')),
+        'post_slots': os.getenv('POST_SLOTS', ''),
+        'post_jitter_seconds': int(os.getenv('POST_JITTER_SECONDS', '0')),
         'post_on_startup': os.getenv('POST_ON_STARTUP', 'false').lower() == 'true',
-        'log_dir': os.getenv('LOG_DIR', 'logs')
+        'post_retries': int(os.getenv('POST_RETRIES', '0')),
+        'post_retry_delay_seconds': float(os.getenv('POST_RETRY_DELAY_SECONDS', '30')),
+        'log_dir': os.getenv('LOG_DIR', 'logs'),
+        'log_format': os.getenv('LOG_FORMAT', 'text').lower(),
+        'log_retention_days': int(os.getenv('LOG_RETENTION_DAYS', '14')),
+        'profile': os.getenv('PROFILE', 'false').lower() in ('1', 'true', 'yes'),
+        'profile_dir': os.getenv('PROFILE_DIR', ''),
+        'profile_keep': int(os.getenv('PROFILE_KEEP', '20')),
+        'profile_memory': os.getenv('PROFILE_MEMORY', 'true').lower() == 'true',
+        'state_dir': os.getenv('STATE_DIR', 'state'),
+        'history_db': os.getenv('HISTORY_DB'),
+        'leader_lease_path': os.getenv('LEADER_LEASE_PATH', ''),
+        'leader_lease_name': os.getenv('LEADER_LEASE_NAME', 'nietzsche-bot'),
+        'leader_lease_ttl_seconds': float(os.getenv('LEADER_LEASE_TTL_SECONDS', '30')),
+        'heartbeat_interval_seconds': int(os.getenv('HEARTBEAT_INTERVAL_SECONDS', '30')),
+        'liveness_timeout_seconds': int(os.getenv('LIVENESS_TIMEOUT_SECONDS', '600')),
+        'pregenerate_count': int(os.getenv('PREGENERATE_COUNT', '1')),
+        'watchdog_interval_seconds': float(os.getenv('WATCHDOG_INTERVAL_SECONDS', '300')),
+        'watchdog_tracemalloc': os.getenv('WATCHDOG_TRACEMALLOC', 'false').lower() == 'true',
+        'memory_limit_mb': float(os.getenv('MEMORY_LIMIT_MB', '0')),
+        'memory_action': os.getenv('MEMORY_ACTION', 'log').lower(),
+        'shutdown_deadline_seconds': float(os.getenv('SHUTDOWN_DEADLINE_SECONDS', '60')),
+        'usage_ledger': os.getenv('USAGE_LEDGER'),
+        'usage_flush_seconds': float(os.getenv('USAGE_FLUSH_SECONDS', '60')),
+        'usage_prices': os.getenv('USAGE_PRICES', ''),
+        'pipeline_workers': parse_workers(os.getenv('PIPELINE_WORKERS', '')),
+        'pipeline_queue_size': int(os.getenv('PIPELINE_QUEUE_SIZE', '8')),
+        'used_filter_dir': os.getenv('USED_FILTER_DIR'),
+        'used_filter_account': os.getenv('USED_FILTER_ACCOUNT', ''),
+        'used_filter_capacity': int(os.getenv('USED_FILTER_CAPACITY', '100000')),
+        'used_filter_error_rate': float(os.getenv('USED_FILTER_ERROR_RATE', '0.001'))
     }
 
 
+def parse_args(argv: Optional[list] = None) -> argparse.Namespace:
+    """
+    Parse command line arguments.
+
+    Args:
+        argv: Argument list (defaults to sys.argv)
+
+    Returns:
+        Parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Nietzsche Quote Bot - X (Twitter) Automation")
+    parser.add_argument(
+        '--async', dest='use_async', action='store_true',
+        help="Run health server, scheduler and posting on a single asyncio loop (same as RUNTIME=asyncio)"
+    )
+    parser.add_argument(
+        '--profile', action='store_true',
+        help="Profile startup and every post cycle, reports go to LOG_DIR/profiles (same as PROFILE=true)"
+    )
+    parser.add_argument(
+        '--generate', type=int, metavar='N',
+        help="Generate N drafts through the staged pipeline and exit (nothing is posted)"
+    )
+    parser.add_argument(
+        '--out', default=None,
+        help="JSON lines file for --generate drafts (default: STATE_DIR/drafts.jsonl)"
+    )
+    return parser.parse_args(argv)
+
+
+def run_generate(count: int, out: Optional[str] = None) -> int:
+    """
+    Bulk-generate drafts without posting.
+
+    Args:
+        count: Number of drafts
+        out: JSON lines file the drafts are appended to
+
+    Returns:
+        Process exit code
+    """
+    config = load_config()
+    path = Path(out or Path(config['state_dir']) / 'drafts.jsonl')
+    path.parent.mkdir(parents=True, exist_ok=True)
+    bot = NietzscheBot(config)
+    signal.signal(signal.SIGINT, lambda signum, frame: bot.request_shutdown())
+    written = 0
+    try:
+        with open(path, 'a') as f:
+            def write(draft: Dict[str, Any]) -> None:
+                nonlocal written
+                f.write(json.dumps(draft) + '\n')
+                written += 1
+            bot.generate_bulk(count, on_draft=write)
+    finally:
+        bot.stop()
+    print(f"Wrote {written} drafts to {path}")
+    return 0
+
+
+def run_async(port: int) -> int:
+    """
+    Run the bot on the asyncio runtime.
+
+    Args:
+        port: Health server port
+
+    Returns:
+        Process exit code
+    """
+    from async_runtime import AsyncRuntime
+
+    try:
+        config = load_config()
+    except Exception as e:
+        print(f"\nFatal error: {str(e)}")
+        return 1
+
+    runtime = AsyncRuntime(
+        lambda: NietzscheBot(config),
+        port=port,
+        pregenerate=config['pregenerate_count'],
+        restart_exit_code=RESTART_EXIT_CODE
+    )
+    return asyncio.run(runtime.run())
+
+
 def main():
     """Main entry point."""
+    args = parse_args()
+    if args.profile:
+        os.environ['PROFILE'] = 'true'
+    if args.generate:
+        sys.exit(run_generate(args.generate, args.out))
+
     print("=" * 60)
     print("Nietzsche Quote Bot - X (Twitter) Automation")
     print("=" * 60)
     print()
 
-    # Start health check server FIRST (before any slow initialization)
+    health.register_route('/metrics', metrics.metrics_response)
+
     port = int(os.getenv('PORT', '10000'))
-    http_server = HTTPServer(('0.0.0.0', port), HealthCheckHandler)
+    if args.use_async or os.getenv('RUNTIME', 'threaded').lower() == 'asyncio':
+        sys.exit(run_async(port))
+
+    # Start health check server FIRST (before any slow initialization)
+    http_server = ThreadingHTTPServer(('0.0.0.0', port), HealthCheckHandler)
     http_thread = Thread(target=http_server.serve_forever, daemon=True)
     http_thread.start()
     print(f"Health check server started on port {port}")
@@ -267,17 +1269,21 @@ def main():
         print("\nAll tests passed! Starting bot...")
         print()
 
-        # Setup signal handlers for graceful shutdown
+        # Setup signal handlers for graceful shutdown: stop scheduling,
+        # let the current post cycle finish, then flush state below
         def signal_handler(signum, frame):
-            print("\nShutdown signal received")
-            bot.stop()
-            sys.exit(0)
+            print("\nShutdown signal received, draining")
+            bot.request_shutdown()
 
         signal.signal(signal.SIGINT, signal_handler)
         signal.signal(signal.SIGTERM, signal_handler)
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, lambda signum, frame: bot.request_reload())
 
         # Start bot (without starting another health server)
         bot.start()
+        bot.stop()
+        sys.exit(RESTART_EXIT_CODE if bot.restart_requested else 0)
 
     except Exception as e:
         print(f"\nFatal error: {str(e)}")
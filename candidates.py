@@ -0,0 +1,174 @@
+"""
+Local scoring and best-pick for multi-candidate LLM output.
+
+Processors ask for several rephrasings in one request (the `n` parameter of
+OpenAI-style chat APIs) and pick the best one here instead of retrying.
+Each candidate is scored on three things:
+
+- length fit: comfortably inside a tweet, not cut off, not a fragment
+- artifacts: no "Here's..." lead-ins, leftover labels or multi-part answers
+- similarity: shares enough words with the source to keep its meaning, but
+  is not a near-copy of it
+"""
+import re
+from typing import Iterable, List, Optional, Tuple
+
+MAX_LENGTH = 280
+MIN_LENGTH = 20
+# Lengths that read well as a tweet score full marks
+TARGET_LENGTH = (60, 240)
+
+ARTIFACT_PREFIXES = (
+    'here is', "here's", 'rephrased', 'sure', 'certainly', 'okay', 'ok,', 'modern version',
+    'nietzsche', 'quote:', 'translation:'
+)
+# Blank-line separated parts, list markers, or talk about the task itself
+_ARTIFACT_PATTERNS = re.compile(
+    r'\n\s*\n|^\s*[-*\d]+[.)]\s|\b(?:rephrased|rephrasing|original quote)\b', re.IGNORECASE
+)
+_WORD = re.compile(r"[a-z][a-z'-]{2,}")
+_STOPWORDS = frozenset(
+    "the and that this with for not you your are was were has have had but from they them their "
+    "his her him she who what when which will would should could does did its into than then".split()
+)
+
+# Weights of length fit, absence of artifacts and similarity to the source
+WEIGHTS = (0.4, 0.3, 0.3)
+# Candidates scoring below this are unusable
+MIN_SCORE = 0.5
+
+
+def length_score(text: str) -> float:
+    """
+    Score how well the length fits a tweet.
+
+    Args:
+        text: Candidate
+
+    Returns:
+        1.0 inside TARGET_LENGTH, falling to 0 for fragments and overlong text
+    """
+    length = len(text)
+    low, high = TARGET_LENGTH
+    if length < MIN_LENGTH or length > MAX_LENGTH:
+        return 0.0
+    if length < low:
+        score = (length - MIN_LENGTH) / (low - MIN_LENGTH)
+    elif length > high:
+        score = 1.0 - 0.5 * (length - high) / (MAX_LENGTH - high)
+    else:
+        score = 1.0
+    # Cleanup cut this one off mid-thought
+    if text.endswith('...') and length >= MAX_LENGTH - 3:
+        score *= 0.5
+    return score
+
+
+def has_artifacts(text: str) -> bool:
+    """
+    Check for lead-ins, labels and multi-part answers.
+
+    Args:
+        text: Candidate
+
+    Returns:
+        True if the text still carries model chatter
+    """
+    lowered = text.lower().lstrip(' "\'')
+    return lowered.startswith(ARTIFACT_PREFIXES) or bool(_ARTIFACT_PATTERNS.search(text))
+
+
+def _words(text: str) -> set:
+    return set(_WORD.findall(text.lower())) - _STOPWORDS
+
+
+def similarity(candidate: str, source: str) -> float:
+    """
+    Word-set Jaccard similarity.
+
+    Args:
+        candidate: Candidate text
+        source: Source sentence
+
+    Returns:
+        Similarity between 0 and 1
+    """
+    a, b = _words(candidate), _words(source)
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def similarity_score(candidate: str, source: str) -> float:
+    """
+    Score similarity to the source: related, but actually rephrased.
+
+    Args:
+        candidate: Candidate text
+        source: Source sentence
+
+    Returns:
+        1.0 for moderate overlap, lower for unrelated text or near-copies
+    """
+    value = similarity(candidate, source)
+    if value >= 0.9:
+        return 0.3
+    if value >= 0.1:
+        return 1.0
+    # Modern rephrasings share few words, so only the low end falls off
+    return value / 0.1
+
+
+def score(candidate: str, source: str) -> float:
+    """
+    Score one candidate.
+
+    Args:
+        candidate: Cleaned candidate text
+        source: Source sentence
+
+    Returns:
+        Score between 0 and 1 (0 for unusable lengths)
+    """
+    fit = length_score(candidate)
+    if fit == 0:
+        return 0.0
+    length_weight, artifact_weight, similarity_weight = WEIGHTS
+    return (
+        length_weight * fit
+        + artifact_weight * (0.0 if has_artifacts(candidate) else 1.0)
+        + similarity_weight * similarity_score(candidate, source)
+    )
+
+
+def rank(candidates: Iterable[str], source: str) -> List[Tuple[float, str]]:
+    """
+    Score and sort candidates, best first (duplicates and empties dropped).
+
+    Args:
+        candidates: Cleaned candidate texts
+        source: Source sentence
+
+    Returns:
+        List of (score, candidate)
+    """
+    unique = dict.fromkeys(c for c in candidates if c)
+    return sorted(((score(c, source), c) for c in unique), key=lambda pair: pair[0], reverse=True)
+
+
+def pick_best(candidates: Iterable[str], source: str, min_score: float = MIN_SCORE) -> Tuple[Optional[str], float]:
+    """
+    Pick the best usable candidate.
+
+    Args:
+        candidates: Cleaned candidate texts
+        source: Source sentence
+        min_score: Lowest acceptable score
+
+    Returns:
+        Tuple of (best candidate or None if none is usable, its score)
+    """
+    ranked = rank(candidates, source)
+    if not ranked or ranked[0][0] < min_score:
+        return None, ranked[0][0] if ranked else 0.0
+    return ranked[0][1], ranked[0][0]
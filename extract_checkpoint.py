@@ -0,0 +1,105 @@
+"""
+Checkpoints for resumable PDF extraction.
+
+Extraction of a large PDF runs in page ranges. After each range, the
+sentences it produced are appended to a JSONL file and the ingest state
+(next page, sentence carried over the page break, header/footer counts,
+pages PyPDF2 could not read) is written atomically next to it. A restart
+after a crash reloads both and continues from the first unfinished range;
+once the whole file is done, later starts load the sentences directly.
+
+The state records the PDF's size and modification time, so a changed file
+starts over from page 1.
+"""
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Bump when extraction output changes so stale checkpoints are discarded
+FORMAT_VERSION = 1
+
+
+class ExtractionCheckpoint:
+    """Sentences and ingest state of one PDF's extraction, stored on disk."""
+
+    def __init__(self, directory: str, pdf_path: str):
+        """
+        Initialize the checkpoint.
+
+        Args:
+            directory: Parent directory for all checkpoints
+            pdf_path: PDF being extracted
+        """
+        self.logger = logging.getLogger(__name__)
+        pdf = Path(pdf_path).resolve()
+        digest = hashlib.blake2b(str(pdf).encode('utf-8'), digest_size=4).hexdigest()
+        self.directory = Path(directory) / f"{pdf.stem}-{digest}"
+        self.state_file = self.directory / 'state.json'
+        self.sentences_file = self.directory / 'sentences.jsonl'
+        stat = pdf.stat()
+        self.signature = {'version': FORMAT_VERSION, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    def load(self) -> Optional[Tuple[Dict[str, Any], List[str]]]:
+        """
+        Load the last saved range.
+
+        Sentences written after the last state save (a crash mid-range) are
+        truncated away so they are produced again exactly once.
+
+        Returns:
+            Tuple of (state, sentences so far), or None to start from page 1
+        """
+        if not self.state_file.exists():
+            # Sentences from a range that never got its state saved
+            self.reset()
+            return None
+        try:
+            state = json.loads(self.state_file.read_text())
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable extraction checkpoint {self.state_file}: {str(e)}")
+            self.reset()
+            return None
+        if state.get('signature') != self.signature:
+            self.logger.info(f"PDF changed since checkpoint {self.directory.name}, extracting from page 1")
+            self.reset()
+            return None
+
+        size = state['sentences_bytes']
+        try:
+            with open(self.sentences_file, 'r+b') as f:
+                f.truncate(size)
+                data = f.read(size)
+        except OSError as e:
+            self.logger.warning(f"Extraction checkpoint sentences missing: {str(e)}")
+            self.reset()
+            return None
+        sentences = [json.loads(line) for line in data.decode('utf-8').splitlines()]
+        return state, sentences
+
+    def save(self, sentences: List[str], state: Dict[str, Any]) -> None:
+        """
+        Append a finished range's sentences, then record the state.
+
+        Args:
+            sentences: Sentences produced since the last save
+            state: Ingest state to resume from (next page, carry, ...)
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.sentences_file, 'ab') as f:
+            f.write(''.join(json.dumps(s) + '\n' for s in sentences).encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+
+        state = dict(state, signature=self.signature, sentences_bytes=size)
+        tmp_file = self.state_file.with_suffix('.tmp')
+        tmp_file.write_text(json.dumps(state))
+        os.replace(tmp_file, self.state_file)
+
+    def reset(self) -> None:
+        """Delete the checkpoint."""
+        for path in (self.state_file, self.sentences_file):
+            path.unlink(missing_ok=True)
@@ -0,0 +1,360 @@
+"""
+Local stand-ins for the X API, OpenAI-compatible chat APIs and Ollama.
+
+One HTTP server answers the routes the bot uses so the whole pipeline can
+run offline and under load:
+
+- X API v2: POST /2/tweets (create_tweet), GET /2/users/me (get_me)
+- OpenAI-style: POST .../chat/completions (Groq, Grok, Together, Hugging Face
+  router), with optional server-sent-event streaming
+- Ollama: POST /api/generate (NDJSON streaming or single response), GET /api/tags
+
+Latency, error rate and an X-style rate limit (with x-rate-limit-* headers)
+are configurable. GET /_stats returns request counters.
+
+Run with: python3 fake_services.py --port 8900 --latency 0.2 --error-rate 0.01
+"""
+import argparse
+import itertools
+import json
+import logging
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+REPHRASINGS = [
+    "What does not kill you rewires you. Growth is just damage you learned to use.",
+    "Stare into the void long enough and it starts leaving read receipts.",
+    "Your morality might just be your fear wearing a nicer outfit.",
+    "The herd calls it common sense. The free spirit calls it a cage with good lighting.",
+    "Become who you are, even if the algorithm preferred who you were."
+]
+
+
+class _RateLimiter:
+    """Fixed-window request limit with X-style headers."""
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self._lock = threading.Lock()
+        self._window_start = time.time()
+        self._count = 0
+
+    def check(self) -> Tuple[bool, Dict[str, str]]:
+        """Count one request; return whether it is allowed and the headers to send."""
+        with self._lock:
+            now = time.time()
+            if now - self._window_start >= self.window:
+                self._window_start = now
+                self._count = 0
+            self._count += 1
+            allowed = self._count <= self.limit
+            headers = {
+                'x-rate-limit-limit': str(self.limit),
+                'x-rate-limit-remaining': str(max(0, self.limit - self._count)),
+                'x-rate-limit-reset': str(int(self._window_start + self.window))
+            }
+        return allowed, headers
+
+
+class FakeServices:
+    """Threaded fake API server."""
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        latency: float = 0.05,
+        spread: float = 0.5,
+        error_rate: float = 0.0,
+        rate_limit: int = 0,
+        rate_window: float = 900.0,
+        stream_chunk_delay: float = 0.01,
+        seed: Optional[int] = None
+    ):
+        """
+        Initialize the server.
+
+        Args:
+            host: Bind address
+            port: Port (0 picks a free one)
+            latency: Median response latency in seconds
+            spread: Log-normal sigma of the latency
+            error_rate: Fraction of requests answered with HTTP 500
+            rate_limit: Tweets allowed per window (0 disables the limit)
+            rate_window: Rate limit window in seconds
+            stream_chunk_delay: Delay between streamed chunks in seconds
+            seed: Random seed for latency, errors and generated text
+        """
+        self.logger = logging.getLogger(__name__)
+        self.latency = latency
+        self.spread = spread
+        self.error_rate = error_rate
+        self.stream_chunk_delay = stream_chunk_delay
+        self.limiter = _RateLimiter(rate_limit, rate_window) if rate_limit else None
+        self.stats: Dict[str, int] = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tweet_ids = itertools.count(1800000000000000000)
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the running server."""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, key: str) -> None:
+        """Increment a request counter."""
+        with self._lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def delay(self) -> None:
+        """Sleep for one sampled response latency."""
+        if self.latency <= 0:
+            return
+        with self._lock:
+            seconds = self.latency * math.exp(self._rng.gauss(0, self.spread))
+        time.sleep(seconds)
+
+    def should_fail(self) -> bool:
+        """Decide whether this request gets an injected error."""
+        if self.error_rate <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+    def completion_text(self) -> str:
+        """Pick a rephrased quote."""
+        with self._lock:
+            return self._rng.choice(REPHRASINGS)
+
+    def next_tweet_id(self) -> str:
+        """Allocate a tweet ID."""
+        with self._lock:
+            return str(next(self._tweet_ids))
+
+    def _handler_class(self):
+        services = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                """Keep request logs out of stdout."""
+
+            def _read_json(self) -> dict:
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                try:
+                    return json.loads(body) if body else {}
+                except ValueError:
+                    return {}
+
+            def _send_json(self, status: int, payload: dict, headers: Optional[Dict[str, str]] = None) -> None:
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _start_stream(self, content_type: str) -> None:
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+
+            def _chunk(self, data: bytes) -> None:
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+
+            def _end_stream(self) -> None:
+                self.wfile.write(b"0\r\n\r\n")
+
+            def do_GET(self):
+                path = self.path.split('?', 1)[0]
+                if path == '/_stats':
+                    return self._send_json(200, dict(services.stats))
+                if path == '/2/users/me':
+                    services.count('x_get_me')
+                    services.delay()
+                    return self._send_json(200, {'data': {'id': '1', 'name': 'Fake Nietzsche', 'username': 'fake_fritz'}})
+                if path == '/api/tags':
+                    services.count('ollama_tags')
+                    return self._send_json(200, {'models': [{'name': 'llama2:latest'}]})
+                self._send_json(404, {'error': 'not found'})
+
+            def do_POST(self):
+                path = self.path.split('?', 1)[0]
+                payload = self._read_json()
+                if path == '/2/tweets':
+                    return self._create_tweet(payload)
+                if path.endswith('/chat/completions'):
+                    return self._chat_completion(payload)
+                if path == '/api/generate':
+                    return self._ollama_generate(payload)
+                self._send_json(404, {'error': 'not found'})
+
+            def _create_tweet(self, payload: dict) -> None:
+                services.count('x_create_tweet')
+                headers = {}
+                if services.limiter:
+                    allowed, headers = services.limiter.check()
+                    if not allowed:
+                        services.count('x_rate_limited')
+                        return self._send_json(429, {'title': 'Too Many Requests', 'status': 429}, headers)
+                services.delay()
+                if services.should_fail():
+                    services.count('x_errors')
+                    return self._send_json(500, {'title': 'Internal Error', 'status': 500}, headers)
+                text = payload.get('text', '')
+                if len(text) > 280:
+                    return self._send_json(400, {'title': 'Invalid Request', 'detail': 'Text too long'}, headers)
+                self._send_json(201, {'data': {'id': services.next_tweet_id(), 'text': text}}, headers)
+
+            def _chat_completion(self, payload: dict) -> None:
+                services.count('chat_completions')
+                services.delay()
+                if services.should_fail():
+                    services.count('chat_errors')
+                    return self._send_json(500, {'error': {'message': 'Injected failure', 'type': 'server_error'}})
+
+                text = services.completion_text()
+                max_tokens = payload.get('max_tokens') or 150
+                words = text.split(' ')[:max_tokens]
+                model = payload.get('model', 'fake-model')
+                created = int(time.time())
+                prompt_tokens = sum(len(str(m.get('content', '')).split()) for m in payload.get('messages', []))
+
+                if not payload.get('stream'):
+                    # Honour n like OpenAI-style APIs: one independent completion per choice
+                    texts = [' '.join(words)] + [
+                        ' '.join(services.completion_text().split(' ')[:max_tokens])
+                        for _ in range(max(1, int(payload.get('n') or 1)) - 1)
+                    ]
+                    completion_tokens = sum(len(choice.split(' ')) for choice in texts)
+                    return self._send_json(200, {
+                        'id': f"chatcmpl-{created}",
+                        'object': 'chat.completion',
+                        'created': created,
+                        'model': model,
+                        'choices': [
+                            {
+                                'index': index,
+                                'message': {'role': 'assistant', 'content': choice},
+                                'finish_reason': 'stop'
+                            }
+                            for index, choice in enumerate(texts)
+                        ],
+                        'usage': {
+                            'prompt_tokens': prompt_tokens,
+                            'completion_tokens': completion_tokens,
+                            'total_tokens': prompt_tokens + completion_tokens
+                        }
+                    })
+
+                self._start_stream('text/event-stream')
+                for index, word in enumerate(words):
+                    chunk = {
+                        'id': f"chatcmpl-{created}",
+                        'object': 'chat.completion.chunk',
+                        'created': created,
+                        'model': model,
+                        'choices': [{
+                            'index': 0,
+                            'delta': {'content': word if index == 0 else ' ' + word},
+                            'finish_reason': None
+                        }]
+                    }
+                    self._chunk(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+                    time.sleep(services.stream_chunk_delay)
+                self._chunk(b"data: [DONE]\n\n")
+                self._end_stream()
+
+            def _ollama_generate(self, payload: dict) -> None:
+                services.count('ollama_generate')
+                services.delay()
+                if services.should_fail():
+                    services.count('ollama_errors')
+                    return self._send_json(500, {'error': 'Injected failure'})
+
+                text = services.completion_text()
+                model = payload.get('model', 'llama2')
+                if not payload.get('stream', True):
+                    return self._send_json(200, {
+                        'model': model,
+                        'response': text,
+                        'done': True,
+                        'prompt_eval_count': len(str(payload.get('prompt', '')).split()),
+                        'eval_count': len(text.split())
+                    })
+
+                self._start_stream('application/x-ndjson')
+                for index, word in enumerate(text.split(' ')):
+                    line = {'model': model, 'response': word if index == 0 else ' ' + word, 'done': False}
+                    self._chunk((json.dumps(line) + '\n').encode('utf-8'))
+                    time.sleep(services.stream_chunk_delay)
+                self._chunk((json.dumps({'model': model, 'response': '', 'done': True}) + '\n').encode('utf-8'))
+                self._end_stream()
+
+        return Handler
+
+    def start(self) -> 'FakeServices':
+        """Serve in a daemon thread."""
+        self._thread = threading.Thread(target=self.server.serve_forever, name='fake-services', daemon=True)
+        self._thread.start()
+        self.logger.info(f"Fake services listening on {self.url}")
+        return self
+
+    def stop(self) -> None:
+        """Shut the server down."""
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Run local fake X, OpenAI-compatible and Ollama APIs")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency', type=float, default=0.05, help="Median latency in seconds")
+    parser.add_argument('--spread', type=float, default=0.5, help="Log-normal sigma of latency")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests that fail with 500")
+    parser.add_argument('--rate-limit', type=int, default=0, help="Tweets per window before 429 (0 = unlimited)")
+    parser.add_argument('--rate-window', type=float, default=900.0, help="Rate limit window in seconds")
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    services = FakeServices(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        spread=args.spread,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        rate_window=args.rate_window,
+        seed=args.seed
+    )
+    print(f"Fake services on {services.url}")
+    print(f"  X_API_BASE_URL={services.url}")
+    print(f"  HF_BASE_URL={services.url}")
+    print(f"  OLLAMA_BASE_URL={services.url}")
+    try:
+        services.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        services.server.server_close()
+
+
+if __name__ == '__main__':
+    main()
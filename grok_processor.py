@@ -2,27 +2,68 @@
 Grok API integration for text processing.
 """
 import os
+import logging
 import requests
 from typing import Optional
 
+from candidates import rank
+from metrics import instrument_provider
+from usage_ledger import note_fallback, note_usage
+
 
 class GrokProcessor:
     """Process text using Grok API (xAI)."""
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        candidates: Optional[int] = None
+    ):
         """
         Initialize Grok processor.
 
         Args:
             api_key: Grok API key (xAI API key)
+            base_url: API base URL (defaults to GROK_BASE_URL or the public endpoint)
+            candidates: Rephrasings requested per call with the API's ``n``
+                        parameter; the best is picked locally (defaults to LLM_CANDIDATES or 3)
         """
+        self.logger = logging.getLogger(__name__)
         self.api_key = api_key or os.getenv('GROK_API_KEY')
         if not self.api_key:
             raise ValueError("GROK_API_KEY is required")
 
-        self.base_url = "https://api.x.ai/v1"
+        self.base_url = (base_url or os.getenv('GROK_BASE_URL') or "https://api.x.ai/v1").rstrip('/')
+        self.candidates = max(1, candidates or int(os.getenv('LLM_CANDIDATES', '3')))
         self.model = "grok-beta"  # or "grok-2-latest"
 
+    @staticmethod
+    def _clean_response(rephrased: str) -> str:
+        """
+        Strip quoting artifacts from model output and fit it in a tweet.
+
+        Args:
+            rephrased: Raw model output
+
+        Returns:
+            Cleaned text
+        """
+        rephrased = rephrased.strip()
+
+        # Clean up common artifacts
+        rephrased = rephrased.replace('"', '').replace('"', '').replace('"', '')
+        rephrased = rephrased.replace("'", "'").replace("'", "'")
+
+        # Remove any leading/trailing quotes
+        rephrased = rephrased.strip("'\"")
+
+        # Ensure it's not too long
+        if len(rephrased) > 280:
+            rephrased = rephrased[:277] + "..."
+        return rephrased
+
+    @instrument_provider('grok')
     def rephrase_quote(self, text: str) -> str:
         """
         Rephrase a quote using Grok.
@@ -63,7 +104,8 @@ Rephrased quote:"""
                         }
                     ],
                     "temperature": 0.8,
-                    "max_tokens": 150
+                    "max_tokens": 150,
+                    "n": self.candidates
                 },
                 timeout=30
             )
@@ -76,20 +118,23 @@ Rephrased quote:"""
             response.raise_for_status()
 
             result = response.json()
-            rephrased = result['choices'][0]['message']['content'].strip()
-
-            # Clean up common artifacts
-            rephrased = rephrased.replace('"', '').replace('"', '').replace('"', '')
-            rephrased = rephrased.replace("'", "'").replace("'", "'")
-
-            # Remove any leading/trailing quotes
-            rephrased = rephrased.strip("'\"")
-
-            # Ensure it's not too long
-            if len(rephrased) > 280:
-                rephrased = rephrased[:277] + "..."
-
-            return rephrased if rephrased else text
+            usage = result.get('usage') or {}
+            note_usage(usage.get('prompt_tokens'), usage.get('completion_tokens'))
+            choices = [self._clean_response(choice['message']['content'] or '') for choice in result['choices']]
+            ranked = rank(choices, text)
+
+            if not ranked:
+                self.logger.warning("Grok returned an empty response, using original")
+                note_fallback()
+                return text
+            if ranked[0][0] == 0:
+                self.logger.warning(f"No usable candidate among {len(choices)} from Grok, using original")
+                note_fallback()
+                return text
+            best_score, rephrased = ranked[0]
+            self.logger.info(f"Rephrased quote with {self.model} ({len(rephrased)} chars, "
+                             f"best of {len(choices)}, score {best_score:.2f})")
+            return rephrased
 
         except requests.exceptions.RequestException as e:
             raise Exception(f"Error calling Grok API: {str(e)}")
@@ -3,25 +3,31 @@ Groq API integration for text processing.
 FREE tier available - fast inference!
 """
 import os
+import logging
 import requests
 from typing import Optional
 
+from metrics import instrument_provider
+from usage_ledger import note_fallback, note_usage
+
 
 class GroqProcessor:
     """Process text using Groq API (free tier available)."""
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
         """
         Initialize Groq processor.
 
         Args:
             api_key: Groq API key
+            base_url: API base URL (defaults to GROQ_BASE_URL or the public endpoint)
         """
+        self.logger = logging.getLogger(__name__)
         self.api_key = api_key or os.getenv('GROQ_API_KEY')
         if not self.api_key:
             raise ValueError("GROQ_API_KEY is required")
 
-        self.base_url = "https://api.groq.com/openai/v1"
+        self.base_url = (base_url or os.getenv('GROQ_BASE_URL') or "https://api.groq.com/openai/v1").rstrip('/')
         # Available models on Groq free tier:
         # - llama-3.3-70b-versatile (recommended)
         # - llama-3.1-70b-versatile
@@ -29,6 +35,32 @@ class GroqProcessor:
         # - gemma2-9b-it
         self.model = "llama-3.3-70b-versatile"
 
+    @staticmethod
+    def _clean_response(rephrased: str) -> str:
+        """
+        Strip quoting artifacts from model output and fit it in a tweet.
+
+        Args:
+            rephrased: Raw model output
+
+        Returns:
+            Cleaned text
+        """
+        rephrased = rephrased.strip()
+
+        # Clean up common artifacts
+        rephrased = rephrased.replace('"', '').replace('"', '').replace('"', '')
+        rephrased = rephrased.replace("'", "'").replace("'", "'")
+
+        # Remove any leading/trailing quotes
+        rephrased = rephrased.strip("'\"")
+
+        # Ensure it's not too long
+        if len(rephrased) > 280:
+            rephrased = rephrased[:277] + "..."
+        return rephrased
+
+    @instrument_provider('groq')
     def rephrase_quote(self, text: str) -> str:
         """
         Rephrase a quote using Groq.
@@ -72,20 +104,16 @@ class GroqProcessor:
             response.raise_for_status()
 
             result = response.json()
-            rephrased = result['choices'][0]['message']['content'].strip()
-
-            # Clean up common artifacts
-            rephrased = rephrased.replace('"', '').replace('"', '').replace('"', '')
-            rephrased = rephrased.replace("'", "'").replace("'", "'")
-
-            # Remove any leading/trailing quotes
-            rephrased = rephrased.strip("'\"")
-
-            # Ensure it's not too long
-            if len(rephrased) > 280:
-                rephrased = rephrased[:277] + "..."
-
-            return rephrased if rephrased else text
+            usage = result.get('usage') or {}
+            note_usage(usage.get('prompt_tokens'), usage.get('completion_tokens'))
+            rephrased = self._clean_response(result['choices'][0]['message']['content'])
+
+            if not rephrased:
+                self.logger.warning("Groq returned an empty response, using original")
+                note_fallback()
+                return text
+            self.logger.info(f"Rephrased quote with {self.model} ({len(rephrased)} chars)")
+            return rephrased
 
         except requests.exceptions.RequestException as e:
             raise Exception(f"Error calling Groq API: {str(e)}")
@@ -0,0 +1,91 @@
+"""
+Health check endpoints shared by the threaded and asyncio runtimes.
+"""
+import json
+from http.server import BaseHTTPRequestHandler
+from typing import Callable, Dict, Optional, Tuple
+
+# (status code, content type, body)
+Response = Tuple[int, str, bytes]
+
+_routes: Dict[str, Callable[[], Response]] = {}
+_status_provider: Optional[Callable[[], dict]] = None
+
+
+def set_status_provider(provider: Optional[Callable[[], dict]]) -> None:
+    """
+    Set the callable that reports pipeline state for /live and /ready.
+
+    The callable must return a dict with at least boolean "live" and
+    "ready" keys; the whole dict is returned as the JSON body.
+
+    Args:
+        provider: Status callable, or None to revert to the startup status
+    """
+    global _status_provider
+    _status_provider = provider
+
+
+def _status_response(key: str) -> Response:
+    """Render the JSON status with 200/503 depending on the given flag."""
+    if _status_provider is None:
+        status = {'status': 'starting', 'live': True, 'ready': False}
+    else:
+        try:
+            status = _status_provider()
+        except Exception as e:
+            status = {'status': 'error', 'live': False, 'ready': False, 'error': str(e)}
+    body = json.dumps(status, indent=2).encode('utf-8')
+    return (200 if status.get(key) else 503), 'application/json', body
+
+
+def register_route(path: str, handler: Callable[[], Response]) -> None:
+    """
+    Register an extra GET endpoint on the health server.
+
+    Args:
+        path: Request path, e.g. "/metrics"
+        handler: Callable returning (status, content type, body)
+    """
+    _routes[path] = handler
+
+
+def handle_request(path: str) -> Response:
+    """
+    Resolve a GET request path to a response.
+
+    Args:
+        path: Raw request path (query string is ignored)
+
+    Returns:
+        Tuple of (status code, content type, body)
+    """
+    path = path.split('?', 1)[0]
+    if path == '/health' or path == '/':
+        return 200, 'text/plain', b'OK - Nietzsche Bot is running'
+    if path == '/live':
+        return _status_response('live')
+    if path == '/ready':
+        return _status_response('ready')
+
+    handler = _routes.get(path)
+    if handler:
+        return handler()
+    return 404, 'text/plain', b''
+
+
+class HealthCheckHandler(BaseHTTPRequestHandler):
+    """Simple HTTP handler for health checks."""
+
+    def do_GET(self):
+        """Handle GET requests."""
+        status, content_type, body = handle_request(self.path)
+        self.send_response(status)
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Suppress HTTP server logs."""
+        pass
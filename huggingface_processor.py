@@ -3,20 +3,31 @@ Hugging Face Inference API integration for text processing.
 Uses free serverless inference API with authentication token.
 """
 import os
+import logging
+from importlib.util import find_spec
 from typing import Optional
 
-try:
-    from huggingface_hub import InferenceClient
-    HAS_HF_HUB = True
-except ImportError:
-    HAS_HF_HUB = False
+from candidates import pick_best
+from metrics import instrument_provider
+from usage_ledger import note_fallback, note_retry, note_usage
+
+# huggingface_hub is imported when a processor is created, not at module import
+HAS_HF_HUB = find_spec('huggingface_hub') is not None
+if not HAS_HF_HUB:
     print("Warning: huggingface-hub not installed. Install with: pip install huggingface-hub")
 
 
 class HuggingFaceProcessor:
     """Process text using Hugging Face's free Inference API."""
 
-    def __init__(self, model: str = "mistralai/Mistral-7B-Instruct-v0.2", api_token: Optional[str] = None):
+    def __init__(
+        self,
+        model: str = "mistralai/Mistral-7B-Instruct-v0.2",
+        api_token: Optional[str] = None,
+        verify: bool = True,
+        base_url: Optional[str] = None,
+        candidates: Optional[int] = None
+    ):
         """
         Initialize Hugging Face processor.
 
@@ -27,12 +38,20 @@ class HuggingFaceProcessor:
                    - "HuggingFaceH4/zephyr-7b-beta" (alternative)
                    - "microsoft/phi-2" (smaller, faster)
             api_token: HuggingFace API token (optional, will use HF_API_TOKEN env var if not provided)
+            verify: Send a test request now (callers probing later pass False)
+            base_url: OpenAI-compatible endpoint to use instead of the Hugging Face
+                      router (defaults to HF_BASE_URL, e.g. a local fake server)
+            candidates: Rephrasings requested per call with the API's ``n``
+                        parameter; the best is picked locally (defaults to LLM_CANDIDATES or 3)
         """
         if not HAS_HF_HUB:
             raise ImportError("huggingface-hub is required. Install with: pip install huggingface-hub")
 
+        self.logger = logging.getLogger(__name__)
         self.model = model
         self.api_token = api_token or os.getenv("HF_API_TOKEN")
+        self.base_url = base_url or os.getenv("HF_BASE_URL") or None
+        self.candidates = max(1, candidates or int(os.getenv("LLM_CANDIDATES", "3")))
 
         if not self.api_token:
             raise ValueError(
@@ -41,24 +60,88 @@ class HuggingFaceProcessor:
             )
 
         # Create inference client
-        self.client = InferenceClient(token=self.api_token)
-        self._test_connection()
+        from huggingface_hub import InferenceClient
+        if self.base_url:
+            self.client = InferenceClient(base_url=self.base_url, api_key=self.api_token)
+        else:
+            self.client = InferenceClient(token=self.api_token)
+        if verify:
+            self.test_connection()
 
     def _test_connection(self) -> None:
-        """Test connection to Hugging Face API."""
-        try:
-            # Simple test with conversational task
-            messages = [{"role": "user", "content": "Hi"}]
-            response = self.client.chat_completion(
+        """Send a minimal request to Hugging Face API (raises if it fails)."""
+        # Simple test with conversational task
+        messages = [{"role": "user", "content": "Hi"}]
+        self.client.chat_completion(
+            messages=messages,
+            model=self.model,
+            max_tokens=5
+        )
+        self.logger.info(f"HuggingFace connection successful (model: {self.model})")
+
+    @staticmethod
+    def _clean_response(rephrased: str) -> str:
+        """
+        Strip quoting artifacts and lead-in phrases from model output and fit it in a tweet.
+
+        Args:
+            rephrased: Raw model output
+
+        Returns:
+            Cleaned text
+        """
+        rephrased = rephrased.strip()
+
+        # Clean up common artifacts
+        rephrased = rephrased.replace('"', '').replace("'", "'")
+
+        # Remove common prefixes
+        for prefix in ['Rephrased quote:', 'Here is', 'Here\'s', 'Rephrased:']:
+            if rephrased.lower().startswith(prefix.lower()):
+                rephrased = rephrased[len(prefix):].strip()
+                if rephrased.startswith(':'):
+                    rephrased = rephrased[1:].strip()
+
+        # Ensure it's not too long
+        if len(rephrased) > 280:
+            rephrased = rephrased[:277] + "..."
+        return rephrased
+
+    def _chat_completion(self, messages: list):
+        """
+        Request self.candidates completions.
+
+        Endpoints that reject the ``n`` parameter get one retry with a single
+        candidate; if that works, later calls ask for one candidate only.
+
+        Args:
+            messages: Chat messages
+
+        Returns:
+            Chat completion response
+        """
+        def request(n: int):
+            return self.client.chat_completion(
                 messages=messages,
                 model=self.model,
-                max_tokens=5
+                max_tokens=150,
+                temperature=0.8,
+                n=n,
             )
-            print(f"✓ HuggingFace connection successful (model: {self.model})")
-        except Exception as e:
-            print(f"Warning: Could not verify connection to Hugging Face API: {str(e)}")
-            print("This may be normal if the model is still loading.")
 
+        try:
+            return request(self.candidates)
+        except Exception as e:
+            status = getattr(getattr(e, 'response', None), 'status_code', None)
+            if self.candidates == 1 or status not in (400, 422):
+                raise
+            response = request(1)
+            self.logger.warning(f"{self.model} rejected n={self.candidates} ({str(e)}); "
+                                f"requesting one candidate per call")
+            self.candidates = 1
+            return response
+
+    @instrument_provider('huggingface')
     def rephrase_quote(self, text: str) -> str:
         """
         Rephrase a quote using Hugging Face Inference API.
@@ -85,53 +168,44 @@ class HuggingFaceProcessor:
         ]
 
         try:
-            # Try up to 3 times (in case model is loading)
+            # Try up to 3 times (in case model is loading or every candidate is unusable)
             for attempt in range(3):
+                if attempt:
+                    note_retry()
                 try:
-                    response = self.client.chat_completion(
-                        messages=messages,
-                        model=self.model,
-                        max_tokens=150,
-                        temperature=0.8,
-                    )
-
-                    # Extract the rephrased text
-                    if response and response.choices:
-                        rephrased = response.choices[0].message.content.strip()
-
-                        # Clean up common artifacts
-                        rephrased = rephrased.replace('"', '').replace("'", "'")
+                    response = self._chat_completion(messages)
+                    usage = getattr(response, 'usage', None)
+                    if usage:
+                        note_usage(usage.prompt_tokens, usage.completion_tokens)
 
-                        # Remove common prefixes
-                        for prefix in ['Rephrased quote:', 'Here is', 'Here\'s', 'Rephrased:']:
-                            if rephrased.lower().startswith(prefix.lower()):
-                                rephrased = rephrased[len(prefix):].strip()
-                                if rephrased.startswith(':'):
-                                    rephrased = rephrased[1:].strip()
-
-                        # Ensure it's not too long
-                        if len(rephrased) > 280:
-                            rephrased = rephrased[:277] + "..."
+                    # Score every candidate and keep the best usable one
+                    if response and response.choices:
+                        choices = [self._clean_response(choice.message.content or '') for choice in response.choices]
+                        rephrased, best_score = pick_best(choices, text)
 
-                        # If we got a valid response, return it
-                        if rephrased and len(rephrased) > 20:
+                        if rephrased:
+                            self.logger.info(f"Rephrased quote with {self.model} ({len(rephrased)} chars, "
+                                             f"best of {len(choices)}, score {best_score:.2f})")
                             return rephrased
+                        self.logger.warning(f"No usable candidate among {len(choices)} (best score {best_score:.2f})")
 
                 except Exception as e:
                     if "loading" in str(e).lower() and attempt < 2:
-                        print(f"Model loading, waiting 20s... (attempt {attempt + 1}/3)")
+                        self.logger.warning(f"Model loading, waiting 20s... (attempt {attempt + 1}/3)")
                         import time
                         time.sleep(20)
                         continue
                     raise
 
             # If all attempts failed or response was invalid, fallback
-            print("Warning: Could not rephrase quote, using original")
+            self.logger.warning("Could not rephrase quote, using original")
+            note_fallback()
             return text if len(text) <= 280 else text[:277] + "..."
 
         except Exception as e:
-            print(f"Error calling Hugging Face API: {str(e)}")
+            self.logger.error(f"Error calling Hugging Face API: {str(e)}")
             # Fallback to original text
+            note_fallback()
             return text if len(text) <= 280 else text[:277] + "..."
 
     def test_connection(self) -> bool:
@@ -144,5 +218,7 @@ class HuggingFaceProcessor:
         try:
             self._test_connection()
             return True
-        except Exception:
+        except Exception as e:
+            self.logger.warning(f"Could not verify connection to Hugging Face API: {str(e)} "
+                                f"(this may be normal if the model is still loading)")
             return False
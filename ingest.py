@@ -0,0 +1,375 @@
+"""
+Ingest-time normalisation and exact dedupe of extracted sentences.
+
+Pages are fed one at a time and come out as unique sentences in a single
+streaming pass:
+
+1. Running headers, footers and page numbers stripped (BoilerplateDetector)
+2. Unicode NFKC normalisation (ligatures, full-width forms, odd spaces),
+   soft hyphens and zero-width characters removed
+3. Words hyphenated across line breaks joined ("philo-\\nsopher")
+4. Whitespace cleanup and sentence splitting; a sentence running over a
+   page boundary is carried into the next page
+5. Exact duplicates dropped by an 8-byte hash of the normalised sentence
+
+Only the hashes of kept sentences stay in memory, never the full text.
+"""
+import hashlib
+import re
+import unicodedata
+from collections import Counter, deque
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional
+
+# Soft hyphen, zero-width space/joiners, word joiner, BOM
+_INVISIBLE = dict.fromkeys(map(ord, '\u00ad\u200b\u200c\u200d\u2060\ufeff'))
+# A word broken with a hyphen at the end of a line
+_LINE_HYPHEN = re.compile(r'(?<=\w)-[ \t]*\n[ \t]*(?=\w)')
+# Everything up to the last sentence-ending punctuation
+_LAST_TERMINATOR = re.compile(r'.*[.!?]', re.DOTALL)
+_FIRST_TERMINATOR = re.compile(r'[.!?]+')
+# A line holding only a page number: "12", "- 12 -", "Page 12", "xiv"
+_PAGE_NUMBER = re.compile(
+    r'^[\s\-–—]*(?:page\s+)?'
+    r'(?:\d+|(?=[ivxlcdm])m{0,3}(?:cm|cd|d?c{0,3})(?:xc|xl|l?x{0,3})(?:ix|iv|v?i{0,3}))'
+    r'[\s\-–—]*$',
+    re.IGNORECASE
+)
+_DIGITS = re.compile(r'\d+')
+
+
+def normalize(text: str) -> str:
+    """
+    Normalise Unicode and join words hyphenated across line breaks.
+
+    Args:
+        text: Raw page text
+
+    Returns:
+        Normalised text (line breaks kept)
+    """
+    text = unicodedata.normalize('NFKC', text).translate(_INVISIBLE)
+    return _LINE_HYPHEN.sub('', text)
+
+
+def sentence_key(sentence: str) -> bytes:
+    """
+    Hash a sentence for exact dedupe.
+
+    Args:
+        sentence: Cleaned sentence
+
+    Returns:
+        8-byte digest
+    """
+    return hashlib.blake2b(sentence.encode('utf-8'), digest_size=8).digest()
+
+
+def line_key(line: str) -> str:
+    """
+    Key a page-edge line for repetition counting.
+
+    Digits are masked so "Beyond Good And Evil 12" and "... 14" match.
+
+    Args:
+        line: Line text
+
+    Returns:
+        Normalised key
+    """
+    return _DIGITS.sub('#', ' '.join(line.lower().split()))
+
+
+class BoilerplateDetector:
+    """
+    Strip running headers, footers and page numbers by frequency analysis.
+
+    Only the first and last few non-empty lines of each page are candidates.
+    Their keys are counted across pages, and a line whose key appears on at
+    least ``min_repeats`` pages is treated as boilerplate. Pages are released
+    ``window`` pages late, so a running head is recognised even on the pages
+    where it first appears. Work per page is constant and at most ``window``
+    pages are held in memory.
+    """
+
+    def __init__(self, edge_lines: int = 2, min_repeats: int = 4, window: int = 20):
+        """
+        Initialize the detector.
+
+        Args:
+            edge_lines: Lines at the top and bottom of each page to consider
+            min_repeats: Pages a line must repeat on to count as boilerplate
+            window: Pages of look-ahead before a page is released
+        """
+        self.edge_lines = edge_lines
+        self.min_repeats = min_repeats
+        self.window = window
+        self.counts: Counter = Counter()
+        self._pending: Deque[List[str]] = deque()
+        self.stats: Dict[str, int] = {'page_numbers_removed': 0, 'boilerplate_lines_removed': 0}
+
+    def _edges(self, lines: List[str]) -> List[int]:
+        """Indexes of the first and last non-empty lines of a page."""
+        filled = [i for i, line in enumerate(lines) if line.strip()]
+        return sorted(set(filled[:self.edge_lines] + filled[-self.edge_lines:]))
+
+    def push(self, page_text: str) -> List[str]:
+        """
+        Add a page.
+
+        Args:
+            page_text: Raw page text
+
+        Returns:
+            Earlier pages, stripped, that are now ready
+        """
+        lines = page_text.split('\n')
+        self.counts.update({line_key(lines[i]) for i in self._edges(lines)})
+        self._pending.append(lines)
+        ready = []
+        while len(self._pending) > self.window:
+            ready.append(self._strip(self._pending.popleft()))
+        return ready
+
+    def flush(self) -> List[str]:
+        """
+        Release every held page.
+
+        Returns:
+            Remaining pages, stripped
+        """
+        ready = [self._strip(lines) for lines in self._pending]
+        self._pending.clear()
+        return ready
+
+    def strip(self, page_text: str) -> str:
+        """
+        Strip one page using the counts gathered so far, without counting it.
+
+        Args:
+            page_text: Raw page text
+
+        Returns:
+            Page text without boilerplate edge lines
+        """
+        return self._strip(page_text.split('\n'))
+
+    def _strip(self, lines: List[str]) -> str:
+        """Drop page-number and boilerplate lines from a page's edges."""
+        drop = set()
+        for i in self._edges(lines):
+            if _PAGE_NUMBER.match(lines[i]):
+                drop.add(i)
+                self.stats['page_numbers_removed'] += 1
+            elif self.counts[line_key(lines[i])] >= self.min_repeats:
+                drop.add(i)
+                self.stats['boilerplate_lines_removed'] += 1
+        return '\n'.join(line for i, line in enumerate(lines) if i not in drop)
+
+    def boilerplate(self, limit: int = 10) -> List[str]:
+        """
+        Most repeated edge-line keys that count as boilerplate.
+
+        Args:
+            limit: Maximum number of keys
+
+        Returns:
+            Keys, most frequent first
+        """
+        return [key for key, count in self.counts.most_common(limit) if count >= self.min_repeats]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Capture the detector state for a checkpoint.
+
+        Returns:
+            JSON-serialisable state
+        """
+        return {'counts': dict(self.counts), 'pending': list(self._pending), 'stats': dict(self.stats)}
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        """
+        Resume from a snapshot.
+
+        Args:
+            state: Value returned by snapshot()
+        """
+        self.counts = Counter(state['counts'])
+        self._pending = deque(state['pending'])
+        self.stats.update(state['stats'])
+
+
+def segment_page(
+    page_text: str,
+    clean: Callable[[str], str],
+    split: Callable[[str], List[str]],
+    boilerplate: Optional[BoilerplateDetector] = None
+) -> List[str]:
+    """
+    Segment a single page out of document order.
+
+    Without the neighbouring pages, the text before the first and after the
+    last sentence terminator may be a fragment of a sentence crossing the
+    page break, so both ends are dropped. Sentences are not deduplicated.
+
+    Args:
+        page_text: Raw page text
+        clean: Whitespace/artifact cleanup applied before splitting
+        split: Sentence splitter and length filter
+        boilerplate: Detector whose counts are used to strip the page
+
+    Returns:
+        Sentences found wholly on the page
+    """
+    if boilerplate:
+        page_text = boilerplate.strip(page_text)
+    text = normalize(page_text)
+    match = _LAST_TERMINATOR.match(text)
+    first = _FIRST_TERMINATOR.search(text)
+    if not match or first.end() >= match.end():
+        return []
+    return split(clean(text[first.end():match.end()]))
+
+
+class Ingestor:
+    """Turn a stream of page texts into unique, cleaned sentences."""
+
+    def __init__(
+        self,
+        clean: Callable[[str], str],
+        split: Callable[[str], List[str]],
+        boilerplate: Optional[BoilerplateDetector] = None
+    ):
+        """
+        Initialize the ingestor.
+
+        Args:
+            clean: Whitespace/artifact cleanup applied before splitting
+            split: Sentence splitter and length filter
+            boilerplate: Header/footer detector pages pass through first
+                         (None keeps every line)
+        """
+        self.clean = clean
+        self.split = split
+        self.boilerplate = boilerplate
+        self._carry = ''
+        self._seen: set = set()
+        self.stats: Dict[str, int] = {
+            'pages': 0,
+            'input_bytes': 0,
+            'sentences': 0,
+            'duplicate_sentences': 0,
+            'duplicate_bytes': 0,
+            'output_bytes': 0
+        }
+
+    def feed(self, page_text: str) -> List[str]:
+        """
+        Ingest one page.
+
+        With a boilerplate detector, pages are released a window late, so
+        the sentences returned may come from earlier pages.
+
+        Args:
+            page_text: Text extracted from the page
+
+        Returns:
+            New unique sentences completed so far
+        """
+        self.stats['pages'] += 1
+        self.stats['input_bytes'] += len(page_text.encode('utf-8'))
+        if not self.boilerplate:
+            return self._process(page_text)
+        kept = []
+        for ready in self.boilerplate.push(page_text):
+            kept.extend(self._process(ready))
+        return kept
+
+    def finish(self) -> List[str]:
+        """
+        Flush held pages and the text left after the last page.
+
+        Returns:
+            New unique sentences from the remainder
+        """
+        kept = []
+        if self.boilerplate:
+            for ready in self.boilerplate.flush():
+                kept.extend(self._process(ready))
+            self.stats.update(self.boilerplate.stats)
+        remainder, self._carry = self._carry, ''
+        kept.extend(self._emit(remainder))
+        return kept
+
+    def _process(self, page_text: str) -> List[str]:
+        """Normalise a page and emit the sentences it completes."""
+        text = normalize(page_text)
+        if self._carry:
+            # Rejoin a word hyphenated across the page break
+            text = _LINE_HYPHEN.sub('', self._carry + '\n' + text)
+
+        # Keep the unfinished last sentence for the next page
+        match = _LAST_TERMINATOR.match(text)
+        complete, self._carry = (text[:match.end()], text[match.end():]) if match else ('', text)
+        return self._emit(complete)
+
+    def _emit(self, text: str) -> List[str]:
+        """Split, dedupe and count."""
+        if not text.strip():
+            return []
+        kept = []
+        for sentence in self.split(self.clean(text)):
+            key = sentence_key(sentence)
+            size = len(sentence.encode('utf-8'))
+            if key in self._seen:
+                self.stats['duplicate_sentences'] += 1
+                self.stats['duplicate_bytes'] += size
+                continue
+            self._seen.add(key)
+            self.stats['sentences'] += 1
+            self.stats['output_bytes'] += size
+            kept.append(sentence)
+        return kept
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Capture the state between pages for a checkpoint.
+
+        Dedupe hashes are not included; restore() rebuilds them from the
+        sentences already emitted.
+
+        Returns:
+            JSON-serialisable state
+        """
+        return {
+            'carry': self._carry,
+            'stats': dict(self.stats),
+            'boilerplate': self.boilerplate.snapshot() if self.boilerplate else None
+        }
+
+    def restore(self, state: Dict[str, Any], sentences: Iterable[str]) -> None:
+        """
+        Resume from a snapshot.
+
+        Args:
+            state: Value returned by snapshot()
+            sentences: Sentences emitted before the snapshot
+        """
+        self._carry = state['carry']
+        self.stats.update(state['stats'])
+        self._seen = {sentence_key(sentence) for sentence in sentences}
+        if self.boilerplate and state.get('boilerplate'):
+            self.boilerplate.restore(state['boilerplate'])
+
+    def ingest(self, pages: Iterable[str]) -> Iterator[str]:
+        """
+        Stream unique sentences from page texts.
+
+        Args:
+            pages: Page texts
+
+        Yields:
+            Unique cleaned sentences
+        """
+        for page_text in pages:
+            yield from self.feed(page_text)
+        yield from self.finish()
@@ -0,0 +1,192 @@
+"""
+Leader election for running several bot replicas against one account.
+
+Replicas compete for a time-limited lease stored in a shared SQLite file.
+Only the lease holder posts; standbys keep their corpus and clients warm
+and take over within one lease TTL if the leader disappears.
+"""
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from typing import Callable, Optional
+
+
+class LeaderLease:
+    """Time-limited leadership lease backed by a shared SQLite database."""
+
+    def __init__(
+        self,
+        db_path: str,
+        name: str = 'nietzsche-bot',
+        ttl: float = 30.0,
+        holder_id: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+        on_change: Optional[Callable[[bool], None]] = None
+    ):
+        """
+        Initialize the lease.
+
+        Args:
+            db_path: Path to the SQLite file shared by all replicas
+            name: Lease name (one per posting account)
+            ttl: Seconds a lease stays valid without renewal
+            holder_id: Unique replica ID (defaults to host:pid:random)
+            clock: Function returning the current timestamp
+            on_change: Called with True/False when leadership is gained/lost
+        """
+        self.logger = logging.getLogger(__name__)
+        self.db_path = db_path
+        self.name = name
+        self.ttl = ttl
+        self.holder_id = holder_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.clock = clock
+        self.on_change = on_change
+        self._is_leader = False
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a short-lived connection in autocommit mode."""
+        return sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None)
+
+    def _init_db(self) -> None:
+        """Create the lease table if needed."""
+        directory = os.path.dirname(os.path.abspath(self.db_path))
+        os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS leases ("
+                "name TEXT PRIMARY KEY, holder TEXT, expires_at REAL, last_post_at REAL)"
+            )
+
+    def try_acquire(self) -> bool:
+        """
+        Acquire or renew the lease if it is free, expired or already ours.
+
+        Returns:
+            True if this replica holds the lease afterwards
+        """
+        now = self.clock()
+        try:
+            with closing(self._connect()) as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    "SELECT holder, expires_at FROM leases WHERE name = ?", (self.name,)
+                ).fetchone()
+                acquired = row is None or row[0] == self.holder_id or row[1] < now
+                if acquired:
+                    conn.execute(
+                        "INSERT INTO leases (name, holder, expires_at) VALUES (?, ?, ?) "
+                        "ON CONFLICT(name) DO UPDATE SET holder = excluded.holder, expires_at = excluded.expires_at",
+                        (self.name, self.holder_id, now + self.ttl)
+                    )
+                conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            self.logger.warning(f"Lease renewal failed: {str(e)}")
+            acquired = False
+
+        with self._lock:
+            was_leader = self._is_leader
+            if acquired:
+                self._expires_at = now + self.ttl
+            self._is_leader = acquired or (self._is_leader and now < self._expires_at)
+            changed = was_leader != self._is_leader
+
+        if changed:
+            self.logger.info(
+                f"{'Acquired' if self._is_leader else 'Lost'} leadership of {self.name} ({self.holder_id})"
+            )
+            if self.on_change:
+                self.on_change(self._is_leader)
+        return self._is_leader
+
+    def is_leader(self) -> bool:
+        """
+        Check leadership without touching the database.
+
+        Returns:
+            True if the lease is held and not about to expire
+        """
+        return self._is_leader and self.clock() < self._expires_at - self.ttl * 0.1
+
+    def ensure_leader(self) -> bool:
+        """
+        Renew the lease and confirm leadership (use right before posting).
+
+        Returns:
+            True if this replica may post
+        """
+        return self.try_acquire() and self.is_leader()
+
+    def record_post(self, timestamp: Optional[float] = None) -> None:
+        """
+        Store the time of the last post so a new leader keeps the cadence.
+
+        Args:
+            timestamp: Post time (defaults to now)
+        """
+        try:
+            with closing(self._connect()) as conn:
+                conn.execute(
+                    "UPDATE leases SET last_post_at = ? WHERE name = ?",
+                    (timestamp or self.clock(), self.name)
+                )
+        except sqlite3.Error as e:
+            self.logger.warning(f"Could not record last post time: {str(e)}")
+
+    def last_post_at(self) -> Optional[float]:
+        """
+        Get the last post time recorded by any replica.
+
+        Returns:
+            Timestamp, or None if nothing has been posted
+        """
+        try:
+            with closing(self._connect()) as conn:
+                row = conn.execute(
+                    "SELECT last_post_at FROM leases WHERE name = ?", (self.name,)
+                ).fetchone()
+            return row[0] if row else None
+        except sqlite3.Error:
+            return None
+
+    def _renew_loop(self) -> None:
+        """Renew the lease every third of its TTL."""
+        while not self._stop.is_set():
+            self.try_acquire()
+            self._stop.wait(self.ttl / 3)
+
+    def start(self) -> None:
+        """Start the background renewal thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._renew_loop, name='leader-lease', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop renewing and release the lease so a standby can take over at once."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        try:
+            with closing(self._connect()) as conn:
+                conn.execute(
+                    "UPDATE leases SET expires_at = 0 WHERE name = ? AND holder = ?",
+                    (self.name, self.holder_id)
+                )
+        except sqlite3.Error as e:
+            self.logger.warning(f"Could not release lease: {str(e)}")
+        with self._lock:
+            was_leader = self._is_leader
+            self._is_leader = False
+        if was_leader and self.on_change:
+            self.on_change(False)
@@ -3,32 +3,73 @@ Llama API integration for text processing.
 FREE models available via HuggingFace Inference API or Together AI.
 """
 import os
+import logging
 import requests
 from typing import Optional
 
+from candidates import rank
+from metrics import instrument_provider
+from usage_ledger import note_fallback, note_usage
+
 
 class LlamaProcessor:
     """Process text using Llama API (free tier available via Together AI)."""
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        candidates: Optional[int] = None
+    ):
         """
         Initialize Llama processor using Together AI.
 
         Args:
             api_key: Together AI API key (free tier available)
+            base_url: API base URL (defaults to LLAMA_BASE_URL or the public endpoint)
+            candidates: Rephrasings requested per call with the API's ``n``
+                        parameter; the best is picked locally (defaults to LLM_CANDIDATES or 3)
         """
+        self.logger = logging.getLogger(__name__)
         self.api_key = api_key or os.getenv('LLAMA_API_KEY')
         if not self.api_key:
             raise ValueError("LLAMA_API_KEY is required")
 
         # Using Together AI which has free tier for Llama models
-        self.base_url = "https://api.together.xyz/v1"
+        self.base_url = (base_url or os.getenv('LLAMA_BASE_URL') or "https://api.together.xyz/v1").rstrip('/')
+        self.candidates = max(1, candidates or int(os.getenv('LLM_CANDIDATES', '3')))
         # Free models available:
         # - meta-llama/Llama-3.2-3B-Instruct-Turbo (fast, small)
         # - meta-llama/Meta-Llama-3.1-8B-Instruct-Turbo (balanced)
         # - meta-llama/Meta-Llama-3.1-70B-Instruct-Turbo (best quality)
         self.model = "meta-llama/Meta-Llama-3.1-8B-Instruct-Turbo"
 
+    @staticmethod
+    def _clean_response(rephrased: str) -> str:
+        """
+        Strip quoting artifacts from model output and fit it in a tweet.
+
+        Args:
+            rephrased: Raw model output
+
+        Returns:
+            Cleaned text
+        """
+        rephrased = rephrased.strip()
+
+        # Clean up common artifacts
+        rephrased = rephrased.replace('"', '').replace('"', '').replace('"', '')
+        rephrased = rephrased.replace("'", "'").replace("'", "'")
+
+        # Remove any leading/trailing quotes
+        rephrased = rephrased.strip("'\"")
+
+        # Ensure it's not too long
+        if len(rephrased) > 280:
+            rephrased = rephrased[:277] + "..."
+        return rephrased
+
+    @instrument_provider('llama')
     def rephrase_quote(self, text: str) -> str:
         """
         Rephrase a quote using Llama.
@@ -60,6 +101,7 @@ class LlamaProcessor:
                     ],
                     "temperature": 0.8,
                     "max_tokens": 150,
+                    "n": self.candidates,
                     "top_p": 0.9
                 },
                 timeout=30
@@ -73,20 +115,23 @@ class LlamaProcessor:
             response.raise_for_status()
 
             result = response.json()
-            rephrased = result['choices'][0]['message']['content'].strip()
-
-            # Clean up common artifacts
-            rephrased = rephrased.replace('"', '').replace('"', '').replace('"', '')
-            rephrased = rephrased.replace("'", "'").replace("'", "'")
-
-            # Remove any leading/trailing quotes
-            rephrased = rephrased.strip("'\"")
-
-            # Ensure it's not too long
-            if len(rephrased) > 280:
-                rephrased = rephrased[:277] + "..."
-
-            return rephrased if rephrased else text
+            usage = result.get('usage') or {}
+            note_usage(usage.get('prompt_tokens'), usage.get('completion_tokens'))
+            choices = [self._clean_response(choice['message']['content'] or '') for choice in result['choices']]
+            ranked = rank(choices, text)
+
+            if not ranked:
+                self.logger.warning("Llama returned an empty response, using original")
+                note_fallback()
+                return text
+            if ranked[0][0] == 0:
+                self.logger.warning(f"No usable candidate among {len(choices)} from Llama, using original")
+                note_fallback()
+                return text
+            best_score, rephrased = ranked[0]
+            self.logger.info(f"Rephrased quote with {self.model} ({len(rephrased)} chars, "
+                             f"best of {len(choices)}, score {best_score:.2f})")
+            return rephrased
 
         except requests.exceptions.RequestException as e:
             raise Exception(f"Error calling Llama API: {str(e)}")
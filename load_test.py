@@ -0,0 +1,235 @@
+"""
+End-to-end load test against local fake services.
+
+Starts the fake X / OpenAI / Ollama server (or targets one already
+running), builds a NietzscheBot with real processor and X clients pointed
+at it, and pushes post_quote cycles through at a target rate with a pool
+of worker threads. Reports achieved throughput, cycle latency percentiles
+and outcome counts.
+
+Run with: python3 load_test.py --cycles 500 --rate 50 --concurrency 16
+"""
+import argparse
+import json
+import logging
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from bot import NietzscheBot
+from fake_services import FakeServices
+from simulation import SyntheticCorpus, _distribution
+from usage_ledger import LEDGER
+from x_poster import XPoster
+
+PROVIDERS = ('huggingface', 'groq', 'grok', 'llama', 'ollama')
+
+
+def build_processor(provider: str, base_url: str):
+    """
+    Create a real processor client pointed at the fake server.
+
+    Args:
+        provider: One of PROVIDERS
+        base_url: Fake server URL
+
+    Returns:
+        Processor instance
+    """
+    if provider == 'huggingface':
+        from huggingface_processor import HuggingFaceProcessor
+        return HuggingFaceProcessor(model='fake-model', api_token='fake', verify=False, base_url=base_url)
+    if provider == 'groq':
+        from groq_processor import GroqProcessor
+        return GroqProcessor(api_key='fake', base_url=f"{base_url}/openai/v1")
+    if provider == 'grok':
+        from grok_processor import GrokProcessor
+        return GrokProcessor(api_key='fake', base_url=f"{base_url}/v1")
+    if provider == 'llama':
+        from llama_processor import LlamaProcessor
+        return LlamaProcessor(api_key='fake', base_url=f"{base_url}/v1")
+    if provider == 'ollama':
+        from ollama_processor import OllamaProcessor
+        return OllamaProcessor(base_url=base_url)
+    raise ValueError(f"Unknown provider {provider!r}, expected one of {', '.join(PROVIDERS)}")
+
+
+def run_load_test(
+    cycles: int = 200,
+    rate: float = 20.0,
+    concurrency: int = 8,
+    provider: str = 'huggingface',
+    target: Optional[str] = None,
+    pdf_path: Optional[str] = None,
+    corpus_size: int = 5000,
+    latency: float = 0.05,
+    error_rate: float = 0.0,
+    rate_limit: int = 0,
+    post_retries: int = 0,
+    seed: int = 0,
+    pipeline: bool = False,
+    verbose: bool = False
+) -> Dict[str, Any]:
+    """
+    Push post cycles through the bot against fake services.
+
+    Args:
+        cycles: Number of post cycles
+        rate: Target cycles started per second (0 = as fast as possible)
+        concurrency: Worker threads running cycles
+        provider: LLM provider client to use
+        target: URL of an already running fake server (default: start one)
+        pdf_path: PDF corpus (default: synthetic in-memory corpus)
+        corpus_size: Synthetic corpus size
+        latency: Median fake API latency in seconds
+        error_rate: Fraction of fake API requests that fail
+        rate_limit: Tweets per 15 minutes before 429s (0 = unlimited)
+        post_retries: Retries per failed tweet post
+        seed: Random seed
+        pipeline: Run cycles through the staged bulk pipeline instead of
+                  concurrent post_quote calls
+        verbose: Keep bot logging on (on stderr)
+
+    Returns:
+        Report dictionary
+    """
+    # Configure logging before the bot does, so its records go to stderr and
+    # stdout stays clean for --json
+    level = logging.INFO if verbose else logging.CRITICAL
+    logging.basicConfig(level=level, stream=sys.stderr,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    logging.getLogger().setLevel(level)
+
+    services = None
+    if not target:
+        services = FakeServices(
+            latency=latency, error_rate=error_rate, rate_limit=rate_limit, seed=seed
+        ).start()
+        target = services.url
+
+    workdir = Path(tempfile.mkdtemp(prefix='nietzsche_load_'))
+    try:
+        if pdf_path:
+            from pdf_extractor import PDFExtractor
+            corpus = PDFExtractor(pdf_path)
+        else:
+            corpus = SyntheticCorpus(corpus_size, random.Random(seed))
+
+        config = {
+            'post_retries': post_retries,
+            'post_retry_delay_seconds': 0.1,
+            'log_dir': str(workdir / 'logs'),
+            'state_dir': str(workdir / 'state'),
+            'watchdog_interval_seconds': 0
+        }
+        bot = NietzscheBot(
+            config,
+            components={
+                'pdf_extractor': corpus,
+                'processor': build_processor(provider, target),
+                'x_poster': XPoster('fake', 'fake', 'fake', 'fake', verify=False, api_base_url=target)
+            }
+        )
+
+        latencies: List[float] = []
+        lock = threading.Lock()
+
+        def cycle() -> None:
+            start = time.perf_counter()
+            bot.post_quote()
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+        wall_start = time.perf_counter()
+        if pipeline:
+            if concurrency:
+                bot.config['pipeline_workers'] = {'rephrase': concurrency, 'post': max(1, concurrency // 4)}
+            bot.generate_bulk(cycles, post=True, on_draft=lambda draft: latencies.append(sum(draft['timings'].values())),
+                              pace=rate or None)
+        else:
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='load') as pool:
+                for index in range(cycles):
+                    if rate > 0:
+                        wait = wall_start + index / rate - time.perf_counter()
+                        if wait > 0:
+                            time.sleep(wait)
+                    pool.submit(cycle)
+        wall = time.perf_counter() - wall_start
+
+        server_stats = dict(services.stats) if services else None
+        bot.stop()
+        if services:
+            services.stop()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        'provider': provider,
+        'cycles': cycles,
+        'concurrency': concurrency,
+        'target_rate': rate,
+        'achieved_rate': round(cycles / wall, 2) if wall else None,
+        'wall_seconds': round(wall, 3),
+        'posted': bot.posts_succeeded,
+        'failed': bot.posts_failed,
+        'post_retries': bot.post_retries,
+        'cycle_latency_ms': _distribution([seconds * 1000 for seconds in latencies]),
+        'usage': LEDGER.rollups(),
+        'pipeline': bot.bulk_pipeline.stats() if bot.bulk_pipeline else None,
+        'server': server_stats
+    }
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Load-test post cycles against local fake APIs")
+    parser.add_argument('--cycles', type=int, default=200)
+    parser.add_argument('--rate', type=float, default=20.0, help="Cycles started per second (0 = unthrottled)")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--provider', choices=PROVIDERS, default='huggingface')
+    parser.add_argument('--target', help="URL of a running fake_services.py (default: start one)")
+    parser.add_argument('--pdf', dest='pdf_path', help="Use a PDF corpus, e.g. from synthetic_pdf.py")
+    parser.add_argument('--corpus-size', type=int, default=5000)
+    parser.add_argument('--latency', type=float, default=0.05, help="Median fake API latency in seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=int, default=0, help="Tweets per 15 minutes before 429")
+    parser.add_argument('--post-retries', type=int, default=0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--pipeline', action='store_true',
+                        help="Use the staged pipeline (rephrase workers = concurrency)")
+    parser.add_argument('--verbose', action='store_true')
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    args = vars(parser.parse_args())
+    as_json = args.pop('json')
+
+    report = run_load_test(**args)
+    if as_json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"Provider: {report['provider']}, {report['cycles']} cycles, concurrency {report['concurrency']}")
+    print(f"Rate: target {report['target_rate']}/s, achieved {report['achieved_rate']}/s "
+          f"({report['wall_seconds']}s)")
+    print(f"Posted: {report['posted']}, failed: {report['failed']}, retries: {report['post_retries']}")
+    print(f"Cycle latency (ms): {report['cycle_latency_ms']}")
+    for row in report['usage']:
+        print(f"LLM usage ({row['provider']}/{row['model']}): {row['calls']} calls, "
+              f"{row['prompt_tokens']}+{row['completion_tokens']} tokens, mean {row['latency_ms_mean']} ms, "
+              f"fallback rate {row['fallback_rate']:.1%}")
+    if report['pipeline']:
+        for stage in report['pipeline']['stages']:
+            print(f"Stage {stage['stage']:8s} workers {stage['workers']:2d}  processed {stage['processed']:5d}  "
+                  f"rejected {stage['rejected']}  errors {stage['errors']}  "
+                  f"{stage['throughput_per_second']}/s  utilization {stage['utilization']:.0%}")
+    if report['server']:
+        print(f"Fake server requests: {report['server']}")
+
+
+if __name__ == '__main__':
+    main()
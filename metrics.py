@@ -0,0 +1,321 @@
+"""
+Lightweight Prometheus-style metrics for the Nietzsche quotes bot.
+
+Counters and histograms are plain dicts guarded by a lock, so recording
+a sample costs a few microseconds and needs no extra dependencies.
+"""
+import bisect
+import functools
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from usage_ledger import LEDGER
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    """Render a Prometheus label set."""
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value without losing precision on large integers."""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Monotonically increasing counter with optional labels."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """
+        Initialize counter.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            labelnames: Label names, values are passed to inc() by keyword
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Increment the counter for a label set."""
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels: str) -> float:
+        """Get the current value for a label set."""
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        return self._values.get(key, 0.0)
+
+    def render(self) -> List[str]:
+        """Render in Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with optional labels."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        """
+        Initialize histogram.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            labelnames: Label names, values are passed to observe() by keyword
+            buckets: Sorted upper bounds (seconds)
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record a sample for a label set."""
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            state[index] += 1
+            state[-1] += value
+
+    def snapshot(self, **labels: str) -> Tuple[int, float]:
+        """
+        Get (count, sum) for a label set.
+
+        Returns:
+            Tuple of sample count and sum of values
+        """
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                return 0, 0.0
+            return int(sum(state[:-1])), state[-1]
+
+    def render(self) -> List[str]:
+        """Render in Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        for key, state in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, 'le="%g"' % bound)
+                lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+            cumulative += state[len(self.buckets)]
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {state[-1]:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {_format_value(cumulative)}")
+        return lines
+
+
+class Gauge:
+    """Gauge whose value is read from a callback at scrape time."""
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], float]):
+        """
+        Initialize gauge.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            callback: Function returning the current value
+        """
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+
+    def render(self) -> List[str]:
+        """Render in Prometheus text format."""
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {_format_value(self.callback())}"
+        ]
+
+
+class Registry:
+    """Collection of metrics rendered together on /metrics."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """
+        Register a metric (returns the existing one if the name is taken).
+
+        Args:
+            metric: Counter, Histogram or Gauge
+
+        Returns:
+            The registered metric
+        """
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def render(self) -> str:
+        """
+        Render all metrics in Prometheus text exposition format.
+
+        Returns:
+            Exposition text
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+def process_rss_bytes() -> int:
+    """
+    Get the current resident set size of this process.
+
+    Returns:
+        RSS in bytes (peak RSS where the current value is unavailable)
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+REGISTRY = Registry()
+
+STAGE_LATENCY = REGISTRY.register(Histogram(
+    'nietzsche_stage_duration_seconds', 'Duration of post pipeline stages', ['stage']
+))
+STAGE_TOTAL = REGISTRY.register(Counter(
+    'nietzsche_stage_total', 'Post pipeline stage executions by outcome', ['stage', 'outcome']
+))
+PROVIDER_LATENCY = REGISTRY.register(Histogram(
+    'nietzsche_llm_request_duration_seconds', 'Duration of LLM rephrase calls', ['provider']
+))
+PROVIDER_TOTAL = REGISTRY.register(Counter(
+    'nietzsche_llm_requests_total', 'LLM rephrase calls by outcome', ['provider', 'outcome']
+))
+REPHRASE_SHARED = REGISTRY.register(Counter(
+    'nietzsche_rephrase_coalesced_total', 'Rephrase requests that joined an identical in-flight LLM call'
+))
+POST_RETRIES = REGISTRY.register(Counter(
+    'nietzsche_post_retries_total', 'Tweet post attempts retried after a failure'
+))
+REGISTRY.register(Gauge(
+    'process_resident_memory_bytes', 'Resident memory size in bytes', process_rss_bytes
+))
+_START_TIME = time.time()
+REGISTRY.register(Gauge(
+    'process_start_time_seconds', 'Start time of the process since unix epoch in seconds', lambda: _START_TIME
+))
+
+
+class StageTiming:
+    """Duration of a tracked stage, filled in when the stage ends."""
+
+    def __init__(self):
+        """Initialize with no duration yet."""
+        self.seconds: Optional[float] = None
+
+
+@contextmanager
+def track_stage(stage: str) -> Iterator[StageTiming]:
+    """
+    Time a pipeline stage and count its outcome.
+
+    Args:
+        stage: Stage name, e.g. "select", "rephrase", "post"
+
+    Yields:
+        StageTiming whose ``seconds`` is set when the block exits
+    """
+    timing = StageTiming()
+    start = time.perf_counter()
+    outcome = 'error'
+    try:
+        yield timing
+        outcome = 'success'
+    finally:
+        timing.seconds = time.perf_counter() - start
+        STAGE_LATENCY.observe(timing.seconds, stage=stage)
+        STAGE_TOTAL.inc(stage=stage, outcome=outcome)
+
+
+def instrument_provider(provider: str) -> Callable:
+    """
+    Decorate a processor's rephrase method with latency and outcome metrics.
+
+    Each call is also accounted in the usage ledger, where the processor can
+    add token counts, retries and fallbacks. A call that returned after
+    note_fallback() is counted with outcome "fallback", not "success".
+
+    Args:
+        provider: Provider label, e.g. "groq"
+
+    Returns:
+        Decorator
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            outcome = 'error'
+            model = getattr(args[0], 'model', None) if args else None
+            try:
+                with LEDGER.call(provider, model) as usage:
+                    result = func(*args, **kwargs)
+                    # Processors that swallow their errors and return the input still failed
+                    outcome = usage['outcome'] = 'fallback' if usage.get('fallback') else 'success'
+                return result
+            finally:
+                PROVIDER_LATENCY.observe(time.perf_counter() - start, provider=provider)
+                PROVIDER_TOTAL.inc(provider=provider, outcome=outcome)
+        return wrapper
+    return decorator
+
+
+def metrics_response() -> Tuple[int, str, bytes]:
+    """
+    Health server handler for /metrics.
+
+    Returns:
+        Tuple of (status code, content type, body)
+    """
+    return 200, 'text/plain; version=0.0.4; charset=utf-8', REGISTRY.render().encode('utf-8')
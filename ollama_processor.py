@@ -2,22 +2,28 @@
 Ollama integration for text processing.
 """
 import json
+import logging
+import os
 import requests
 from typing import Optional
 
+from metrics import instrument_provider
+from usage_ledger import note_fallback, note_usage
+
 
 class OllamaProcessor:
     """Process text using local Ollama model."""
 
-    def __init__(self, base_url: str = "http://localhost:11434", model: str = "llama2"):
+    def __init__(self, base_url: Optional[str] = None, model: str = "llama2"):
         """
         Initialize Ollama processor.
 
         Args:
-            base_url: Ollama API base URL
+            base_url: Ollama API base URL (defaults to OLLAMA_BASE_URL or http://localhost:11434)
             model: Model name to use
         """
-        self.base_url = base_url.rstrip('/')
+        self.logger = logging.getLogger(__name__)
+        self.base_url = (base_url or os.getenv('OLLAMA_BASE_URL') or "http://localhost:11434").rstrip('/')
         self.model = model
         self._verify_connection()
 
@@ -29,6 +35,28 @@ class OllamaProcessor:
         except requests.exceptions.RequestException as e:
             raise ConnectionError(f"Cannot connect to Ollama at {self.base_url}: {str(e)}")
 
+    @staticmethod
+    def _clean_response(rephrased: str) -> str:
+        """
+        Strip quoting artifacts from model output and fit it in a tweet.
+
+        Args:
+            rephrased: Raw model output
+
+        Returns:
+            Cleaned text
+        """
+        rephrased = rephrased.strip()
+
+        # Clean up common artifacts
+        rephrased = rephrased.replace('"', '').replace("'", "'")
+
+        # Ensure it's not too long
+        if len(rephrased) > 280:
+            rephrased = rephrased[:277] + "..."
+        return rephrased
+
+    @instrument_provider('ollama')
     def rephrase_quote(self, text: str) -> str:
         """
         Rephrase a quote using Ollama.
@@ -66,16 +94,15 @@ Rephrased quote:"""
             response.raise_for_status()
 
             result = response.json()
-            rephrased = result.get('response', '').strip()
-
-            # Clean up common artifacts
-            rephrased = rephrased.replace('"', '').replace("'", "'")
-
-            # Ensure it's not too long
-            if len(rephrased) > 280:
-                rephrased = rephrased[:277] + "..."
-
-            return rephrased if rephrased else text
+            note_usage(result.get('prompt_eval_count'), result.get('eval_count'))
+            rephrased = self._clean_response(result.get('response', ''))
+
+            if not rephrased:
+                self.logger.warning("Ollama returned an empty response, using original")
+                note_fallback()
+                return text
+            self.logger.info(f"Rephrased quote with {self.model} ({len(rephrased)} chars)")
+            return rephrased
 
         except requests.exceptions.RequestException as e:
             raise Exception(f"Error calling Ollama API: {str(e)}")
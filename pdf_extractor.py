@@ -1,47 +1,327 @@
 """
 PDF text extraction utility for Nietzsche quotes bot.
 """
+import logging
 import random
 import re
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import List
-import PyPDF2
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from extract_checkpoint import ExtractionCheckpoint
+from ingest import BoilerplateDetector, Ingestor, segment_page
+
+# Pages sampled at startup in lazy mode to learn running headers and footers
+LAZY_SAMPLE_PAGES = 12
+# Page attributes a /Page inherits from its /Pages ancestors
+INHERITABLE_PAGE_ATTRIBUTES = ('/Resources', '/MediaBox', '/CropBox', '/Rotate')
 
 
 class PDFExtractor:
     """Extract and manage text from PDF files."""
 
-    def __init__(self, pdf_path: str):
+    def __init__(
+        self,
+        pdf_path: str,
+        checkpoint_dir: Optional[str] = None,
+        checkpoint_pages: int = 50,
+        lazy: bool = False,
+        page_cache_size: int = 64,
+        load: bool = True
+    ):
         """
         Initialize PDF extractor.
 
+        In lazy mode only a page index is built here. Random sentences come
+        from pages extracted on demand until start_fill() has loaded the
+        full sentence set in the background.
+
         Args:
             pdf_path: Path to the PDF file
+            checkpoint_dir: Directory for extraction checkpoints, so a killed
+                            load resumes where it stopped (None disables)
+            checkpoint_pages: Pages extracted between checkpoints
+            lazy: Build a page index instead of extracting every page
+            page_cache_size: Segmented pages kept in memory in lazy mode
+            load: Read the PDF now (False leaves it for _load_pdf(), e.g. in benchmarks)
         """
         self.pdf_path = Path(pdf_path)
+        self.work = self.pdf_path.stem
+        self.checkpoint_dir = checkpoint_dir
+        self.checkpoint_pages = max(1, checkpoint_pages)
         self.sentences: List[str] = []
-        self._load_pdf()
+        self.ingest_stats: Dict[str, int] = {}
+        # 1-based page number -> error for pages PyPDF2 could not read
+        self.bad_pages: Dict[int, str] = {}
+        self.logger = logging.getLogger(__name__)
+        self.lazy = lazy
+        self.page_cache_size = max(1, page_cache_size)
+        self.page_count = 0
+        # Set once self.sentences holds the whole document
+        self.complete = threading.Event()
+        self._page_cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._reader_lock = threading.Lock()
+        self._closing = threading.Event()
+        self._file = None
+        self._reader = None
+        self._boilerplate: Optional[BoilerplateDetector] = None
+        self._empty_pages: set = set()
+        self._filler: Optional[threading.Thread] = None
+        if not load:
+            return
+        if lazy:
+            self._build_page_index()
+        else:
+            self._load_pdf()
+
+    @classmethod
+    def from_sentences(cls, sentences: List[str], pdf_path: str = 'sentences.pdf') -> 'PDFExtractor':
+        """
+        Create an extractor over sentences that are already extracted.
+
+        Args:
+            sentences: Sentences to serve
+            pdf_path: Nominal source path (its stem is the work name)
+
+        Returns:
+            Extractor with the full sentence set loaded
+        """
+        extractor = cls(pdf_path, load=False)
+        extractor.sentences = list(sentences)
+        extractor.complete.set()
+        return extractor
+
+    def _build_page_index(self) -> None:
+        """Open the PDF, count its pages and sample a few to learn its headers and footers."""
+        if not self.pdf_path.exists():
+            raise FileNotFoundError(f"PDF file not found: {self.pdf_path}")
+
+        import PyPDF2
+
+        try:
+            self._file = open(self.pdf_path, 'rb')
+            self._reader = PyPDF2.PdfReader(self._file)
+            # len(reader.pages) would flatten the whole page tree; the root node has the count
+            self.page_count = int(self._reader.trailer['/Root'].get_object()['/Pages'].get_object()['/Count'])
+        except Exception as e:
+            self.close()
+            raise Exception(f"Error reading PDF: {str(e)}")
+
+        sample = range(0, self.page_count, max(1, self.page_count // LAZY_SAMPLE_PAGES))
+        self._boilerplate = BoilerplateDetector(min_repeats=3, window=len(sample))
+        for number in sample:
+            text = self._page_text(self._locate_page, number)
+            if text is not None:
+                self._boilerplate.push(text)
+        self.logger.info(f"Indexed {self.page_count} pages of {self.pdf_path.name}; "
+                         f"sentences are extracted on demand")
+
+    def _locate_page(self, number: int) -> Any:
+        """
+        Load one page by walking the page tree, using each node's /Count to
+        skip whole subtrees instead of flattening every page like
+        PdfReader.pages does.
+
+        Args:
+            number: 0-based page index
+
+        Returns:
+            PyPDF2 page object
+        """
+        from PyPDF2 import PageObject
+
+        node = self._reader.trailer['/Root'].get_object()['/Pages'].get_object()
+        reference = None
+        inherited = {}
+        while '/Kids' in node:
+            inherited.update((attr, node[attr]) for attr in INHERITABLE_PAGE_ATTRIBUTES if attr in node)
+            kids = node['/Kids']
+            if int(node.get('/Count', -1)) == len(kids) and number < len(kids):
+                # Usually one page per kid (a flat tree): index it directly
+                child = kids[number].get_object()
+                if '/Kids' not in child or int(child.get('/Count', 0)) == 1:
+                    node, reference, number = child, kids[number], 0
+                    continue
+            for kid in kids:
+                child = kid.get_object()
+                count = int(child.get('/Count', 1)) if '/Kids' in child else 1
+                if number < count:
+                    node, reference = child, kid
+                    break
+                number -= count
+            else:
+                raise IndexError("Page index out of range")
+        page = PageObject(self._reader, reference if hasattr(reference, 'idnum') else None)
+        page.update({**inherited, **node})
+        return page
+
+    def start_fill(self) -> None:
+        """Start loading the full sentence set in a background thread (lazy mode)."""
+        if not self.lazy or self.complete.is_set() or self._filler:
+            return
+        self._filler = threading.Thread(target=self._fill, name='pdf-fill', daemon=True)
+        self._filler.start()
+
+    def _fill(self) -> None:
+        """Background full load; on-demand pages keep serving if it fails."""
+        try:
+            self._load_pdf()
+        except Exception as e:
+            self.logger.error(f"Background extraction of {self.pdf_path.name} failed: {str(e)}")
+            return
+        if self.complete.is_set():
+            self.clear_page_cache()
+            self._close_reader()
+
+    def close(self) -> None:
+        """Stop the background load (keeping its checkpoint) and close the page index."""
+        self._closing.set()
+        if self._filler and self._filler is not threading.current_thread():
+            self._filler.join()
+        self._close_reader()
+
+    def _close_reader(self) -> None:
+        with self._reader_lock:
+            if self._file:
+                self._file.close()
+            self._file = None
+            self._reader = None
+
+    def clear_page_cache(self) -> None:
+        """Drop on-demand segmented pages."""
+        with self._cache_lock:
+            self._page_cache.clear()
+
+    def _page_sentences(self, number: int) -> List[str]:
+        """
+        Sentences of one page, through the LRU page cache.
+
+        Args:
+            number: 0-based page index
+
+        Returns:
+            Sentences found wholly on the page
+        """
+        with self._cache_lock:
+            if number in self._page_cache:
+                self._page_cache.move_to_end(number)
+                return self._page_cache[number]
+
+        with self._reader_lock:
+            if self._reader is None:
+                return []
+            text = self._page_text(self._locate_page, number)
+        sentences = segment_page(text, self._clean_text, self._split_sentences, self._boilerplate) if text else []
+
+        with self._cache_lock:
+            self._page_cache[number] = sentences
+            while len(self._page_cache) > self.page_cache_size:
+                self._page_cache.popitem(last=False)
+        return sentences
 
     def _load_pdf(self) -> None:
-        """Load and extract text from PDF."""
+        """Load and extract text from PDF, resuming from a checkpoint if there is one."""
         if not self.pdf_path.exists():
             raise FileNotFoundError(f"PDF file not found: {self.pdf_path}")
 
+        import PyPDF2
+
+        checkpoint = ExtractionCheckpoint(self.checkpoint_dir, str(self.pdf_path)) if self.checkpoint_dir else None
+        ingestor = Ingestor(self._clean_text, self._split_sentences, BoilerplateDetector())
+        sentences: List[str] = []
+        next_page = 0
+        saved = checkpoint.load() if checkpoint else None
+        if saved:
+            state, sentences = saved
+            self.bad_pages = {int(page): error for page, error in state['bad_pages'].items()}
+            if state.get('complete'):
+                self.sentences = sentences
+                self.ingest_stats = state['ingest']['stats']
+                self.complete.set()
+                self.logger.info(f"Loaded {len(sentences)} sentences of {self.pdf_path.name} from extraction checkpoint")
+                return
+            ingestor.restore(state['ingest'], sentences)
+            next_page = state['next_page']
+            self.logger.info(f"Resuming extraction of {self.pdf_path.name} at page {next_page + 1} "
+                             f"({len(sentences)} sentences already extracted)")
+
         try:
             with open(self.pdf_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + " "
+                page_count = len(pdf_reader.pages)
+                # Pages stream through normalisation, segmentation and dedupe one at a time
+                for start in range(next_page, page_count, self.checkpoint_pages):
+                    end = min(start + self.checkpoint_pages, page_count)
+                    extracted = []
+                    for number in range(start, end):
+                        if self._closing.is_set():
+                            # The unfinished range is redone from the last checkpoint
+                            self.logger.info(f"Extraction of {self.pdf_path.name} stopped at page {number + 1}")
+                            return
+                        text = self._page_text(pdf_reader.pages.__getitem__, number)
+                        if text is not None:
+                            extracted.extend(ingestor.feed(text))
+                    sentences.extend(extracted)
+                    if checkpoint:
+                        checkpoint.save(extracted, self._checkpoint_state(end, ingestor))
+                extracted = ingestor.finish()
+                sentences.extend(extracted)
+                if checkpoint:
+                    checkpoint.save(extracted, dict(self._checkpoint_state(page_count, ingestor), complete=True))
 
-                # Clean and split into sentences
-                text = self._clean_text(text)
-                self.sentences = self._split_sentences(text)
+                self.sentences = sentences
+                self.ingest_stats = ingestor.stats
+                self.complete.set()
+                self.logger.info(
+                    f"Extracted {len(self.sentences)} sentences from {page_count} pages of {self.pdf_path.name}"
+                )
+                if self.bad_pages:
+                    self.logger.warning(f"Skipped {len(self.bad_pages)} unreadable page(s): "
+                                        f"{', '.join(map(str, sorted(self.bad_pages)))}")
+                self._log_ingest_stats()
 
         except Exception as e:
             raise Exception(f"Error reading PDF: {str(e)}")
 
+    def _page_text(self, load_page: Callable[[int], Any], number: int) -> Optional[str]:
+        """
+        Extract one page's text, recording the page instead of failing the load.
+
+        Args:
+            load_page: Returns the PyPDF2 page object for a 0-based index
+            number: 0-based page index
+
+        Returns:
+            Page text, or None if PyPDF2 could not read the page
+        """
+        try:
+            return load_page(number).extract_text() or ''
+        except Exception as e:
+            self.bad_pages[number + 1] = str(e)
+            self.logger.warning(f"Skipping page {number + 1} of {self.pdf_path.name}: {str(e)}")
+            return None
+
+    def _checkpoint_state(self, next_page: int, ingestor: Ingestor) -> Dict:
+        """State saved after a page range."""
+        return {'next_page': next_page, 'ingest': ingestor.snapshot(), 'bad_pages': self.bad_pages}
+
+    def _log_ingest_stats(self) -> None:
+        """Log how much text ingest removed."""
+        stats = self.ingest_stats
+        removed = stats['input_bytes'] - stats['output_bytes']
+        self.logger.info(
+            f"Ingest removed {stats['duplicate_sentences']} duplicate sentences "
+            f"({stats['duplicate_bytes'] / 1024:.1f} KiB) and {removed / 1024:.1f} KiB of "
+            f"{stats['input_bytes'] / 1024:.1f} KiB extracted text in total"
+        )
+        if 'page_numbers_removed' in stats:
+            self.logger.info(
+                f"Ingest stripped {stats['boilerplate_lines_removed']} running header/footer "
+                f"lines and {stats['page_numbers_removed']} page numbers"
+            )
+
     def _clean_text(self, text: str) -> str:
         """
         Clean extracted text.
@@ -88,10 +368,49 @@ class PDFExtractor:
         Returns:
             Random sentence
         """
+        return self.get_random_entry()[1]
+
+    def get_random_entry(self) -> Tuple[Optional[int], str]:
+        """
+        Get a random sentence together with its index.
+
+        Returns:
+            Tuple of (sentence index, sentence); the index is None for a
+            sentence from an on-demand page, whose position is not known yet
+        """
+        if self.lazy and not self.complete.is_set():
+            return None, self._random_page_sentence()
         if not self.sentences:
             raise ValueError("No sentences available")
 
-        return random.choice(self.sentences)
+        index = random.randrange(len(self.sentences))
+        self.logger.debug(f"Selected sentence {index} of {len(self.sentences)}")
+        return index, self.sentences[index]
+
+    def _random_page_sentence(self, attempts: int = 20) -> str:
+        """
+        Pick a random sentence from a random page.
+
+        Args:
+            attempts: Pages to try before giving up
+
+        Returns:
+            Random sentence
+        """
+        for _ in range(attempts):
+            if not self.page_count:
+                break
+            number = random.randrange(self.page_count)
+            if number in self._empty_pages:
+                continue
+            sentences = self._page_sentences(number)
+            if sentences:
+                self.logger.debug(f"Selected a sentence from page {number + 1} of {self.page_count}")
+                return random.choice(sentences)
+            self._empty_pages.add(number)
+        if self.complete.is_set():
+            return self.get_random_entry()[1]
+        raise ValueError("No sentences available")
 
     def get_sentence_count(self) -> int:
         """
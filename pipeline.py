@@ -0,0 +1,326 @@
+"""
+Staged work pipeline with bounded queues.
+
+Work items (draft dictionaries) flow through named stages such as
+select -> rephrase -> validate -> post. In concurrent mode each stage has
+its own pool of worker threads reading from a bounded queue, so when one
+stage falls behind (a slow LLM) the queues in front of it fill up and
+submit() blocks instead of piling up work. process() runs one item through
+the stages in the caller's thread for the scheduled single post, recording
+the same per-stage statistics.
+"""
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+# Queue marker telling a worker to exit
+_DONE = object()
+
+
+class Rejected(Exception):
+    """Raised by a stage to drop an item (counted as rejected, not as an error)."""
+
+
+def parse_workers(spec: Optional[str]) -> Dict[str, int]:
+    """
+    Parse worker counts like "rephrase:4,post:1".
+
+    Args:
+        spec: Comma-separated stage:count pairs
+
+    Returns:
+        Worker counts keyed by stage name
+    """
+    workers = {}
+    for item in (spec or '').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            name, count = item.split(':')
+            workers[name.strip()] = max(1, int(count))
+        except ValueError:
+            raise ValueError(f"Invalid worker count {item!r}, expected stage:count")
+    return workers
+
+
+class Stage:
+    """One pipeline stage: a function applied to each item, plus its statistics."""
+
+    def __init__(self, name: str, func: Callable[[Any], Any], workers: int = 1, queue_size: int = 8):
+        """
+        Initialize the stage.
+
+        Args:
+            name: Stage name
+            func: Called with an item; returns the item for the next stage
+                  or raises Rejected to drop it
+            workers: Worker threads in concurrent mode
+            queue_size: Capacity of the stage's input queue in concurrent mode
+        """
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.processed = 0
+        self.rejected = 0
+        self.errors = 0
+        self.active = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def run(self, item: Any) -> Any:
+        """
+        Apply the stage to one item and record the outcome.
+
+        Args:
+            item: Work item
+
+        Returns:
+            Item for the next stage
+        """
+        with self._lock:
+            self.active += 1
+        start = time.perf_counter()
+        outcome = 'errors'
+        try:
+            result = self.func(item)
+            outcome = 'processed'
+            return result
+        except Rejected:
+            outcome = 'rejected'
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.active -= 1
+                self.busy_seconds += elapsed
+                setattr(self, outcome, getattr(self, outcome) + 1)
+
+
+class Pipeline:
+    """Stages linked by bounded queues, each served by its own worker pool."""
+
+    def __init__(
+        self,
+        stages: Sequence[Stage],
+        name: str = 'pipeline',
+        on_result: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[str, Any, Exception], None]] = None
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            stages: Stages in order
+            name: Label used in log messages and thread names
+            on_result: Called with each item that leaves the last stage
+                       (default: collect them in ``results``)
+            on_error: Called with (stage name, item, exception) when a stage
+                      rejects an item or fails (default: log it)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.stages = list(stages)
+        self.name = name
+        self.on_result = on_result
+        self.on_error = on_error
+        self.results: List[Any] = []
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._queues: List[queue.Queue] = []
+        self._threads: List[List[threading.Thread]] = []
+        self._cancelled = threading.Event()
+        self._results_lock = threading.Lock()
+
+    def stage(self, name: str) -> Stage:
+        """
+        Look up a stage by name.
+
+        Args:
+            name: Stage name
+
+        Returns:
+            The stage
+        """
+        for stage in self.stages:
+            if stage.name == name:
+                return stage
+        raise KeyError(f"No stage named {name!r}")
+
+    def process(self, item: Any, only: Optional[Sequence[str]] = None) -> Any:
+        """
+        Run one item through the stages in the calling thread.
+
+        Rejections and errors propagate to the caller.
+
+        Args:
+            item: Work item
+            only: Names of the stages to run (default: all, in order)
+
+        Returns:
+            The item returned by the last stage run
+        """
+        if self.started_at is None:
+            self.started_at = time.perf_counter()
+        for stage in self.stages:
+            if only is None or stage.name in only:
+                item = stage.run(item)
+        return item
+
+    def start(self) -> 'Pipeline':
+        """Create the queues and start every stage's workers."""
+        self.started_at = time.perf_counter()
+        self.finished_at = None
+        self._cancelled.clear()
+        self._queues = [queue.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        self._threads = []
+        for index, stage in enumerate(self.stages):
+            threads = [
+                threading.Thread(
+                    target=self._work, args=(index,), name=f"{self.name}-{stage.name}-{n}", daemon=True
+                )
+                for n in range(stage.workers)
+            ]
+            for thread in threads:
+                thread.start()
+            self._threads.append(threads)
+        return self
+
+    def submit(self, item: Any, timeout: Optional[float] = None) -> bool:
+        """
+        Queue an item for the first stage, blocking while that queue is full.
+
+        Args:
+            item: Work item
+            timeout: Seconds to wait for room (None waits indefinitely)
+
+        Returns:
+            True if queued, False if cancelled or timed out
+        """
+        if self._cancelled.is_set():
+            return False
+        try:
+            self._queues[0].put(item, timeout=timeout)
+            return True
+        except queue.Full:
+            return False
+
+    def _work(self, index: int) -> None:
+        """Worker loop for one stage."""
+        stage = self.stages[index]
+        inbox = self._queues[index]
+        last = index == len(self.stages) - 1
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                return
+            if self._cancelled.is_set():
+                continue
+            try:
+                result = stage.run(item)
+            except Exception as e:
+                self._failed(stage.name, item, e)
+                continue
+            if last:
+                self._deliver(result)
+            else:
+                self._queues[index + 1].put(result)
+
+    def _deliver(self, item: Any) -> None:
+        """Hand a finished item to on_result (calls are serialized)."""
+        with self._results_lock:
+            if not self.on_result:
+                self.results.append(item)
+                return
+            try:
+                self.on_result(item)
+            except Exception as e:
+                self.logger.error(f"{self.name}: result handler failed: {str(e)}")
+
+    def _failed(self, stage: str, item: Any, error: Exception) -> None:
+        """Report a rejected or failed item."""
+        if self.on_error:
+            try:
+                self.on_error(stage, item, error)
+            except Exception as e:
+                self.logger.error(f"{self.name}: error handler failed: {str(e)}")
+            return
+        if isinstance(error, Rejected):
+            self.logger.info(f"{self.name}: {stage} rejected an item: {str(error)}")
+        else:
+            self.logger.error(f"{self.name}: {stage} failed: {str(error)}")
+
+    def close(self) -> None:
+        """
+        Let queued items drain, then stop the workers stage by stage.
+
+        Each stage's workers are told to exit only after every earlier stage
+        has finished, so no item is lost between stages.
+        """
+        for index, threads in enumerate(self._threads):
+            for _ in threads:
+                self._queues[index].put(_DONE)
+            for thread in threads:
+                thread.join()
+        self._threads = []
+        self.finished_at = time.perf_counter()
+
+    def cancel(self) -> None:
+        """Stop accepting items; workers discard what is still queued."""
+        self._cancelled.set()
+
+    def run(self, items: Iterable[Any]) -> List[Any]:
+        """
+        Push items through the concurrent pipeline and wait for them to finish.
+
+        Items are pulled lazily, so a generator can pace or stop the feed.
+
+        Args:
+            items: Work items
+
+        Returns:
+            Items that left the last stage (empty when on_result is set)
+        """
+        self.start()
+        try:
+            for item in items:
+                if not self.submit(item):
+                    break
+        finally:
+            self.close()
+        return self.results
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get per-stage queue depth, outcomes and throughput.
+
+        Returns:
+            Statistics dictionary
+        """
+        if self.started_at is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self.finished_at or time.perf_counter()) - self.started_at
+        stages = []
+        for index, stage in enumerate(self.stages):
+            depth = self._queues[index].qsize() if self._queues else 0
+            stages.append({
+                'stage': stage.name,
+                'workers': stage.workers,
+                'queue_depth': depth,
+                'queue_size': stage.queue_size,
+                'active': stage.active,
+                'processed': stage.processed,
+                'rejected': stage.rejected,
+                'errors': stage.errors,
+                'throughput_per_second': round(stage.processed / elapsed, 3) if elapsed else 0.0,
+                'utilization': round(stage.busy_seconds / (stage.workers * elapsed), 3) if elapsed else 0.0
+            })
+        return {
+            'name': self.name,
+            'running': bool(self._threads),
+            'elapsed_seconds': round(elapsed, 3),
+            'stages': stages
+        }
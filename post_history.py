@@ -0,0 +1,277 @@
+"""
+Post history store for the Nietzsche quotes bot.
+
+Every post cycle is recorded in a local SQLite database so the bot can
+skip sentences it already posted and so posts can be audited and analysed.
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterator, List, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    posted_at REAL NOT NULL,
+    status TEXT NOT NULL,
+    work TEXT,
+    sentence_index INTEGER,
+    sentence_hash TEXT,
+    original TEXT,
+    provider TEXT,
+    model TEXT,
+    output TEXT,
+    output_hash TEXT,
+    select_ms REAL,
+    rephrase_ms REAL,
+    post_ms REAL,
+    tweet_id TEXT,
+    correlation_id TEXT,
+    error TEXT
+);
+-- Partial indexes over rows whose sentence/output counts as used (see _USED)
+CREATE INDEX IF NOT EXISTS idx_posts_used_sentence ON posts (sentence_hash) WHERE status IN ('posted', 'interrupted');
+CREATE INDEX IF NOT EXISTS idx_posts_used_output ON posts (output_hash) WHERE status IN ('posted', 'interrupted');
+CREATE INDEX IF NOT EXISTS idx_posts_posted_at ON posts (posted_at);
+"""
+
+# Rows whose sentence and output count as used: an interrupted post may already be live.
+# Must match the partial index condition above for the indexes to be used.
+_USED = "status IN ('posted', 'interrupted')"
+
+
+def text_hash(text: str) -> str:
+    """
+    Hash text for dedupe, ignoring case and whitespace differences.
+
+    Args:
+        text: Text to hash
+
+    Returns:
+        Hex digest
+    """
+    normalized = ' '.join(text.lower().split())
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+def used_key(kind: str, text: str) -> str:
+    """
+    Build the used-key filter key for a posted sentence or output.
+
+    Args:
+        kind: "sentence" or "output"
+        text: Text to key
+
+    Returns:
+        Key like "sentence:<hash>"
+    """
+    return f"{kind}:{text_hash(text)}"
+
+
+class PostHistory:
+    """SQLite-backed record of every post attempt."""
+
+    def __init__(self, db_path: str):
+        """
+        Open (or create) the history database.
+
+        Args:
+            db_path: Path to the SQLite file
+        """
+        self.logger = logging.getLogger(__name__)
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def record(
+        self,
+        status: str,
+        original: Optional[str] = None,
+        output: Optional[str] = None,
+        work: Optional[str] = None,
+        sentence_index: Optional[int] = None,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        timings: Optional[dict] = None,
+        tweet_id: Optional[str] = None,
+        correlation_id: Optional[str] = None,
+        error: Optional[str] = None,
+        posted_at: Optional[float] = None
+    ) -> int:
+        """
+        Record a post attempt.
+
+        Args:
+            status: "posted" or "failed"
+            original: Source sentence
+            output: Rephrased text
+            work: Source work (PDF name)
+            sentence_index: Index of the sentence in the work
+            provider: LLM provider name
+            model: LLM model name
+            timings: Stage latencies in seconds keyed by stage name
+            tweet_id: Posted tweet ID
+            correlation_id: Post cycle correlation ID
+            error: Error message for failed attempts
+            posted_at: Timestamp (defaults to now)
+
+        Returns:
+            Row ID
+        """
+        timings = timings or {}
+
+        def ms(stage: str) -> Optional[float]:
+            seconds = timings.get(stage)
+            return round(seconds * 1000, 3) if seconds is not None else None
+
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO posts (posted_at, status, work, sentence_index, sentence_hash, original, "
+                "provider, model, output, output_hash, select_ms, rephrase_ms, post_ms, tweet_id, "
+                "correlation_id, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    posted_at or time.time(), status, work, sentence_index,
+                    text_hash(original) if original else None, original,
+                    provider, model, output, text_hash(output) if output else None,
+                    ms('select'), ms('rephrase'), ms('post'), tweet_id, correlation_id, error
+                )
+            )
+            return cursor.lastrowid
+
+    def already_posted(self, sentence: str) -> bool:
+        """
+        Check whether a sentence was already posted.
+
+        Sentences are matched by hash. Their index in the work is kept for
+        analysis only, since it shifts whenever extraction changes.
+
+        Args:
+            sentence: Sentence text
+
+        Returns:
+            True if a successful or interrupted post used this sentence
+        """
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT 1 FROM posts WHERE sentence_hash = ? AND {_USED} LIMIT 1",
+                (text_hash(sentence),)
+            ).fetchone()
+        return row is not None
+
+    def output_posted(self, output: str) -> bool:
+        """
+        Check whether identical output text was already posted.
+
+        Args:
+            output: Rephrased text
+
+        Returns:
+            True if the same text was posted (or possibly posted) before
+        """
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT 1 FROM posts WHERE output_hash = ? AND {_USED} LIMIT 1",
+                (text_hash(output),)
+            ).fetchone()
+        return row is not None
+
+    def posted_keys(self) -> Iterator[str]:
+        """
+        Stream used-key filter keys for every successful or interrupted post.
+
+        Rows are fetched in chunks and the lock is released before yielding,
+        so the caller may use the store while iterating.
+
+        Yields:
+            "sentence:<hash>" and "output:<hash>" keys
+        """
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT id, sentence_hash, output_hash FROM posts WHERE id > ? AND {_USED} "
+                    f"ORDER BY id LIMIT 1000",
+                    (last_id,)
+                ).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            for _, sentence_hash, output_hash in rows:
+                if sentence_hash:
+                    yield f"sentence:{sentence_hash}"
+                if output_hash:
+                    yield f"output:{output_hash}"
+
+    def between(self, start: float, end: float, status: Optional[str] = None) -> List[dict]:
+        """
+        Get post attempts in a time range.
+
+        Args:
+            start: Start timestamp (inclusive)
+            end: End timestamp (exclusive)
+            status: Optional status filter
+
+        Returns:
+            List of rows as dictionaries, oldest first
+        """
+        query = "SELECT * FROM posts WHERE posted_at >= ? AND posted_at < ?"
+        params: list = [start, end]
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY posted_at", params).fetchall()
+        return [dict(row) for row in rows]
+
+    def recent(self, limit: int = 20) -> List[dict]:
+        """
+        Get the most recent post attempts.
+
+        Args:
+            limit: Maximum number of rows
+
+        Returns:
+            List of rows as dictionaries, newest first
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM posts ORDER BY posted_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self, status: str = 'posted') -> int:
+        """
+        Count post attempts with a given status.
+
+        Args:
+            status: Status to count
+
+        Returns:
+            Number of rows
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM posts WHERE status = ?", (status,)
+            ).fetchone()[0]
+
+    def checkpoint(self) -> None:
+        """Fold the write-ahead log into the main database file."""
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def release_memory(self) -> None:
+        """Return memory held by SQLite's page cache to the allocator."""
+        with self._lock:
+            self._conn.execute("PRAGMA shrink_memory")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
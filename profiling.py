@@ -0,0 +1,188 @@
+"""
+Opt-in profiling hooks for startup and post cycles.
+
+Wraps a block in cProfile (and optionally tracemalloc) and writes a ranked
+text report plus the raw pstats dump to a directory, keeping only the most
+recent reports per label. Work the block hands to other threads is profiled
+through ProfileSession.wrap() and merged into the same report.
+"""
+import cProfile
+import functools
+import io
+import logging
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional
+
+
+class ProfileSession:
+    """Profilers of worker threads running on behalf of a profiled block."""
+
+    def __init__(self, enabled: bool = True):
+        """
+        Initialize the session.
+
+        Args:
+            enabled: False makes wrap() return functions unchanged
+        """
+        self.enabled = enabled
+        self.profilers: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def wrap(self, func: Callable) -> Callable:
+        """
+        Profile func in whichever thread calls it.
+
+        cProfile before Python 3.12 only sees the thread that enabled it, so
+        a block that waits on a thread pool would otherwise show nothing but
+        the wait.
+
+        Args:
+            func: Function run in a worker thread
+
+        Returns:
+            Wrapped function
+        """
+        if not self.enabled:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Python 3.12+: the block's profiler already covers every thread
+                return func(*args, **kwargs)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.disable()
+                with self._lock:
+                    self.profilers.append(profiler)
+        return wrapper
+
+
+class Profiler:
+    """Profile labelled blocks and keep the last N reports on disk."""
+
+    def __init__(self, out_dir: str, keep: int = 20, top: int = 30, trace_memory: bool = True):
+        """
+        Initialize the profiler.
+
+        Args:
+            out_dir: Directory for reports
+            keep: Number of reports to keep per label
+            top: Number of rows in each ranked table
+            trace_memory: Also record allocations with tracemalloc
+        """
+        self.logger = logging.getLogger(__name__)
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.keep = max(1, keep)
+        self.top = top
+        self.trace_memory = trace_memory
+        # cProfile cannot run two profilers at once on every Python version
+        self._active = threading.Lock()
+
+    @contextmanager
+    def profile(self, label: str) -> Iterator[ProfileSession]:
+        """
+        Profile the enclosed block.
+
+        If another block is already being profiled, this one runs unprofiled.
+
+        Args:
+            label: Report label, e.g. "startup" or "post_cycle"
+
+        Yields:
+            Session whose wrap() profiles work handed to other threads
+        """
+        if not self._active.acquire(blocking=False):
+            yield ProfileSession(enabled=False)
+            return
+
+        session = ProfileSession()
+
+        profiler = cProfile.Profile()
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(10)
+                started_tracing = True
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.take_snapshot()
+
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            yield session
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - start
+            try:
+                memory = None
+                if self.trace_memory:
+                    current, peak = tracemalloc.get_traced_memory()
+                    memory = (current, peak, tracemalloc.take_snapshot().compare_to(baseline, 'lineno'))
+                    if started_tracing:
+                        tracemalloc.stop()
+                self._write_report(label, profiler, elapsed, memory, session.profilers)
+            except Exception as e:
+                self.logger.warning(f"Could not write profile for {label}: {str(e)}")
+            finally:
+                self._active.release()
+
+    def _write_report(
+        self,
+        label: str,
+        profiler: cProfile.Profile,
+        elapsed: float,
+        memory: Optional[tuple],
+        thread_profilers: Optional[List[cProfile.Profile]] = None
+    ) -> None:
+        """Write the ranked text report and raw stats (worker threads merged in), then prune old reports."""
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        base = self.out_dir / f"{label}_{stamp}"
+
+        buffer = io.StringIO()
+        buffer.write(f"Profile: {label}\n")
+        buffer.write(f"Recorded: {datetime.now().isoformat(timespec='seconds')}\n")
+        buffer.write(f"Wall time: {elapsed:.3f}s\n")
+
+        stats = pstats.Stats(profiler, stream=buffer)
+        for thread_profiler in thread_profilers or []:
+            stats.add(thread_profiler)
+        if thread_profilers:
+            buffer.write(f"Worker threads merged: {len(thread_profilers)}\n")
+        stats.dump_stats(str(base.with_suffix('.prof')))
+        stats.strip_dirs()
+        buffer.write(f"\n=== Top {self.top} by cumulative time ===\n")
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+        buffer.write(f"\n=== Top {self.top} by own time ===\n")
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(self.top)
+
+        if memory:
+            current, peak, diff = memory
+            buffer.write("\n=== Memory (tracemalloc) ===\n")
+            buffer.write(f"Traced now: {current / 1024:.1f} KiB, peak during block: {peak / 1024:.1f} KiB\n")
+            buffer.write(f"Top {self.top} allocation growth by line:\n")
+            for entry in diff[:self.top]:
+                buffer.write(f"  {entry}\n")
+
+        report_path = base.with_suffix('.txt')
+        report_path.write_text(buffer.getvalue())
+        self.logger.info(f"Profile for {label} ({elapsed:.3f}s) written to {report_path}")
+        self._prune(label)
+
+    def _prune(self, label: str) -> None:
+        """Delete all but the newest ``keep`` reports for a label."""
+        reports = sorted(self.out_dir.glob(f"{label}_*.txt"))
+        for old in reports[:-self.keep]:
+            old.unlink(missing_ok=True)
+            old.with_suffix('.prof').unlink(missing_ok=True)
@@ -0,0 +1,415 @@
+"""
+Heap-based job scheduler for the Nietzsche quotes bot.
+
+Sleeps exactly until the next due job instead of polling, and can be
+woken instantly on shutdown or reconfiguration.
+"""
+import heapq
+import itertools
+import json
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime, time as dtime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+def parse_slots(spec: Optional[str]) -> List[Tuple[int, int]]:
+    """
+    Parse a comma separated list of daily "HH:MM" slots.
+
+    Args:
+        spec: Slot specification, e.g. "08:00,12:30,18:00"
+
+    Returns:
+        Sorted list of (hour, minute) tuples
+    """
+    slots = []
+    for item in (spec or '').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        hour, _, minute = item.partition(':')
+        hour, minute = int(hour), int(minute or 0)
+        if not (0 <= hour < 24 and 0 <= minute < 60):
+            raise ValueError(f"Invalid schedule slot: {item}")
+        slots.append((hour, minute))
+    return sorted(set(slots))
+
+
+class Job:
+    """A recurring job driven by a fixed interval or by daily time slots."""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], None],
+        interval_seconds: Optional[float] = None,
+        slots: Optional[List[Tuple[int, int]]] = None,
+        jitter_seconds: float = 0.0
+    ):
+        """
+        Initialize a job.
+
+        Args:
+            name: Unique job name (also the key for persisted state)
+            func: Callable to run when the job is due
+            interval_seconds: Seconds between runs (ignored if slots are given)
+            slots: Daily (hour, minute) slots in local time
+            jitter_seconds: Maximum random delay added to each run
+        """
+        if not slots and not interval_seconds:
+            raise ValueError(f"Job {name} needs an interval or time slots")
+
+        self.name = name
+        self.func = func
+        self.interval_seconds = interval_seconds
+        self.slots = slots or []
+        self.jitter_seconds = max(0.0, jitter_seconds)
+        self.base_run: Optional[float] = None
+        self.next_run: Optional[float] = None
+        self.cancelled = False
+        self._seq = 0
+
+    @property
+    def signature(self) -> str:
+        """Describe the job's timing so persisted state can be invalidated on change."""
+        if self.slots:
+            return 'slots:' + ','.join(f"{h:02d}:{m:02d}" for h, m in self.slots)
+        return f"interval:{self.interval_seconds}"
+
+    def _next_slot(self, after: float) -> float:
+        """Return the first slot strictly after the given timestamp."""
+        current = datetime.fromtimestamp(after)
+        for day_offset in (0, 1):
+            day = current.date() + timedelta(days=day_offset)
+            for hour, minute in self.slots:
+                candidate = datetime.combine(day, dtime(hour, minute)).timestamp()
+                if candidate > after:
+                    return candidate
+        raise RuntimeError(f"No upcoming slot for job {self.name}")
+
+    def advance(self, now: float) -> None:
+        """
+        Move the job to its next run after ``now``.
+
+        Interval jobs advance from their previous un-jittered run time so
+        jitter does not accumulate; if the job fell behind by more than one
+        interval it restarts from ``now``.
+
+        Args:
+            now: Current timestamp
+        """
+        if self.slots:
+            base = self._next_slot(now)
+        else:
+            base = (self.base_run if self.base_run is not None else now) + self.interval_seconds
+            if base <= now:
+                base = now + self.interval_seconds
+
+        self.base_run = base
+        self.next_run = base + (random.uniform(0, self.jitter_seconds) if self.jitter_seconds else 0.0)
+
+
+class HeapScheduler:
+    """In-process scheduler backed by a priority heap and a condition variable."""
+
+    def __init__(
+        self,
+        state_file: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+        heartbeat_interval: Optional[float] = None
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            state_file: JSON file used to persist next-run times across restarts
+            clock: Function returning the current timestamp
+            heartbeat_interval: Maximum seconds between heartbeats while idle
+                                (None sleeps until the next due job)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.clock = clock
+        self.heartbeat_interval = heartbeat_interval
+        self.last_heartbeat: Optional[float] = None
+        self.state_file = Path(state_file) if state_file else None
+        self._heap: List[Tuple[float, int, Job]] = []
+        self._jobs: Dict[str, Job] = {}
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._running = False
+        self._stopped = threading.Event()
+        self._wake_callbacks: List[Callable[[], None]] = []
+        self._state = self._load_state()
+
+    def _load_state(self) -> Dict[str, dict]:
+        """Load persisted next-run times."""
+        if not self.state_file or not self.state_file.exists():
+            return {}
+        try:
+            return json.loads(self.state_file.read_text())
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable schedule state {self.state_file}: {str(e)}")
+            return {}
+
+    def save_state(self) -> None:
+        """Persist next-run times atomically."""
+        if not self.state_file:
+            return
+        with self._cond:
+            state = {
+                job.name: {
+                    'signature': job.signature,
+                    'base_run': job.base_run,
+                    'next_run': job.next_run
+                }
+                for job in self._jobs.values()
+            }
+            self._state = state
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.state_file.with_suffix('.tmp')
+            tmp_file.write_text(json.dumps(state, indent=2))
+            os.replace(tmp_file, self.state_file)
+        except OSError as e:
+            self.logger.warning(f"Could not persist schedule state: {str(e)}")
+
+    def _push(self, job: Job) -> None:
+        """Push a job onto the heap, invalidating any older entry for it."""
+        job._seq = next(self._counter)
+        heapq.heappush(self._heap, (job.next_run, job._seq, job))
+
+    def add_job(
+        self,
+        name: str,
+        func: Callable[[], None],
+        interval_seconds: Optional[float] = None,
+        slots: Optional[List[Tuple[int, int]]] = None,
+        jitter_seconds: float = 0.0
+    ) -> Job:
+        """
+        Add (or replace) a recurring job.
+
+        A persisted next-run time is reused when the job's timing is
+        unchanged, so restarts do not reset the interval. A run that was
+        missed while the process was down fires as soon as possible.
+        Replacing a registered job with unchanged timing keeps its current
+        next run.
+
+        Args:
+            name: Unique job name
+            func: Callable to run when the job is due
+            interval_seconds: Seconds between runs
+            slots: Daily (hour, minute) slots in local time
+            jitter_seconds: Maximum random delay added to each run
+
+        Returns:
+            The scheduled job
+        """
+        job = Job(name, func, interval_seconds, slots, jitter_seconds)
+        now = self.clock()
+
+        with self._cond:
+            old = self._jobs.pop(name, None)
+            if old:
+                old.cancelled = True
+                # Replacing a live job: its current timing wins over what was loaded at startup
+                persisted = {'signature': old.signature, 'base_run': old.base_run, 'next_run': old.next_run}
+            else:
+                persisted = self._state.get(name)
+            if persisted and persisted.get('signature') == job.signature and persisted.get('next_run'):
+                job.base_run = persisted.get('base_run') or persisted['next_run']
+                job.next_run = persisted['next_run']
+            else:
+                job.advance(now)
+
+            self._jobs[name] = job
+            self._push(job)
+            self._notify()
+
+        self.logger.info(f"Scheduled job {name} ({job.signature}), next run at "
+                         f"{datetime.fromtimestamp(job.next_run).isoformat(timespec='seconds')}")
+        self.save_state()
+        return job
+
+    def remove_job(self, name: str) -> None:
+        """
+        Remove a job.
+
+        Args:
+            name: Job name
+        """
+        with self._cond:
+            job = self._jobs.pop(name, None)
+            if job:
+                job.cancelled = True
+            self._notify()
+
+    def reschedule(self, name: str, next_run: float) -> None:
+        """
+        Move a job's next run to a specific time.
+
+        Args:
+            name: Job name
+            next_run: New next-run timestamp
+        """
+        with self._cond:
+            job = self._jobs.get(name)
+            if not job:
+                return
+            job.base_run = job.next_run = next_run
+            self._push(job)
+            self._notify()
+        self.save_state()
+
+    def get_job(self, name: str) -> Optional[Job]:
+        """
+        Get a scheduled job by name.
+
+        Args:
+            name: Job name
+
+        Returns:
+            The job, or None if not scheduled
+        """
+        return self._jobs.get(name)
+
+    def _peek(self) -> Optional[Job]:
+        """Return the earliest valid job, discarding stale heap entries. Caller holds the lock."""
+        while self._heap:
+            _, seq, job = self._heap[0]
+            if job.cancelled or seq != job._seq:
+                heapq.heappop(self._heap)
+                continue
+            return job
+        return None
+
+    def next_due(self) -> Optional[float]:
+        """
+        Get the timestamp of the next due job.
+
+        Returns:
+            Timestamp, or None if nothing is scheduled
+        """
+        with self._cond:
+            job = self._peek()
+            return job.next_run if job else None
+
+    def pop_due(self) -> List[Job]:
+        """
+        Advance every due job to its next run and return them without running.
+
+        Used by runtimes that execute jobs themselves (e.g. the asyncio runtime).
+
+        Returns:
+            Jobs that were due, earliest first
+        """
+        due = []
+        now = self.clock()
+        with self._cond:
+            while True:
+                job = self._peek()
+                if not job or job.next_run > now:
+                    break
+                heapq.heappop(self._heap)
+                job.advance(now)
+                self._push(job)
+                due.append(job)
+
+        if due:
+            self.save_state()
+        return due
+
+    def run_pending(self) -> int:
+        """
+        Run every job that is due now.
+
+        Returns:
+            Number of jobs run
+        """
+        due = self.pop_due()
+        for job in due:
+            try:
+                job.func()
+            except Exception as e:
+                self.logger.error(f"Job {job.name} failed: {str(e)}", exc_info=True)
+        return len(due)
+
+    def run_forever(self) -> None:
+        """Run jobs as they become due until stop() is called (returns at once if it already was)."""
+        with self._cond:
+            # A stop() that arrived before this thread got here must not be overwritten
+            if self._stopped.is_set():
+                return
+            self._running = True
+
+        while True:
+            with self._cond:
+                while self._running:
+                    self.beat()
+                    job = self._peek()
+                    now = self.clock()
+                    if job and job.next_run <= now:
+                        break
+                    self._cond.wait(self.wait_timeout(job.next_run if job else None, now))
+                if not self._running:
+                    break
+            self.run_pending()
+
+    def beat(self) -> None:
+        """Record that the scheduler loop is alive."""
+        self.last_heartbeat = self.clock()
+
+    def wait_timeout(self, due: Optional[float], now: float) -> Optional[float]:
+        """
+        Compute how long to sleep, capped by the heartbeat interval.
+
+        Args:
+            due: Timestamp of the next due job, if any
+            now: Current timestamp
+
+        Returns:
+            Seconds to sleep, or None to sleep until woken
+        """
+        timeout = None if due is None else max(0.0, due - now)
+        if self.heartbeat_interval:
+            timeout = self.heartbeat_interval if timeout is None else min(timeout, self.heartbeat_interval)
+        return timeout
+
+    def add_wake_callback(self, callback: Callable[[], None]) -> None:
+        """
+        Register a callback invoked whenever the heap changes or wake() is called.
+
+        Args:
+            callback: Thread-safe callable taking no arguments
+        """
+        with self._cond:
+            self._wake_callbacks.append(callback)
+
+    def _notify(self) -> None:
+        """Wake waiters and callbacks. Caller holds the lock."""
+        self._cond.notify_all()
+        for callback in self._wake_callbacks:
+            callback()
+
+    def wake(self) -> None:
+        """Wake the scheduler so it re-evaluates the heap."""
+        with self._cond:
+            self._notify()
+
+    def stop(self) -> None:
+        """Stop run_forever() and persist state."""
+        with self._cond:
+            self._stopped.set()
+            self._running = False
+            self._notify()
+        self.save_state()
+
+    @property
+    def running(self) -> bool:
+        """Whether run_forever() is active."""
+        return self._running
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Virtual-clock simulation of the Nietzsche quotes bot.
+
+Runs the real NietzscheBot scheduling, dedupe, history and retry logic
+against fake LLM and X backends on a virtual clock, so weeks of operation
+replay in seconds.
+
+Run with: python3 simulation.py --days 14 --interval-hours 2
+"""
+import argparse
+import json
+import logging
+import math
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bot import NietzscheBot
+
+
+class VirtualClock:
+    """Clock that only moves when told to."""
+
+    def __init__(self, start: Optional[float] = None):
+        """
+        Initialize the clock.
+
+        Args:
+            start: Starting timestamp (defaults to the real current time)
+        """
+        self.now = time.time() if start is None else start
+
+    def time(self) -> float:
+        """Return the virtual current time."""
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        """Advance the clock instead of sleeping."""
+        self.now += max(0.0, seconds)
+
+    def advance_to(self, timestamp: float) -> None:
+        """Move the clock forward to a timestamp (never backwards)."""
+        self.now = max(self.now, timestamp)
+
+
+def _sample_latency(rng: random.Random, median: float, spread: float) -> float:
+    """Draw a log-normally distributed latency with the given median."""
+    return rng.lognormvariate(math.log(median), spread) if median > 0 else 0.0
+
+
+class SyntheticCorpus:
+    """In-memory stand-in for PDFExtractor."""
+
+    def __init__(self, size: int, rng: random.Random, work: str = 'synthetic'):
+        """
+        Initialize the corpus.
+
+        Args:
+            size: Number of sentences
+            rng: Random generator used for sampling
+            work: Work name recorded in the post history
+        """
+        self.work = work
+        self.rng = rng
+        self.sentences = [f"Synthetic aphorism number {i} about the will to power" for i in range(size)]
+
+    def get_random_entry(self) -> Tuple[int, str]:
+        """Return a random (index, sentence) pair."""
+        index = self.rng.randrange(len(self.sentences))
+        return index, self.sentences[index]
+
+    def get_random_sentence(self) -> str:
+        """Return a random sentence."""
+        return self.get_random_entry()[1]
+
+    def get_sentence_count(self) -> int:
+        """Return the number of sentences."""
+        return len(self.sentences)
+
+
+class FakeProcessor:
+    """LLM stand-in with configurable latency and failure rate."""
+
+    def __init__(self, clock: VirtualClock, rng: random.Random, median_latency: float = 2.0,
+                 spread: float = 0.5, failure_rate: float = 0.0):
+        """
+        Initialize the fake processor.
+
+        Args:
+            clock: Virtual clock advanced by each call
+            rng: Random generator
+            median_latency: Median call latency in seconds
+            spread: Log-normal sigma of the latency
+            failure_rate: Probability a call raises
+        """
+        self.model = 'fake-llm'
+        self.clock = clock
+        self.rng = rng
+        self.median_latency = median_latency
+        self.spread = spread
+        self.failure_rate = failure_rate
+        self.latencies: List[float] = []
+        self.failures = 0
+
+    def rephrase_quote(self, text: str) -> str:
+        """Pretend to rephrase a quote."""
+        latency = _sample_latency(self.rng, self.median_latency, self.spread)
+        self.clock.sleep(latency)
+        self.latencies.append(latency)
+        if self.rng.random() < self.failure_rate:
+            self.failures += 1
+            raise Exception("Simulated LLM failure")
+        return f"In other words: {text.lower()}"[:280]
+
+    def test_connection(self) -> bool:
+        """Always reachable."""
+        return True
+
+
+class FakeXPoster:
+    """X API stand-in with latency, failures and a daily rate limit."""
+
+    def __init__(self, clock: VirtualClock, rng: random.Random, median_latency: float = 0.5,
+                 spread: float = 0.3, failure_rate: float = 0.0, daily_limit: Optional[int] = None):
+        """
+        Initialize the fake poster.
+
+        Args:
+            clock: Virtual clock advanced by each call
+            rng: Random generator
+            median_latency: Median call latency in seconds
+            spread: Log-normal sigma of the latency
+            failure_rate: Probability a call fails transiently
+            daily_limit: Maximum posts per rolling 24 hours (None for unlimited)
+        """
+        self.clock = clock
+        self.rng = rng
+        self.median_latency = median_latency
+        self.spread = spread
+        self.failure_rate = failure_rate
+        self.daily_limit = daily_limit
+        self.latencies: List[float] = []
+        self.posted: List[Tuple[float, str]] = []
+        self.failures = 0
+        self.rate_limited = 0
+
+    def post_tweet(self, text: str) -> str:
+        """Pretend to post a tweet."""
+        latency = _sample_latency(self.rng, self.median_latency, self.spread)
+        self.clock.sleep(latency)
+        self.latencies.append(latency)
+        now = self.clock.time()
+
+        if self.daily_limit is not None:
+            recent = sum(1 for posted_at, _ in self.posted if posted_at > now - 86400)
+            if recent >= self.daily_limit:
+                self.rate_limited += 1
+                raise Exception("Simulated 429 Too Many Requests")
+        if self.rng.random() < self.failure_rate:
+            self.failures += 1
+            raise Exception("Simulated 503 Service Unavailable")
+
+        self.posted.append((now, text))
+        return str(len(self.posted))
+
+    def test_connection(self) -> bool:
+        """Always reachable."""
+        return True
+
+
+def _distribution(values: List[float]) -> Dict[str, float]:
+    """Summarize latencies (seconds) with nearest-rank percentiles."""
+    if not values:
+        return {'count': 0}
+    ordered = sorted(values)
+
+    def percentile(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, max(0, math.ceil(p * len(ordered)) - 1))], 3)
+
+    return {
+        'count': len(ordered),
+        'mean': round(sum(ordered) / len(ordered), 3),
+        'p50': percentile(0.50),
+        'p90': percentile(0.90),
+        'p99': percentile(0.99),
+        'max': round(ordered[-1], 3)
+    }
+
+
+def run_simulation(
+    days: float = 14,
+    interval_hours: float = 2,
+    slots: str = '',
+    jitter_seconds: int = 0,
+    corpus_size: int = 2000,
+    pdf_path: Optional[str] = None,
+    llm_latency: float = 2.0,
+    llm_failure_rate: float = 0.0,
+    x_latency: float = 0.5,
+    x_failure_rate: float = 0.0,
+    x_daily_limit: Optional[int] = None,
+    post_retries: int = 2,
+    retry_delay: float = 30.0,
+    seed: int = 42,
+    verbose: bool = False
+) -> dict:
+    """
+    Replay the bot's schedule on a virtual clock.
+
+    Args:
+        days: Simulated duration in days
+        interval_hours: Hours between posts
+        slots: Daily "HH:MM" slots (overrides the interval)
+        jitter_seconds: Maximum random delay per post
+        corpus_size: Sentences in the synthetic corpus (ignored with pdf_path)
+        pdf_path: Use a real PDF as the corpus instead
+        llm_latency: Median fake LLM latency in seconds
+        llm_failure_rate: Probability a fake LLM call fails
+        x_latency: Median fake X latency in seconds
+        x_failure_rate: Probability a fake X call fails transiently
+        x_daily_limit: Fake X posts allowed per rolling day
+        post_retries: Retries per failed post
+        retry_delay: Initial retry backoff in seconds
+        seed: Random seed
+        verbose: Keep the bot's INFO logging on stderr (otherwise silenced)
+
+    Returns:
+        Report dictionary
+    """
+    # Configure logging before the bot does, so its records go to stderr and
+    # stdout stays clean for --json
+    level = logging.INFO if verbose else logging.CRITICAL
+    logging.basicConfig(level=level, stream=sys.stderr,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    logging.getLogger().setLevel(level)
+
+    random.seed(seed)
+    rng = random.Random(seed)
+    clock = VirtualClock(start=1_700_000_000.0)
+    workdir = Path(tempfile.mkdtemp(prefix='nietzsche_sim_'))
+
+    if pdf_path:
+        from pdf_extractor import PDFExtractor
+        corpus = PDFExtractor(pdf_path)
+    else:
+        corpus = SyntheticCorpus(corpus_size, rng)
+    processor = FakeProcessor(clock, rng, llm_latency, failure_rate=llm_failure_rate)
+    poster = FakeXPoster(clock, rng, x_latency, failure_rate=x_failure_rate, daily_limit=x_daily_limit)
+
+    config = {
+        'post_interval_hours': interval_hours,
+        'post_slots': slots,
+        'post_jitter_seconds': jitter_seconds,
+        'post_retries': post_retries,
+        'post_retry_delay_seconds': retry_delay,
+        'log_dir': str(workdir / 'logs'),
+        'state_dir': str(workdir / 'state'),
+        'watchdog_interval_seconds': 0
+    }
+    bot = NietzscheBot(
+        config,
+        components={'pdf_extractor': corpus, 'processor': processor, 'x_poster': poster},
+        clock=clock.time,
+        sleep=clock.sleep
+    )
+
+    wall_start = time.perf_counter()
+    start = clock.time()
+    end = start + days * 86400
+    bot._schedule_posts()
+    bot.running = True
+
+    cycle_latencies: List[float] = []
+    while True:
+        due = bot.scheduler.next_due()
+        if due is None or due > end:
+            break
+        clock.advance_to(due)
+        cycle_start = clock.time()
+        bot.scheduler.run_pending()
+        cycle_latencies.append(clock.time() - cycle_start)
+
+    bot.running = False
+    bot.scheduler.stop()
+
+    posted_times = [posted_at for posted_at, _ in poster.posted]
+    gaps = [(b - a) / 3600 for a, b in zip(posted_times, posted_times[1:])]
+    posted_rows = bot.history.between(start, end + 86400, status='posted')
+    distinct_sentences = len({row['sentence_hash'] for row in posted_rows})
+    total_sentences = corpus.get_sentence_count()
+
+    report = {
+        'simulated_days': days,
+        'wall_seconds': round(time.perf_counter() - wall_start, 3),
+        'cycles': len(cycle_latencies),
+        'posts_made': bot.posts_succeeded,
+        'posts_failed': bot.posts_failed,
+        'post_retries': bot.post_retries,
+        'llm_failures': processor.failures,
+        'x_failures': poster.failures,
+        'x_rate_limited': poster.rate_limited,
+        'latency_seconds': {
+            'llm': _distribution(processor.latencies),
+            'x_api': _distribution(poster.latencies),
+            'cycle': _distribution(cycle_latencies)
+        },
+        'post_gap_hours': _distribution(gaps),
+        'sampler': {
+            'corpus_sentences': total_sentences,
+            'distinct_sentences_posted': distinct_sentences,
+            'coverage': round(distinct_sentences / total_sentences, 4) if total_sentences else 0.0,
+            'repeated_sentences': len(posted_rows) - distinct_sentences
+        }
+    }
+    bot.stop()
+    shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Replay the bot's schedule on a virtual clock")
+    parser.add_argument('--days', type=float, default=14)
+    parser.add_argument('--interval-hours', type=float, default=2)
+    parser.add_argument('--slots', default='', help="Daily HH:MM slots, e.g. 08:00,20:00")
+    parser.add_argument('--jitter-seconds', type=int, default=0)
+    parser.add_argument('--corpus-size', type=int, default=2000)
+    parser.add_argument('--pdf', dest='pdf_path', help="Use a real PDF as the corpus")
+    parser.add_argument('--llm-latency', type=float, default=2.0)
+    parser.add_argument('--llm-failure-rate', type=float, default=0.0)
+    parser.add_argument('--x-latency', type=float, default=0.5)
+    parser.add_argument('--x-failure-rate', type=float, default=0.0)
+    parser.add_argument('--x-daily-limit', type=int)
+    parser.add_argument('--retries', dest='post_retries', type=int, default=2)
+    parser.add_argument('--retry-delay', type=float, default=30.0)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--verbose', action='store_true')
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    args = vars(parser.parse_args())
+    as_json = args.pop('json')
+
+    report = run_simulation(**args)
+
+    if as_json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print("=" * 60)
+    print(f"Simulated {report['simulated_days']} days in {report['wall_seconds']}s")
+    print("=" * 60)
+    print(f"Cycles:        {report['cycles']}")
+    print(f"Posts made:    {report['posts_made']}")
+    print(f"Posts failed:  {report['posts_failed']}")
+    print(f"Post retries:  {report['post_retries']}")
+    print(f"LLM failures:  {report['llm_failures']}")
+    print(f"X failures:    {report['x_failures']} (+{report['x_rate_limited']} rate limited)")
+    print()
+    print("Latency (seconds):")
+    for stage, dist in report['latency_seconds'].items():
+        print(f"  {stage:8s} {dist}")
+    print(f"Post gap (hours): {report['post_gap_hours']}")
+    print()
+    sampler = report['sampler']
+    print(f"Sampler coverage: {sampler['distinct_sentences_posted']}/{sampler['corpus_sentences']} "
+          f"({sampler['coverage']:.1%}), repeats: {sampler['repeated_sentences']}")
+
+
+if __name__ == '__main__':
+    main()
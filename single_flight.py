@@ -0,0 +1,121 @@
+"""
+Single-flight coalescing of identical concurrent calls.
+
+When several callers ask for the same key while a call for it is already
+running (pre-generation, a manual trigger and a scheduled post all
+rephrasing the same sentence with the same model), only the first one
+does the work; the others wait for it and share its result or exception.
+Nothing is cached: once the call finishes the next request for the key
+starts a fresh one.
+"""
+import asyncio
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    """One in-flight call and the callers waiting on it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Share one in-flight call between concurrent callers with the same key."""
+
+    def __init__(self, name: str = 'single-flight', on_shared: Optional[Callable[[], None]] = None):
+        """
+        Initialize the group.
+
+        Args:
+            name: Label used in log messages
+            on_shared: Called each time a request joins an in-flight call
+        """
+        self.logger = logging.getLogger(__name__)
+        self.name = name
+        self.on_shared = on_shared
+        self.calls = 0
+        self.shared = 0
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run func(*args, **kwargs), or wait for an identical call already running.
+
+        Args:
+            key: Identity of the call (callers with equal keys share one call)
+            func: Function to run
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            The result of the shared call
+
+        Raises:
+            Whatever the shared call raised
+        """
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+                self.calls += 1
+            else:
+                call.waiters += 1
+                self.shared += 1
+
+        if not leader:
+            if self.on_shared:
+                self.on_shared()
+            self.logger.debug(f"{self.name}: joining in-flight call for {key!r}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            call.done.set()
+            if call.waiters:
+                self.logger.info(f"{self.name}: {call.waiters} identical request(s) shared one call")
+
+    async def do_async(self, key: Hashable, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Asyncio variant of do(); the call and the wait run in a worker thread.
+
+        Tasks and threads share the same in-flight calls, so a task joining
+        a call started by a thread (or the other way round) does not make a
+        second request.
+
+        Args:
+            key: Identity of the call
+            func: Blocking function to run
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            The result of the shared call
+        """
+        return await asyncio.to_thread(self.do, key, func, *args, **kwargs)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get call counters.
+
+        Returns:
+            Calls made, requests that shared a call, and calls in flight
+        """
+        with self._lock:
+            return {'calls': self.calls, 'shared': self.shared, 'inflight': len(self._inflight)}
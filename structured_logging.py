@@ -0,0 +1,144 @@
+"""
+Structured logging for the Nietzsche quotes bot.
+
+Records are handed to a QueueHandler on the calling thread and written by
+a QueueListener thread, so file and console I/O never block the posting
+pipeline. Every record carries the correlation ID of the post cycle it
+belongs to.
+"""
+import json
+import logging
+import queue
+import sys
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+from pathlib import Path
+from typing import Iterator, Optional
+
+_correlation_id: ContextVar[str] = ContextVar('correlation_id', default='-')
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - [%(correlation_id)s] %(message)s'
+
+
+def get_correlation_id() -> str:
+    """
+    Get the correlation ID of the current context.
+
+    Returns:
+        Correlation ID, or "-" outside a post cycle
+    """
+    return _correlation_id.get()
+
+
+@contextmanager
+def correlation_scope(correlation_id: Optional[str] = None) -> Iterator[str]:
+    """
+    Tag every log record emitted inside the block with a correlation ID.
+
+    Args:
+        correlation_id: ID to use (a new random one if omitted)
+
+    Yields:
+        The active correlation ID
+    """
+    correlation_id = correlation_id or uuid.uuid4().hex[:12]
+    token = _correlation_id.set(correlation_id)
+    try:
+        yield correlation_id
+    finally:
+        _correlation_id.reset(token)
+
+
+class CorrelationFilter(logging.Filter):
+    """Attach the current correlation ID to each record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Add ``correlation_id`` to the record (never drops it)."""
+        if not hasattr(record, 'correlation_id'):
+            record.correlation_id = _correlation_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Serialize a record to JSON."""
+        payload = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'correlation_id': getattr(record, 'correlation_id', '-'),
+            'thread': record.threadName
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload['exception'] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class _PreparingQueueHandler(QueueHandler):
+    """QueueHandler that keeps the message and traceback as separate fields."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Make the record safe to pass between threads without pre-formatting it."""
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(
+    log_dir: str,
+    json_format: bool = True,
+    retention_days: int = 14,
+    level: int = logging.INFO
+) -> QueueListener:
+    """
+    Configure non-blocking, rotating logging on the root logger.
+
+    Args:
+        log_dir: Directory for log files
+        json_format: Emit JSON lines (otherwise plain text with correlation IDs)
+        retention_days: Number of rotated daily files to keep
+        level: Root log level
+
+    Returns:
+        The started QueueListener (stop it on shutdown to flush)
+    """
+    log_path = Path(log_dir)
+    log_path.mkdir(parents=True, exist_ok=True)
+
+    formatter = JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT)
+
+    file_handler = TimedRotatingFileHandler(
+        log_path / 'nietzsche_bot.log',
+        when='midnight',
+        backupCount=retention_days,
+        encoding='utf-8'
+    )
+    file_handler.setFormatter(formatter)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    queue_handler = _PreparingQueueHandler(log_queue)
+    queue_handler.addFilter(CorrelationFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -0,0 +1,275 @@
+"""
+Deterministic synthetic PDF corpus generator.
+
+Produces PDFs of pseudo-aphorisms with the artifacts real scanned
+editions have (page numbers, running headers, words hyphenated across
+line breaks, multi-column pages and irregular spacing) so extraction can
+be tested and benchmarked at any scale without copyrighted books.
+
+Run with: python3 synthetic_pdf.py --pages 1000 --out corpus/
+          python3 synthetic_pdf.py --pages 100 --files 100 --columns 2 --out corpus/
+"""
+import argparse
+import random
+import zlib
+from pathlib import Path
+from typing import BinaryIO, List, Optional
+
+WORDS = (
+    "truth power will value morality spirit free noble slave herd abyss god dead "
+    "philosopher life suffering strength weakness virtue instinct reason eternal "
+    "return beyond good evil man overman love hate pity pride fear knowledge art "
+    "resentment transvaluation consciousness responsibility contradiction "
+    "independence self-overcoming understanding genealogy asceticism perspective"
+).split()
+
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+MARGIN = 50
+FONT_SIZE = 10
+LEADING = 12
+# Approximate characters per line of Times-Roman at FONT_SIZE across the text width
+CHARS_PER_LINE = 95
+
+
+def synthetic_sentence(rng: random.Random) -> str:
+    """
+    Build one pseudo-aphorism between roughly 20 and 250 characters.
+
+    Args:
+        rng: Random source
+
+    Returns:
+        Sentence ending in punctuation
+    """
+    words = [rng.choice(WORDS) for _ in range(rng.randint(4, 30))]
+    words[0] = words[0].capitalize()
+    return ' '.join(words) + rng.choice('..!?')
+
+
+def wrap(words: List[str], width: int, rng: random.Random, hyphenation: float) -> List[str]:
+    """
+    Break words into lines, splitting some long words with a hyphen.
+
+    Args:
+        words: Words to lay out
+        width: Maximum characters per line
+        rng: Random source
+        hyphenation: Probability of hyphenating a word that does not fit
+
+    Returns:
+        Lines of text
+    """
+    lines = []
+    line = ''
+    for word in words:
+        candidate = f"{line} {word}" if line else word
+        if len(candidate) <= width:
+            line = candidate
+            continue
+        room = width - len(line) - 2
+        cut = 0
+        if line and len(word) >= 8 and room >= 3 and rng.random() < hyphenation:
+            cut = rng.randint(3, min(room, len(word) - 3))
+        # Never cut next to a compound's own hyphen ("self-" / "-overcoming")
+        if cut and '-' not in word[cut - 1:cut + 1]:
+            lines.append(f"{line} {word[:cut]}-")
+            line = word[cut:]
+        else:
+            if line:
+                lines.append(line)
+            line = word
+    if line:
+        lines.append(line)
+    return lines
+
+
+def _escape(text: str) -> str:
+    """Escape a string for a PDF literal."""
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+class SyntheticPDFWriter:
+    """Stream a PDF to disk page by page (memory stays flat for any page count)."""
+
+    def __init__(self, out: BinaryIO, compress: bool = True):
+        """
+        Initialize the writer.
+
+        Args:
+            out: Binary file opened for writing
+            compress: Flate-compress page content streams
+        """
+        self.out = out
+        self.compress = compress
+        self.offsets: List[int] = []
+        self.page_ids: List[int] = []
+        self.position = 0
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        # Objects 1 (catalog) and 2 (page tree) are written last; 3 is the font
+        self.offsets = [0, 0]
+        self._object(b"<< /Type /Font /Subtype /Type1 /BaseFont /Times-Roman >>")
+
+    def _write(self, data: bytes) -> None:
+        self.out.write(data)
+        self.position += len(data)
+
+    def _object(self, body: bytes, number: Optional[int] = None) -> int:
+        """Write an indirect object and return its number."""
+        if number is None:
+            self.offsets.append(self.position)
+            number = len(self.offsets)
+        else:
+            self.offsets[number - 1] = self.position
+        self._write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+        return number
+
+    def add_page(self, runs: List[tuple]) -> None:
+        """
+        Add a page.
+
+        Args:
+            runs: (x, y, text) tuples placed with absolute coordinates
+        """
+        parts = [f"BT /F1 {FONT_SIZE} Tf"]
+        for x, y, text in runs:
+            parts.append(f"1 0 0 1 {x:.1f} {y:.1f} Tm ({_escape(text)}) Tj")
+        parts.append("ET")
+        stream = '\n'.join(parts).encode('latin-1', 'replace')
+        if self.compress:
+            stream = zlib.compress(stream)
+            header = b"<< /Length %d /Filter /FlateDecode >>" % len(stream)
+        else:
+            header = b"<< /Length %d >>" % len(stream)
+        content_id = self._object(header + b"\nstream\n" + stream + b"\nendstream")
+        self.page_ids.append(self._object(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+            % (PAGE_WIDTH, PAGE_HEIGHT, content_id)
+        ))
+
+    def close(self) -> None:
+        """Write the page tree, catalog, cross-reference table and trailer."""
+        kids = ' '.join(f"{pid} 0 R" for pid in self.page_ids).encode()
+        self._object(b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self.page_ids)), number=2)
+        self._object(b"<< /Type /Catalog /Pages 2 0 R >>", number=1)
+        xref = self.position
+        self._write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(self.offsets) + 1))
+        for offset in self.offsets:
+            self._write(b"%010d 00000 n \n" % offset)
+        self._write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                    % (len(self.offsets) + 1, xref))
+
+
+def generate_pdf(
+    path: str,
+    pages: int = 100,
+    seed: int = 0,
+    columns: int = 1,
+    hyphenation: float = 0.3,
+    noise: float = 0.05,
+    page_numbers: bool = True,
+    header: Optional[str] = 'BEYOND GOOD AND EVIL',
+    compress: bool = True
+) -> int:
+    """
+    Write a deterministic synthetic PDF.
+
+    Args:
+        path: Output file
+        pages: Number of pages
+        seed: Random seed (same arguments and seed give identical files)
+        columns: Text columns per page
+        hyphenation: Probability of hyphenating a word at a line break
+        noise: Probability per line of layout noise (doubled spaces,
+               shifted start, stray footnote marks)
+        page_numbers: Print a page number in the footer
+        header: Running header on every page (None disables)
+        compress: Flate-compress page content
+
+    Returns:
+        Number of sentences written
+    """
+    rng = random.Random(seed)
+    columns = max(1, columns)
+    gutter = 20
+    column_width = (PAGE_WIDTH - 2 * MARGIN - gutter * (columns - 1)) / columns
+    chars = max(20, int(CHARS_PER_LINE * column_width / (PAGE_WIDTH - 2 * MARGIN)))
+    top = PAGE_HEIGHT - MARGIN - (2 * LEADING if header else 0)
+    bottom = MARGIN + (2 * LEADING if page_numbers else 0)
+    lines_per_column = int((top - bottom) / LEADING)
+
+    sentences = 0
+    pending: List[str] = []
+
+    def next_line() -> str:
+        nonlocal sentences
+        while not pending:
+            paragraph = [synthetic_sentence(rng) for _ in range(rng.randint(1, 6))]
+            sentences += len(paragraph)
+            pending.extend(wrap(' '.join(paragraph).split(' '), chars, rng, hyphenation))
+        line = pending.pop(0)
+        if rng.random() < noise:
+            kind = rng.randrange(3)
+            if kind == 0:
+                line = line.replace(' ', '  ', rng.randint(1, 3))
+            elif kind == 1:
+                line = ' ' * rng.randint(1, 4) + line
+            elif not line.endswith('-'):
+                # A footnote mark never sits between a hyphen and the rest of the word
+                line = f"{line}{rng.randint(1, 99)}"
+        return line
+
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'wb') as out:
+        writer = SyntheticPDFWriter(out, compress=compress)
+        for number in range(1, pages + 1):
+            runs = []
+            if header:
+                # Alternate header on facing pages like a printed book
+                text = header if number % 2 else f"{header.title()} {number}"
+                runs.append((MARGIN, PAGE_HEIGHT - MARGIN, text))
+            for column in range(columns):
+                x = MARGIN + column * (column_width + gutter)
+                for row in range(lines_per_column):
+                    runs.append((x, top - row * LEADING, next_line()))
+            if page_numbers:
+                runs.append((PAGE_WIDTH / 2, MARGIN, str(number)))
+            writer.add_page(runs)
+        writer.close()
+    return sentences
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Generate deterministic synthetic PDFs for offline testing")
+    parser.add_argument('--pages', type=int, default=100, help="Pages per file")
+    parser.add_argument('--files', type=int, default=1, help="Number of files (seeds seed, seed+1, ...)")
+    parser.add_argument('--out', default='synthetic_corpus', help="Output directory")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--columns', type=int, default=1)
+    parser.add_argument('--hyphenation', type=float, default=0.3, help="Chance to hyphenate at a line break")
+    parser.add_argument('--noise', type=float, default=0.05, help="Chance of layout noise per line")
+    parser.add_argument('--no-page-numbers', action='store_true')
+    parser.add_argument('--header', default='BEYOND GOOD AND EVIL', help="Running header ('' disables)")
+    parser.add_argument('--no-compress', action='store_true', help="Write uncompressed content streams")
+    args = parser.parse_args()
+
+    for index in range(args.files):
+        path = Path(args.out) / f"synthetic_{args.pages}p_{args.seed + index}.pdf"
+        sentences = generate_pdf(
+            str(path),
+            pages=args.pages,
+            seed=args.seed + index,
+            columns=args.columns,
+            hyphenation=args.hyphenation,
+            noise=args.noise,
+            page_numbers=not args.no_page_numbers,
+            header=args.header or None,
+            compress=not args.no_compress
+        )
+        print(f"{path}: {args.pages} pages, {sentences} sentences, {path.stat().st_size / 1024:.0f} KiB")
+
+
+if __name__ == '__main__':
+    main()
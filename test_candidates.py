@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Offline tests for multi-candidate rephrasing and its fallbacks.
+"""
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import grok_processor
+from candidates import pick_best
+from grok_processor import GrokProcessor
+from huggingface_processor import HuggingFaceProcessor
+
+SOURCE = "He who has a why to live can bear almost any how."
+GOOD = "Find your reason to live and you can endure almost any how life throws at you."
+
+
+class RejectsCandidatesClient:
+    """Chat client whose endpoint answers 422 when more than one candidate is requested."""
+
+    def __init__(self):
+        self.requested = []
+
+    def chat_completion(self, messages, model, max_tokens, temperature, n):
+        self.requested.append(n)
+        if n > 1:
+            error = Exception("Unprocessable Entity: unknown parameter 'n'")
+            error.response = SimpleNamespace(status_code=422)
+            raise error
+        message = SimpleNamespace(content=GOOD)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def test_pick_best_rejects_unusable_candidates():
+    """Fragments and chatter lose to a real rephrasing; nothing usable gives None."""
+    best, best_score = pick_best(["Ok.", "Here's a rephrased version: live.", GOOD], SOURCE)
+    assert best == GOOD and best_score >= 0.5
+    assert pick_best(["Ok.", ""], SOURCE) == (None, 0.0)
+
+
+def test_huggingface_retries_with_one_candidate():
+    """An endpoint that rejects n gets one retry with n=1, and later calls ask for one candidate."""
+    processor = HuggingFaceProcessor(api_token='test', verify=False, candidates=3)
+    processor.client = RejectsCandidatesClient()
+
+    assert processor.rephrase_quote(SOURCE) == GOOD
+    assert processor.rephrase_quote(SOURCE) == GOOD
+    assert processor.client.requested == [3, 1, 1]
+
+
+def test_grok_falls_back_when_every_candidate_is_rejected(monkeypatch):
+    """A best candidate scoring 0 is not posted; the original sentence is."""
+    body = {'choices': [{'message': {'content': "Ok."}}, {'message': {'content': "Fine."}}]}
+    response = SimpleNamespace(status_code=200, text='', json=lambda: body, raise_for_status=lambda: None)
+    monkeypatch.setattr(grok_processor.requests, 'post', lambda *args, **kwargs: response)
+    processor = GrokProcessor(api_key='test', candidates=2)
+
+    assert processor.rephrase_quote(SOURCE) == SOURCE
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for resumable, checkpointed PDF extraction.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from extract_checkpoint import ExtractionCheckpoint
+from pdf_extractor import PDFExtractor
+from synthetic_pdf import generate_pdf
+
+
+class StoppingExtractor(PDFExtractor):
+    """Extractor that stops (as on shutdown) when it reaches a given page."""
+
+    stop_at = 0
+
+    def _page_text(self, load_page, number):
+        if number == self.stop_at:
+            self._closing.set()
+        return super()._page_text(load_page, number)
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    """A 30-page synthetic PDF and the sentences of an uncheckpointed extraction."""
+    path = tmp_path / 'corpus.pdf'
+    generate_pdf(str(path), pages=30, seed=5)
+    return str(path), PDFExtractor(str(path)).sentences
+
+
+def test_resumed_extraction_matches_a_full_run(corpus, tmp_path):
+    """Stopping mid-document and resuming gives exactly the sentences of one full pass."""
+    path, expected = corpus
+    checkpoints = str(tmp_path / 'checkpoints')
+    StoppingExtractor.stop_at = 25
+    stopped = StoppingExtractor(path, checkpoint_dir=checkpoints, checkpoint_pages=4)
+    assert not stopped.complete.is_set()
+    state, saved = ExtractionCheckpoint(checkpoints, path).load()
+    # Pages still held by the boilerplate window are part of the saved state
+    assert state['next_page'] == 24 and state['ingest']['boilerplate']['pending']
+    assert 0 < len(saved) < len(expected)
+
+    resumed = PDFExtractor(path, checkpoint_dir=checkpoints, checkpoint_pages=4)
+    assert resumed.complete.is_set()
+    assert resumed.sentences == expected
+
+    # A finished checkpoint is loaded without reading the PDF again
+    reloaded = PDFExtractor(path, checkpoint_dir=checkpoints, checkpoint_pages=4)
+    assert reloaded.sentences == expected
+    assert reloaded.ingest_stats == resumed.ingest_stats
+
+
+def test_sentences_after_the_last_state_save_are_redone(corpus, tmp_path):
+    """Sentences appended by a range whose state was never saved are truncated and produced once."""
+    path, expected = corpus
+    checkpoints = str(tmp_path / 'checkpoints')
+    StoppingExtractor.stop_at = 9
+    StoppingExtractor(path, checkpoint_dir=checkpoints, checkpoint_pages=4)
+    checkpoint = ExtractionCheckpoint(checkpoints, path)
+    with open(checkpoint.sentences_file, 'a') as f:
+        f.write('"Half-written range sentence"\n"Another one"\n')
+
+    assert PDFExtractor(path, checkpoint_dir=checkpoints, checkpoint_pages=4).sentences == expected
+
+
+def test_changed_pdf_starts_over(corpus, tmp_path):
+    """A checkpoint from a different version of the file is discarded."""
+    path, _ = corpus
+    checkpoints = str(tmp_path / 'checkpoints')
+    StoppingExtractor.stop_at = 9
+    StoppingExtractor(path, checkpoint_dir=checkpoints, checkpoint_pages=4)
+
+    generate_pdf(path, pages=12, seed=6)
+    expected = PDFExtractor(path).sentences
+    assert PDFExtractor(path, checkpoint_dir=checkpoints, checkpoint_pages=4).sentences == expected
+
+
+def test_unreadable_pages_are_skipped_and_remembered(corpus, tmp_path):
+    """A page PyPDF2 cannot read is recorded and skipped, also after a resume."""
+    path, expected = corpus
+
+    class BrokenPageExtractor(StoppingExtractor):
+        def _page_text(self, load_page, number):
+            if number == 6:
+                def load_page(_):
+                    raise ValueError("broken content stream")
+            return super()._page_text(load_page, number)
+
+    checkpoints = str(tmp_path / 'checkpoints')
+    BrokenPageExtractor.stop_at = 13
+    BrokenPageExtractor(path, checkpoint_dir=checkpoints, checkpoint_pages=4)
+    BrokenPageExtractor.stop_at = -1
+    resumed = BrokenPageExtractor(path, checkpoint_dir=checkpoints, checkpoint_pages=4)
+
+    assert resumed.complete.is_set()
+    assert resumed.bad_pages == {7: "broken content stream"}
+    assert 0 < len(resumed.sentences) < len(expected)
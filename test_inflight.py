@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Offline tests for post cycle checkpoints in STATE_DIR/inflight.
+Runs the real bot against the fake components from simulation.py, so no
+API keys or PDF are needed.
+"""
+import json
+import random
+import sys
+from pathlib import Path
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bot import NietzscheBot
+from simulation import FakeProcessor, FakeXPoster, SyntheticCorpus, VirtualClock
+
+
+def make_bot(tmp_path, seed=7):
+    """Build a bot on fake components with its state under tmp_path."""
+    rng = random.Random(seed)
+    clock = VirtualClock(start=1_700_000_000.0)
+    config = {
+        'log_dir': str(tmp_path / 'logs'),
+        'state_dir': str(tmp_path / 'state'),
+        'watchdog_interval_seconds': 0,
+        'dedupe_attempts': 100
+    }
+    components = {
+        'pdf_extractor': SyntheticCorpus(40, rng),
+        'processor': FakeProcessor(clock, rng),
+        'x_poster': FakeXPoster(clock, rng)
+    }
+    return NietzscheBot(config, components=components, clock=clock.time, sleep=clock.sleep)
+
+
+def test_finished_cycles_leave_no_checkpoint(tmp_path):
+    """Single and concurrent bulk post cycles remove their checkpoints."""
+    bot = make_bot(tmp_path)
+    try:
+        bot.post_quote()
+        bot.generate_bulk(3, post=True)
+        assert bot.history.count('posted') == 4
+        assert list((tmp_path / 'state' / 'inflight').iterdir()) == []
+    finally:
+        bot.stop()
+
+
+def test_interrupted_posts_are_recorded_once(tmp_path):
+    """Every 'posting' checkpoint becomes an interrupted row whose sentence is used."""
+    inflight = tmp_path / 'state' / 'inflight'
+    inflight.mkdir(parents=True)
+    for cycle, stage in (('a1', 'posting'), ('b2', 'posting'), ('c3', 'rephrase')):
+        draft = {'cycle_id': cycle, 'original': f"Sentence {cycle}.", 'rephrased': f"Output {cycle}."}
+        record = {'stage': stage, 'correlation_id': cycle, 'updated_at': 0, 'draft': draft}
+        (inflight / f"{cycle}.json").write_text(json.dumps(record))
+    (inflight / 'd4.tmp').write_text('{')
+
+    bot = make_bot(tmp_path)
+    try:
+        rows = bot.history.between(0, bot.clock() + 1, status='interrupted')
+        assert sorted(row['original'] for row in rows) == ["Sentence a1.", "Sentence b2."]
+        assert bot.history.already_posted("Sentence a1.")
+        assert not bot.history.already_posted("Sentence c3.")
+        assert list(inflight.iterdir()) == []
+    finally:
+        bot.stop()
+
+    # A second start finds nothing left to recover
+    bot = make_bot(tmp_path)
+    try:
+        assert bot.history.count('interrupted') == 2
+    finally:
+        bot.stop()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests for ingest-time normalisation, segmentation and dedupe.
+"""
+import sys
+from pathlib import Path
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ingest import BoilerplateDetector, Ingestor, line_key, normalize, segment_page
+from pdf_extractor import PDFExtractor
+
+
+def make_ingestor(**kwargs) -> Ingestor:
+    """Build an ingestor with the extractor's own cleanup and splitter."""
+    extractor = PDFExtractor('test.pdf', load=False)
+    return Ingestor(extractor._clean_text, extractor._split_sentences, **kwargs)
+
+
+def test_normalize_folds_unicode_and_joins_hyphenated_words():
+    """Ligatures, soft hyphens and line-break hyphenation are undone; real hyphens stay."""
+    assert normalize("The \ufb01rst philo-\nsopher") == "The first philosopher"
+    assert normalize("free\u00adspirit\u200b") == "freespirit"
+    assert normalize("self-overcoming and\nthe herd") == "self-overcoming and\nthe herd"
+
+
+def test_sentences_span_page_breaks():
+    """A sentence and a word broken over a page boundary come out whole."""
+    ingestor = make_ingestor()
+    first = ingestor.feed("Whoever fights monsters should see to it. And if you gaze long into an abys-")
+    second = ingestor.feed("s, the abyss also gazes into you. Without music, life would be a mistake")
+    assert first == ["Whoever fights monsters should see to it"]
+    assert second == ["And if you gaze long into an abyss, the abyss also gazes into you"]
+    assert ingestor.finish() == ["Without music, life would be a mistake"]
+
+
+def test_duplicate_sentences_are_dropped_and_counted():
+    """Exact repeats after normalisation are kept once and reported in the stats."""
+    ingestor = make_ingestor()
+    pages = [
+        "God is dead, and we have killed him. What does not kill me makes me stronger.",
+        "God  is dead, and we have\nkilled him. That which is done out of love is beyond good and evil.",
+        "What does not kill me makes me stronger."
+    ]
+    assert list(ingestor.ingest(pages)) == [
+        "God is dead, and we have killed him",
+        "What does not kill me makes me stronger",
+        "That which is done out of love is beyond good and evil"
+    ]
+    stats = ingestor.stats
+    assert (stats['pages'], stats['sentences'], stats['duplicate_sentences']) == (3, 3, 2)
+    assert stats['duplicate_bytes'] == len("God is dead, and we have killed him") + \
+        len("What does not kill me makes me stronger")
+
+
+APHORISMS = [
+    "Every profound spirit needs a mask.",
+    "The noble soul has reverence for itself.",
+    "One repays a teacher badly if one remains only a pupil.",
+    "In individuals, insanity is rare; but in groups it is the rule.",
+    "Whoever despises himself still respects himself as one who despises.",
+    "The thought of suicide is a great consolation.",
+    "Madness is something rare in individuals.",
+    "What is done out of love always takes place beyond good and evil."
+]
+
+
+def book_page(number: int) -> str:
+    """A printed page with alternating running heads and a page number footer."""
+    header = "BEYOND GOOD AND EVIL" if number % 2 else f"Beyond Good And Evil {number}"
+    body = [APHORISMS[(number + i) % len(APHORISMS)] for i in range(4)]
+    return '\n'.join([header] + body + [str(number)])
+
+
+def test_boilerplate_detector_strips_running_heads_and_page_numbers():
+    """Repeated edge lines go from every page, including those before the repeats were seen."""
+    detector = BoilerplateDetector(min_repeats=3, window=5)
+    pages = []
+    for number in range(1, 9):
+        pages.extend(detector.push(book_page(number)))
+    pages.extend(detector.flush())
+
+    assert pages == ['\n'.join(book_page(number).split('\n')[1:-1]) for number in range(1, 9)]
+    assert detector.stats == {'page_numbers_removed': 8, 'boilerplate_lines_removed': 8}
+    assert set(detector.boilerplate()) == {"beyond good and evil", "beyond good and evil #", "#"}
+
+
+def test_boilerplate_detector_only_strips_page_edges():
+    """A repeated line is kept in the middle of a page, and one-off edge lines are kept."""
+    detector = BoilerplateDetector(min_repeats=3, window=2)
+    detector.counts.update({line_key("Chapter One"): 5})
+    page = "PREFACE\nChapter One\nThe text goes on.\nChapter One\nSupposing truth is a woman\n- xiv -"
+    assert detector.strip(page) == "PREFACE\nThe text goes on.\nChapter One\nSupposing truth is a woman"
+    assert detector.stats == {'page_numbers_removed': 1, 'boilerplate_lines_removed': 1}
+
+
+def test_ingested_sentences_do_not_contain_boilerplate():
+    """Running heads and page numbers do not leak into a sentence carried over a page break."""
+    ingestor = make_ingestor(boilerplate=BoilerplateDetector(min_repeats=3, window=4))
+    pages = [book_page(number) for number in range(1, 7)]
+    pages[2] += "\nThe free spirit"
+    pages[3] = pages[3].replace("\n", "\nlaughs at the herd.\n", 1)
+    sentences = list(ingestor.ingest(pages))
+    assert "The free spirit laughs at the herd" in sentences
+    assert not any('EVIL' in s or 'Evil' in s for s in sentences)
+    assert len(sentences) == len(APHORISMS) + 1
+
+
+def test_segment_page_drops_fragments_at_both_ends():
+    """Out of order, text before the first and after the last terminator is dropped."""
+    detector = BoilerplateDetector()
+    detector.counts.update({line_key("BEYOND GOOD AND EVIL"): 10})
+    page = "BEYOND GOOD AND EVIL\nend of an earlier thought. Every profound spirit needs a mask. And more\n12"
+    extractor = PDFExtractor('test.pdf', load=False)
+    sentences = segment_page(page, extractor._clean_text, extractor._split_sentences, detector)
+    assert sentences == ["Every profound spirit needs a mask"]
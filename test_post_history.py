@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite post history store.
+"""
+import sys
+from pathlib import Path
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from post_history import PostHistory, used_key
+
+
+def test_used_rows_are_deduped_by_hash(tmp_path):
+    """Posted and interrupted sentences count as used; failed ones do not."""
+    history = PostHistory(str(tmp_path / 'history.sqlite3'))
+    try:
+        history.record('posted', original="God is dead.", output="God has died.", sentence_index=1)
+        history.record('interrupted', original="Become who you are.", output="Be yourself.")
+        history.record('failed', original="Man is a rope.", output="A rope.")
+
+        # Matched by text hash, ignoring case and spacing, not by position
+        assert history.already_posted("god is  DEAD.")
+        assert history.already_posted("Become who you are.")
+        assert not history.already_posted("Man is a rope.")
+        assert history.output_posted("Be yourself.")
+        assert not history.output_posted("A rope.")
+
+        plan = history._conn.execute(
+            "EXPLAIN QUERY PLAN SELECT 1 FROM posts WHERE sentence_hash = ? "
+            "AND status IN ('posted', 'interrupted') LIMIT 1", ('x',)
+        ).fetchall()
+        assert 'idx_posts_used_sentence' in ' '.join(row[-1] for row in plan)
+    finally:
+        history.close()
+
+
+def test_posted_keys_allows_writes_while_iterating(tmp_path):
+    """The caller can record posts between keys without deadlocking."""
+    history = PostHistory(str(tmp_path / 'history.sqlite3'))
+    try:
+        for i in range(1500):
+            history.record('posted', original=f"Sentence {i}.", output=f"Output {i}.")
+        keys = []
+        for key in history.posted_keys():
+            if not keys:
+                history.record('failed', original="Extra sentence.")
+                assert history.already_posted("Sentence 0.")
+            keys.append(key)
+        assert len(keys) == 3000
+        assert keys[0] == used_key('sentence', "Sentence 0.")
+        assert keys[-1] == used_key('output', "Output 1499.")
+    finally:
+        history.close()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Tests for the heap-based scheduler.
+"""
+import sys
+import threading
+from pathlib import Path
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from scheduler import HeapScheduler
+
+
+def test_stop_before_run_forever_is_not_lost():
+    """A stop() that lands before the loop starts makes run_forever() return."""
+    scheduler = HeapScheduler(heartbeat_interval=0.05)
+    scheduler.stop()
+    thread = threading.Thread(target=scheduler.run_forever, daemon=True)
+    thread.start()
+    thread.join(timeout=2)
+    assert not thread.is_alive()
+    assert not scheduler.running
+
+
+def test_run_forever_runs_due_jobs_until_stopped(tmp_path):
+    """Due jobs run on the loop thread and stop() ends the loop."""
+    scheduler = HeapScheduler(state_file=str(tmp_path / 'schedule.json'), heartbeat_interval=0.05)
+    ran = threading.Event()
+    scheduler.add_job('tick', ran.set, interval_seconds=0.01)
+    thread = threading.Thread(target=scheduler.run_forever, daemon=True)
+    thread.start()
+    try:
+        assert ran.wait(timeout=2)
+    finally:
+        scheduler.stop()
+        thread.join(timeout=2)
+    assert not thread.is_alive()
+    assert (tmp_path / 'schedule.json').exists()
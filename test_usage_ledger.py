@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-provider usage ledger rollups.
+"""
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from usage_ledger import UsageLedger, note_fallback, note_retry, note_usage, read_entries, rollup
+
+
+def entry(day, provider, outcome, latency_ms, **fields):
+    """Build a ledger entry at noon on the given day."""
+    record = {
+        'time': datetime.strptime(day, '%Y-%m-%d').replace(hour=12).timestamp(), 'provider': provider,
+        'model': 'm', 'outcome': outcome, 'prompt_tokens': 0, 'completion_tokens': 0, 'retries': 0,
+        'fallback': outcome == 'fallback', 'latency_ms': latency_ms
+    }
+    record.update(fields)
+    return record
+
+
+def test_rollup_counts_outcomes_and_cost():
+    """Fallbacks are not errors; rows are split by day and provider and priced per million tokens."""
+    entries = [
+        entry('2026-01-01', 'groq', 'success', 100.0, prompt_tokens=1000, completion_tokens=500, retries=1),
+        entry('2026-01-01', 'groq', 'fallback', 300.0),
+        entry('2026-01-01', 'groq', 'error', 200.0),
+        entry('2026-01-02', 'groq', 'success', 50.0),
+        entry('2026-01-01', 'grok', 'success', 10.0, prompt_tokens=2_000_000)
+    ]
+    rows = rollup(entries, {'groq': (1.0, 2.0), 'grok': (5.0, 15.0)})
+
+    assert [(row['day'], row['provider']) for row in rows] == [
+        ('2026-01-01', 'grok'), ('2026-01-01', 'groq'), ('2026-01-02', 'groq')
+    ]
+    grok, groq, groq_next = rows
+    assert (groq['calls'], groq['errors'], groq['fallbacks'], groq['retries']) == (3, 1, 1, 1)
+    assert groq['fallback_rate'] == round(1 / 3, 4)
+    assert groq['latency_ms_mean'] == 200.0 and groq['latency_ms_max'] == 300.0
+    assert groq['cost_usd'] == 0.002
+    assert grok['cost_usd'] == 10.0
+    assert (groq_next['calls'], groq_next['errors'], groq_next['fallbacks']) == (1, 0, 0)
+
+
+def test_ledger_records_calls_and_flushes(tmp_path):
+    """Calls fill in usage from the note_* helpers and are appended to the JSONL file."""
+    path = tmp_path / 'usage.jsonl'
+    ledger = UsageLedger()
+    ledger.open(str(path), flush_interval=3600)
+    try:
+        with ledger.call('groq', 'm') as call:
+            note_usage(prompt_tokens=12, completion_tokens=5)
+            note_retry()
+            note_fallback()
+            call['outcome'] = 'fallback'
+        try:
+            with ledger.call('groq', 'm'):
+                raise RuntimeError("API down")
+        except RuntimeError:
+            pass
+        # Outside a call the helpers do nothing
+        note_usage(prompt_tokens=99)
+    finally:
+        ledger.close()
+
+    saved = list(read_entries(str(path)))
+    assert [e['outcome'] for e in saved] == ['fallback', 'error']
+    assert (saved[0]['prompt_tokens'], saved[0]['completion_tokens'], saved[0]['retries']) == (12, 5, 1)
+    (row,) = ledger.rollups()
+    assert (row['calls'], row['errors'], row['fallbacks']) == (2, 1, 1)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Offline test for the used-key Bloom filter.
+Runs the real bot against the fake components from simulation.py, so no
+API keys or PDF are needed.
+"""
+import random
+import sys
+from pathlib import Path
+
+# Add current directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bot import NietzscheBot
+from post_history import used_key
+from simulation import FakeProcessor, FakeXPoster, SyntheticCorpus, VirtualClock
+
+
+def test_used_filter_skips_posted_sentences(tmp_path):
+    """Posted sentences land in a fresh filter and are not selected again."""
+    posts = 10
+    rng = random.Random(7)
+    clock = VirtualClock(start=1_700_000_000.0)
+    corpus = SyntheticCorpus(2 * posts, rng)
+    poster = FakeXPoster(clock, rng)
+    config = {
+        'log_dir': str(tmp_path / 'logs'),
+        'state_dir': str(tmp_path / 'state'),
+        'watchdog_interval_seconds': 0,
+        'dedupe_attempts': 100
+    }
+    bot = NietzscheBot(
+        config,
+        components={'pdf_extractor': corpus, 'processor': FakeProcessor(clock, rng), 'x_poster': poster},
+        clock=clock.time,
+        sleep=clock.sleep
+    )
+    try:
+        assert bot.used_filter is not None and len(bot.used_filter) == 0
+
+        for _ in range(posts):
+            bot.post_quote()
+        rows = bot.history.between(0, clock.time() + 1, status='posted')
+        posted = {row['original'] for row in rows}
+        assert len(rows) == posts
+        assert len(posted) == posts
+        assert all(used_key('sentence', sentence) in bot.used_filter for sentence in posted)
+        # One sentence key and one output key per post
+        assert len(bot.used_filter) == 2 * posts
+
+        for _ in range(50):
+            _, sentence = bot._select_sentence()
+            assert sentence not in posted
+    finally:
+        bot.stop()
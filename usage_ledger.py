@@ -0,0 +1,324 @@
+"""
+Per-provider usage ledger for LLM calls.
+
+Every instrumented rephrase call records its provider, model, token usage,
+latency, retries and whether it fell back to the original sentence. Entries
+are kept in memory, appended to a JSONL file periodically, and rolled up
+per day so providers can be compared on speed, reliability and cost.
+
+Query with: python3 usage_ledger.py --path state/usage.jsonl --days 7
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Price per million (prompt, completion) tokens in USD; free tiers cost nothing
+DEFAULT_PRICES: Dict[str, Tuple[float, float]] = {
+    'huggingface': (0.0, 0.0),
+    'groq': (0.0, 0.0),
+    'grok': (0.0, 0.0),
+    'llama': (0.0, 0.0),
+    'ollama': (0.0, 0.0)
+}
+
+_current_call: ContextVar[Optional[dict]] = ContextVar('usage_call', default=None)
+
+
+def parse_prices(spec: Optional[str]) -> Dict[str, Tuple[float, float]]:
+    """
+    Parse per-provider prices like "groq:0.59:0.79,grok:5:15".
+
+    Args:
+        spec: Comma-separated provider:prompt:completion prices per million tokens
+
+    Returns:
+        Prices keyed by provider (defaults for providers not listed)
+    """
+    prices = dict(DEFAULT_PRICES)
+    for item in (spec or '').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            provider, prompt, completion = item.split(':')
+            prices[provider.strip()] = (float(prompt), float(completion))
+        except ValueError:
+            raise ValueError(f"Invalid price {item!r}, expected provider:prompt:completion")
+    return prices
+
+
+def note_usage(prompt_tokens: Optional[int] = None, completion_tokens: Optional[int] = None) -> None:
+    """
+    Record token usage reported by the API for the current call.
+
+    Args:
+        prompt_tokens: Input tokens
+        completion_tokens: Output tokens
+    """
+    call = _current_call.get()
+    if call is None:
+        return
+    call['prompt_tokens'] += prompt_tokens or 0
+    call['completion_tokens'] += completion_tokens or 0
+
+
+def note_retry() -> None:
+    """Record a retried request within the current call."""
+    call = _current_call.get()
+    if call is not None:
+        call['retries'] += 1
+
+
+def note_fallback() -> None:
+    """Record that the current call returned the original sentence."""
+    call = _current_call.get()
+    if call is not None:
+        call['fallback'] = True
+
+
+def rollup(entries: Iterable[dict], prices: Optional[Dict[str, Tuple[float, float]]] = None) -> List[dict]:
+    """
+    Aggregate ledger entries per day, provider and model.
+
+    Args:
+        entries: Ledger entries
+        prices: Prices per million tokens keyed by provider
+
+    Returns:
+        Rollup rows sorted by day, provider and model
+    """
+    prices = prices or DEFAULT_PRICES
+    rows: Dict[Tuple[str, str, str], dict] = {}
+    for entry in entries:
+        day = datetime.fromtimestamp(entry['time']).strftime('%Y-%m-%d')
+        key = (day, entry['provider'], entry.get('model') or '')
+        row = rows.setdefault(key, {
+            'day': day, 'provider': key[1], 'model': key[2], 'calls': 0, 'errors': 0,
+            'fallbacks': 0, 'retries': 0, 'prompt_tokens': 0, 'completion_tokens': 0,
+            'latency_ms_total': 0.0, 'latency_ms_max': 0.0
+        })
+        row['calls'] += 1
+        row['errors'] += entry['outcome'] == 'error'
+        row['fallbacks'] += bool(entry.get('fallback'))
+        row['retries'] += entry.get('retries', 0)
+        row['prompt_tokens'] += entry.get('prompt_tokens', 0)
+        row['completion_tokens'] += entry.get('completion_tokens', 0)
+        row['latency_ms_total'] += entry['latency_ms']
+        row['latency_ms_max'] = max(row['latency_ms_max'], entry['latency_ms'])
+
+    result = []
+    for key in sorted(rows):
+        row = rows[key]
+        prompt_price, completion_price = prices.get(row['provider'], (0.0, 0.0))
+        row['latency_ms_mean'] = round(row.pop('latency_ms_total') / row['calls'], 3)
+        row['latency_ms_max'] = round(row['latency_ms_max'], 3)
+        row['fallback_rate'] = round(row['fallbacks'] / row['calls'], 4)
+        row['cost_usd'] = round(
+            (row['prompt_tokens'] * prompt_price + row['completion_tokens'] * completion_price) / 1e6, 6
+        )
+        result.append(row)
+    return result
+
+
+def read_entries(path: str, since: Optional[float] = None) -> Iterator[dict]:
+    """
+    Stream entries from a ledger file.
+
+    Args:
+        path: JSONL ledger file
+        since: Only entries at or after this timestamp
+
+    Yields:
+        Ledger entries
+    """
+    if not os.path.exists(path):
+        return
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if since is None or entry['time'] >= since:
+                yield entry
+
+
+class UsageLedger:
+    """In-memory ledger of LLM calls with periodic JSONL flushes."""
+
+    def __init__(self):
+        """Initialize an in-memory ledger (call open() to persist)."""
+        self.logger = logging.getLogger(__name__)
+        self.path: Optional[str] = None
+        self.prices = dict(DEFAULT_PRICES)
+        self.retention_days = 31
+        self._entries: List[dict] = []
+        self._pending: List[dict] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def open(
+        self,
+        path: str,
+        flush_interval: float = 60.0,
+        prices: Optional[Dict[str, Tuple[float, float]]] = None,
+        retention_days: int = 31
+    ) -> None:
+        """
+        Persist to a JSONL file and start periodic flushing.
+
+        Args:
+            path: Ledger file (existing entries are loaded for rollups)
+            flush_interval: Seconds between flushes
+            prices: Prices per million tokens keyed by provider
+            retention_days: Days of entries kept in memory for rollups
+        """
+        self.path = path
+        self.prices = prices or dict(DEFAULT_PRICES)
+        self.retention_days = retention_days
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        since = time.time() - retention_days * 86400
+        with self._lock:
+            self._entries = list(read_entries(path, since)) + self._entries
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._flush_loop, args=(flush_interval,), name='usage-ledger', daemon=True
+        )
+        self._thread.start()
+
+    @contextmanager
+    def call(self, provider: str, model: Optional[str]) -> Iterator[dict]:
+        """
+        Account one LLM call; note_usage/note_retry/note_fallback fill it in.
+
+        Args:
+            provider: Provider label
+            model: Model name
+
+        Yields:
+            The call record (set 'outcome' to 'success' on success)
+        """
+        record = {
+            'time': time.time(), 'provider': provider, 'model': model, 'outcome': 'error',
+            'prompt_tokens': 0, 'completion_tokens': 0, 'retries': 0, 'fallback': False
+        }
+        token = _current_call.set(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            _current_call.reset(token)
+            record['latency_ms'] = round((time.perf_counter() - start) * 1000, 3)
+            self.record(record)
+
+    def record(self, entry: dict) -> None:
+        """
+        Add an entry.
+
+        Args:
+            entry: Ledger entry
+        """
+        with self._lock:
+            self._entries.append(entry)
+            if self.path:
+                self._pending.append(entry)
+
+    def flush(self) -> None:
+        """Append pending entries to the ledger file and drop expired ones from memory."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            cutoff = time.time() - self.retention_days * 86400
+            if self._entries and self._entries[0]['time'] < cutoff:
+                self._entries = [entry for entry in self._entries if entry['time'] >= cutoff]
+        if not pending or not self.path:
+            return
+        try:
+            with open(self.path, 'a') as f:
+                f.writelines(json.dumps(entry) + '\n' for entry in pending)
+        except OSError as e:
+            self.logger.warning(f"Could not flush usage ledger: {str(e)}")
+            with self._lock:
+                self._pending = pending + self._pending
+
+    def _flush_loop(self, interval: float) -> None:
+        """Flush until closed."""
+        while not self._stop.wait(interval):
+            self.flush()
+
+    def rollups(self, days: Optional[int] = None) -> List[dict]:
+        """
+        Get daily rollups from memory.
+
+        Args:
+            days: Limit to the last N days
+
+        Returns:
+            Rollup rows
+        """
+        since = time.time() - days * 86400 if days else None
+        with self._lock:
+            entries = [entry for entry in self._entries if since is None or entry['time'] >= since]
+        return rollup(entries, self.prices)
+
+    def close(self) -> None:
+        """Stop the flush thread and write pending entries."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+
+LEDGER = UsageLedger()
+
+
+def usage_response() -> Tuple[int, str, bytes]:
+    """
+    Health server handler for /usage.
+
+    Returns:
+        Tuple of (status code, content type, body)
+    """
+    body = json.dumps({'daily': LEDGER.rollups(days=LEDGER.retention_days)}, indent=2).encode('utf-8')
+    return 200, 'application/json', body
+
+
+def main() -> None:
+    """Print daily rollups from a ledger file."""
+    parser = argparse.ArgumentParser(description="Show per-provider LLM usage per day")
+    parser.add_argument('--path', default=os.path.join(os.getenv('STATE_DIR', 'state'), 'usage.jsonl'))
+    parser.add_argument('--days', type=int, default=7, help="Days to include (0 = all)")
+    parser.add_argument('--prices', default=os.getenv('USAGE_PRICES', ''),
+                        help="provider:prompt:completion USD per million tokens, comma-separated")
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    since = time.time() - args.days * 86400 if args.days else None
+    rows = rollup(read_entries(args.path, since), parse_prices(args.prices))
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    if not rows:
+        print(f"No usage recorded in {args.path}")
+        return
+
+    print(f"{'day':10s}  {'provider':11s}  {'calls':>5s}  {'err':>4s}  {'fallback':>8s}  {'retries':>7s}  "
+          f"{'prompt':>8s}  {'compl':>8s}  {'mean ms':>9s}  {'max ms':>9s}  {'cost $':>9s}  model")
+    for row in rows:
+        print(f"{row['day']:10s}  {row['provider']:11s}  {row['calls']:5d}  {row['errors']:4d}  "
+              f"{row['fallback_rate']:8.1%}  {row['retries']:7d}  {row['prompt_tokens']:8d}  "
+              f"{row['completion_tokens']:8d}  {row['latency_ms_mean']:9.1f}  {row['latency_ms_max']:9.1f}  "
+              f"{row['cost_usd']:9.4f}  {row['model']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+"""
+Resource watchdog for the long-running bot process.
+
+Samples RSS, live object counts, threads, open file descriptors and
+(optionally) the top tracemalloc allocation sites at a fixed interval,
+keeps a rolling history to compute growth trends, and takes a
+configurable action when memory crosses a limit.
+"""
+import gc
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional
+
+from metrics import process_rss_bytes
+
+ACTIONS = ('log', 'drop_caches', 'restart')
+
+
+def _slope_per_hour(points: List[tuple]) -> Optional[float]:
+    """Least-squares slope of (timestamp, value) points, in units per hour."""
+    if len(points) < 2:
+        return None
+    n = len(points)
+    mean_t = sum(t for t, _ in points) / n
+    mean_v = sum(v for _, v in points) / n
+    denominator = sum((t - mean_t) ** 2 for t, _ in points)
+    if denominator == 0:
+        return None
+    slope = sum((t - mean_t) * (v - mean_v) for t, v in points) / denominator
+    return slope * 3600
+
+
+class ResourceWatchdog:
+    """Background sampler of process resources with a memory-limit action."""
+
+    def __init__(
+        self,
+        interval: float = 300.0,
+        history: int = 288,
+        memory_limit_mb: float = 0.0,
+        action: str = 'log',
+        drop_caches: Optional[Callable[[], None]] = None,
+        restart: Optional[Callable[[], None]] = None,
+        trace_allocations: bool = False,
+        cooldown: float = 3600.0,
+        clock: Callable[[], float] = time.time,
+        state_file: Optional[str] = None
+    ):
+        """
+        Initialize the watchdog.
+
+        Args:
+            interval: Seconds between samples
+            history: Number of samples kept for trends
+            memory_limit_mb: RSS limit that triggers the action (0 disables)
+            action: "log", "drop_caches" or "restart"
+            drop_caches: Callback that releases caches and collects garbage
+            restart: Callback that starts a graceful restart
+            trace_allocations: Record top allocation sites with tracemalloc
+            cooldown: Minimum seconds between two actions
+            clock: Function returning the current timestamp
+            state_file: JSON file keeping the sample history across restarts
+        """
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown watchdog action {action!r}, expected one of {', '.join(ACTIONS)}")
+
+        self.logger = logging.getLogger(__name__)
+        self.interval = interval
+        self.memory_limit_bytes = memory_limit_mb * 1024 * 1024
+        self.action = action
+        self.drop_caches = drop_caches
+        self.restart = restart
+        self.trace_allocations = trace_allocations
+        self.cooldown = cooldown
+        self.clock = clock
+        self.samples: Deque[Dict] = deque(maxlen=history)
+        self.top_allocations: List[str] = []
+        self.actions_taken = 0
+        self._last_action = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.state_file = Path(state_file) if state_file else None
+        self._load_state()
+
+    def _load_state(self) -> None:
+        """Restore samples saved by a previous process."""
+        if not self.state_file or not self.state_file.exists():
+            return
+        try:
+            self.samples.extend(json.loads(self.state_file.read_text()))
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable watchdog state {self.state_file}: {str(e)}")
+
+    def save_state(self) -> None:
+        """Persist the sample history atomically."""
+        if not self.state_file:
+            return
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.state_file.with_suffix('.tmp')
+            tmp_file.write_text(json.dumps(list(self.samples)))
+            os.replace(tmp_file, self.state_file)
+        except OSError as e:
+            self.logger.warning(f"Could not persist watchdog state: {str(e)}")
+
+    def sample(self) -> Dict:
+        """
+        Take one sample and apply the memory limit.
+
+        Returns:
+            The sample
+        """
+        try:
+            open_fds = len(os.listdir('/proc/self/fd'))
+        except OSError:
+            open_fds = None
+
+        sample = {
+            'time': self.clock(),
+            'pid': os.getpid(),
+            'rss_bytes': process_rss_bytes(),
+            'gc_objects': len(gc.get_objects()),
+            'gc_counts': gc.get_count(),
+            'threads': threading.active_count(),
+            'open_fds': open_fds
+        }
+        if self.trace_allocations and tracemalloc.is_tracing():
+            stats = tracemalloc.take_snapshot().statistics('lineno')[:10]
+            self.top_allocations = [str(stat) for stat in stats]
+            sample['traced_bytes'] = tracemalloc.get_traced_memory()[0]
+
+        self.samples.append(sample)
+        self._check_limit(sample)
+        return sample
+
+    def _check_limit(self, sample: Dict) -> None:
+        """Take the configured action when RSS exceeds the limit."""
+        if not self.memory_limit_bytes or sample['rss_bytes'] <= self.memory_limit_bytes:
+            return
+        if sample['time'] - self._last_action < self.cooldown:
+            return
+
+        self._last_action = sample['time']
+        self.actions_taken += 1
+        rss_mb = sample['rss_bytes'] / 1024 / 1024
+        limit_mb = self.memory_limit_bytes / 1024 / 1024
+        self.logger.warning(f"RSS {rss_mb:.1f} MB exceeds limit {limit_mb:.1f} MB, action: {self.action}")
+
+        if self.action == 'drop_caches' and self.drop_caches:
+            self.drop_caches()
+            self.logger.info(f"Caches dropped, RSS now {process_rss_bytes() / 1024 / 1024:.1f} MB")
+        elif self.action == 'restart' and self.restart:
+            self.restart()
+
+    def trends(self) -> Dict[str, Optional[float]]:
+        """
+        Compute growth trends over this process's samples.
+
+        Returns:
+            RSS growth (MB/hour) and object count growth (objects/hour)
+        """
+        pid = os.getpid()
+        samples = [s for s in self.samples if s.get('pid') == pid]
+        rss = _slope_per_hour([(s['time'], s['rss_bytes'] / 1024 / 1024) for s in samples])
+        objects = _slope_per_hour([(s['time'], s['gc_objects']) for s in samples])
+        return {
+            'rss_mb_per_hour': round(rss, 3) if rss is not None else None,
+            'gc_objects_per_hour': round(objects, 1) if objects is not None else None
+        }
+
+    def report(self) -> Dict:
+        """
+        Summarize the current state for the health server.
+
+        Returns:
+            Report dictionary
+        """
+        pid = os.getpid()
+        previous = [s for s in self.samples if s.get('pid') != pid]
+        samples = [s for s in self.samples if s.get('pid') == pid]
+        latest = dict(samples[-1]) if samples else None
+        if latest:
+            latest['time'] = datetime.fromtimestamp(latest['time']).isoformat(timespec='seconds')
+        return {
+            'interval_seconds': self.interval,
+            'samples': len(samples),
+            'latest': latest,
+            'peak_rss_bytes': max((s['rss_bytes'] for s in samples), default=None),
+            'previous_run_peak_rss_bytes': max((s['rss_bytes'] for s in previous), default=None),
+            'trends': self.trends(),
+            'memory_limit_bytes': self.memory_limit_bytes or None,
+            'action': self.action,
+            'actions_taken': self.actions_taken,
+            'top_allocations': self.top_allocations
+        }
+
+    def _run(self) -> None:
+        """Sample until stopped."""
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                self.logger.error(f"Resource sample failed: {str(e)}")
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        """Start sampling in a daemon thread."""
+        if self.trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='resource-watchdog', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
@@ -1,10 +1,27 @@
 """
 X (Twitter) API v2 posting functionality.
 """
+import os
 import tweepy
+import requests
 from typing import Optional
 import logging
 
+X_API_HOST = "https://api.twitter.com"
+
+
+class _RebasedSession(requests.Session):
+    """Session that sends X API requests to another host (e.g. a local fake server)."""
+
+    def __init__(self, base_url: str):
+        super().__init__()
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, url, *args, **kwargs):
+        if url.startswith(X_API_HOST):
+            url = self.base_url + url[len(X_API_HOST):]
+        return super().request(method, url, *args, **kwargs)
+
 
 class XPoster:
     """Handle posting to X using API v2."""
@@ -14,7 +31,9 @@ class XPoster:
         consumer_key: str,
         consumer_secret: str,
         access_token: str,
-        access_token_secret: str
+        access_token_secret: str,
+        verify: bool = True,
+        api_base_url: Optional[str] = None
     ):
         """
         Initialize X API client.
@@ -24,6 +43,9 @@ class XPoster:
             consumer_secret: API key secret
             access_token: Access token
             access_token_secret: Access token secret
+            verify: Check the credentials now (callers probing later pass False)
+            api_base_url: Send API calls here instead of api.twitter.com
+                          (defaults to X_API_BASE_URL)
         """
         self.logger = logging.getLogger(__name__)
 
@@ -34,7 +56,12 @@ class XPoster:
                 access_token=access_token,
                 access_token_secret=access_token_secret
             )
-            self._verify_credentials()
+            api_base_url = api_base_url or os.getenv('X_API_BASE_URL')
+            if api_base_url:
+                self.client.session = _RebasedSession(api_base_url)
+                self.logger.info(f"Sending X API requests to {api_base_url}")
+            if verify:
+                self._verify_credentials()
         except Exception as e:
             raise Exception(f"Failed to initialize X API client: {str(e)}")
 